@@ -13,7 +13,9 @@ from setuptools import find_packages
 
 import versioneer
 
-requirements = []
+requirements = [
+    'numpy',
+]
 
 
 test_requirements = [
@@ -46,6 +48,12 @@ setup(
     install_requires=requirements,
     tests_require=test_requirements,
     zip_safe=False,
+    entry_points={
+        'console_scripts': [
+            'originpivot-batch = OriginPivot.batch:main',
+            'originpivot-audit = OriginPivot.audit:main',
+        ],
+    },
     keywords=[
         # eg: 'keyword1', 'keyword2', 'keyword3',
     ],
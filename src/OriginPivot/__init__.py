@@ -1,7 +1,7 @@
-from core import *
+from .core import *
 
 import os
 
 def reloadAll():
-    import core
+    from . import core
     reload(core)
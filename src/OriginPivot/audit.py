@@ -0,0 +1,290 @@
+"""
+Read-only audit of pivots.
+
+The audit computes the pivots move_pivot_to_bottom, move_to_origin and
+move_pivot_to_joint would set without editing anything and records how
+far every object's current pivot is from them in an indexed SQLite store:
+
+    bottom  distance to the bottom center of the object's bounding box
+    origin  distance to the origin
+    joint   distance to the closest audited joint, when there is one
+
+Objects of a scene are audited through a backend, OBJ files in parallel
+worker processes. An OBJ file has no pivot, its origin acts as one.
+
+Usage:
+    python -m OriginPivot.audit scan SOURCE STORE [--up-axis y]
+    python -m OriginPivot.audit query STORE --metric bottom --above 1.0
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np # pylint: disable=import-error
+
+from . import backends
+from . import batch
+from . import cache
+from . import geometry
+from . import obj
+from . import spatial
+from . import vertex_cache as vertex_caches
+
+METRICS = ('bottom', 'origin', 'joint')
+
+_COLUMNS = (
+    'asset', 'node', 'pivot_x', 'pivot_y', 'pivot_z',
+    'xmin', 'ymin', 'zmin', 'xmax', 'ymax', 'zmax',
+    'bottom', 'origin', 'joint', 'joint_name', 'scanned')
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS pivots (
+        asset TEXT NOT NULL,
+        node TEXT NOT NULL,
+        pivot_x REAL, pivot_y REAL, pivot_z REAL,
+        xmin REAL, ymin REAL, zmin REAL, xmax REAL, ymax REAL, zmax REAL,
+        bottom REAL,
+        origin REAL,
+        joint REAL,
+        joint_name TEXT,
+        scanned REAL,
+        PRIMARY KEY (asset, node)
+    )''',
+    'CREATE INDEX IF NOT EXISTS pivots_bottom ON pivots (bottom)',
+    'CREATE INDEX IF NOT EXISTS pivots_origin ON pivots (origin)',
+    'CREATE INDEX IF NOT EXISTS pivots_joint ON pivots (joint)',
+)
+
+
+def deviations(pivots, bounds, up_axis='y', joint_positions=None):
+    """
+    Returns the distances of (N, 3) pivots to the bottom centers of their
+    (N, 6) bounds, to the origin and to the closest joint position along
+    with the index of that joint. Without joints the last two are None.
+    """
+
+    pivots = geometry.as_points(pivots)
+    bounds = geometry.as_bounds(bounds)
+
+    bottom = np.sqrt(((pivots - geometry.bottom_centers(bounds, up_axis)) ** 2).sum(axis=1))
+    origin = np.sqrt((pivots ** 2).sum(axis=1))
+
+    joint = closest = None
+    if joint_positions is not None and len(joint_positions):
+        closest, joint = spatial.KDTree(joint_positions).query(pivots)
+
+    return bottom, origin, joint, closest
+
+
+def _records(asset, nodes, pivots, bounds, up_axis, joints=None, joint_positions=None):
+    bottom, origin, joint, closest = deviations(pivots, bounds, up_axis, joint_positions)
+    scanned = time.time()
+
+    records = []
+    for row, node in enumerate(nodes):
+        records.append(dict(zip(_COLUMNS, (
+            asset, node) + tuple(float(value) for value in pivots[row]) +
+            tuple(float(value) for value in bounds[row]) + (
+                float(bottom[row]), float(origin[row]),
+                None if joint is None else float(joint[row]),
+                None if closest is None else joints[closest[row]],
+                scanned))))
+
+    return records
+
+
+def audit_scene(backend=None, asset=''):
+    """
+    Audits the selected objects of a scene and returns a record dict for
+    every object, the selected joints are the targets of the joint metric.
+
+    Only queries are issued: the bounds come from the bounds cache, the
+    pivots and joint positions from one bulk call each.
+    """
+
+    backend = backends.get_backend(backend)
+
+    selection = backend.selection()
+    joints = [node for node in selection if backend.is_type(node, 'joint')]
+    joint_set = set(joints)
+    nodes = [node for node in selection if node not in joint_set]
+    if not nodes:
+        return []
+
+    pivots = geometry.as_points(backend.world_pivots(nodes))
+    bounds = geometry.as_bounds(cache.get_cache(backend).world_bounding_boxes(backend, nodes))
+    joint_positions = geometry.as_points(backend.joint_positions(joints)) if joints else None
+
+    return _records(asset, nodes, pivots, bounds, backend.up_axis(), joints, joint_positions)
+
+
+def _audit_obj_task(task):
+    """
+    Audits one OBJ file in a worker process.
+
+    Errors are returned instead of raised so one broken file does not
+    stop the pool.
+    """
+
+    relative_path, path, up_axis, cache_directory = task
+
+    try:
+        if cache_directory is None:
+            bounds = obj.obj_bounds(path)[np.newaxis]
+        else:
+            bounds = vertex_caches.VertexCache(cache_directory).bounds(path)[np.newaxis]
+    except Exception as error: # pylint: disable=broad-except
+        return relative_path, None, str(error)
+
+    return relative_path, _records(relative_path, [''], np.zeros((1, 3)), bounds, up_axis), ''
+
+
+class AuditStore(object):
+    """
+    SQLite store of audit records, one row per asset and node.
+
+    Every metric is indexed so threshold queries do not scan the table.
+    Can be used as a context manager that closes the database on exit.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        for statement in _SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM pivots').fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        self.connection.close()
+
+    def add(self, records):
+        """
+        Inserts records, replacing earlier records of the same asset and
+        node, and commits them.
+        """
+
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO pivots VALUES ({0})'.format(', '.join('?' * len(_COLUMNS))),
+            [tuple(record[column] for column in _COLUMNS) for record in records])
+        self.connection.commit()
+
+    def deviating(self, metric='bottom', above=0.0, limit=None):
+        """
+        Returns the records whose distance to the target of a metric is
+        greater than above, the largest first.
+        """
+
+        if metric not in METRICS:
+            raise ValueError('Unsupported metric: {0}'.format(metric))
+
+        query = 'SELECT {0} FROM pivots WHERE {1} > ? ORDER BY {1} DESC'.format(
+            ', '.join(_COLUMNS), metric)
+        parameters = (above,)
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters += (limit,)
+
+        return [dict(zip(_COLUMNS, row)) for row in self.connection.execute(query, parameters)]
+
+
+def scan_obj_files(source, store, up_axis='y', processes=None, chunksize=16, vertex_cache=None):
+    """
+    Audits every OBJ file under source in parallel, adds the records to
+    an AuditStore and returns the errors as (relative path, message) pairs.
+
+    vertex_cache is an optional directory of vertex cache files the bounds
+    are read from, see vertex_cache.VertexCache.
+    """
+
+    tasks = [
+        (relative_path, os.path.join(source, relative_path), up_axis, vertex_cache)
+        for relative_path in batch.find_obj_files(source)]
+
+    errors = []
+    if not tasks:
+        return errors
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for relative_path, records, message in pool.imap_unordered(
+                _audit_obj_task, tasks, chunksize):
+            if records is None:
+                errors.append((relative_path, message))
+            else:
+                store.add(records)
+    finally:
+        pool.close()
+        pool.join()
+
+    return errors
+
+
+def main(argv=None):
+    """
+    Command line entry point, returns the process exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='Audit the pivots of OBJ files.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    scan_parser = subparsers.add_parser('scan', help='audit a directory tree of OBJ files')
+    scan_parser.add_argument('source', help='directory searched for OBJ files')
+    scan_parser.add_argument('store', help='audit database the records are written to')
+    scan_parser.add_argument('--up-axis', choices=('y', 'z'), default='y')
+    scan_parser.add_argument(
+        '--processes', type=int, default=None,
+        help='number of worker processes, defaults to the number of CPUs')
+    scan_parser.add_argument(
+        '--vertex-cache', default=None,
+        help='directory the parsed vertices of the sources are cached in')
+
+    query_parser = subparsers.add_parser('query', help='list the assets past a tolerance')
+    query_parser.add_argument('store', help='audit database')
+    query_parser.add_argument('--metric', choices=METRICS, default='bottom')
+    query_parser.add_argument(
+        '--above', type=float, default=0.0, help='tolerance in scene units')
+    query_parser.add_argument('--limit', type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'scan':
+        with AuditStore(args.store) as store:
+            errors = scan_obj_files(
+                args.source, store, args.up_axis, args.processes,
+                vertex_cache=args.vertex_cache)
+            print('audited: {0}'.format(len(store)))
+        for relative_path, message in errors:
+            print('error: {0}: {1}'.format(relative_path, message))
+        return 1 if errors else 0
+
+    if args.command == 'query':
+        with AuditStore(args.store) as store:
+            for record in store.deviating(args.metric, args.above, args.limit):
+                print('{0}\t{1}\t{2:.6g}'.format(record['asset'], record['node'], record[args.metric]))
+        return 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Scene backends the pivot functions run against.
+
+The functions in core never talk to the host directly, they are given a
+backend or use the current one returned by get_backend. MayaBackend is
+created on first use so importing the package does not require Maya,
+MemoryScene is a stand-in scene for headless runs, tests and benchmarks.
+OpenMayaBackend reads geometry through the OpenMaya 2.0 API and can be
+set as the current backend to skip the command layer.
+"""
+
+from .base import SceneBackend
+from .mayacmds import MayaBackend
+from .memory import MemoryScene
+from .openmaya import OpenMayaBackend
+
+_current_backend = None
+
+
+def get_backend(backend=None):
+    """
+    Returns backend if one is given, otherwise the current backend.
+
+    When no backend was set a MayaBackend is created and becomes the
+    current backend.
+    """
+
+    global _current_backend # pylint: disable=global-statement
+
+    if backend is not None:
+        return backend
+
+    if _current_backend is None:
+        _current_backend = MayaBackend()
+
+    return _current_backend
+
+
+def current_backend():
+    """
+    Returns the backend set with set_backend, None when the default Maya
+    backend is used.
+    """
+
+    return _current_backend
+
+
+def set_backend(backend):
+    """
+    Sets the backend used when no backend is given to a function.
+
+    Passing None restores the default Maya backend on next use.
+    """
+
+    global _current_backend # pylint: disable=global-statement
+
+    _current_backend = backend
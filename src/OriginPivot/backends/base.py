@@ -0,0 +1,384 @@
+"""
+Interface every scene backend implements.
+"""
+
+import contextlib
+
+
+class SceneBackend(object):
+    """
+    Operations the pivot functions need from a host scene.
+
+    Positions are world space xyz triplets and bounding boxes use the
+    layout of exactWorldBoundingBox: xmin, ymin, zmin, xmax, ymax, zmax.
+
+    The bulk methods default to looping over their single object
+    counterparts, backends that can answer them in fewer host calls
+    override them.
+
+    Backends implementing local_matrices, object_pivots, object_points,
+    set_object_points and reset_transforms can have edit plans freeze
+    meshes with baking.freeze_transforms by setting bake_freezes.
+    """
+
+    # whether edit plans freeze through baking.freeze_transforms
+    bake_freezes = False
+
+    def selection(self):
+        """
+        Returns the names of the selected objects in selection order.
+        """
+
+        raise NotImplementedError
+
+    def select(self, nodes):
+        """
+        Replaces the selection with nodes, an empty list clears it.
+        """
+
+        raise NotImplementedError
+
+    def object_type(self, node):
+        """
+        Returns the type name of a node.
+        """
+
+        raise NotImplementedError
+
+    def is_type(self, node, type_name):
+        """
+        Returns whether a node is of the given type.
+        """
+
+        return self.object_type(node) == type_name
+
+    def up_axis(self):
+        """
+        Returns the up axis of the scene, either 'y' or 'z'.
+        """
+
+        raise NotImplementedError
+
+    def world_bounding_box(self, nodes):
+        """
+        Returns the exact world bounding box enclosing nodes and their
+        descendants.
+        """
+
+        raise NotImplementedError
+
+    def world_bounding_boxes(self, nodes):
+        """
+        Returns the exact world bounding box of every node and its
+        descendants.
+        """
+
+        return [self.world_bounding_box([node]) for node in nodes]
+
+    def shape_bounds(self, nodes):
+        """
+        Returns the exact world bounding box of the shapes directly below
+        every node, leaving out its descendant transforms, or None for a
+        node without shapes.
+        """
+
+        raise NotImplementedError
+
+    def geometry_keys(self, nodes):
+        """
+        Returns a hashable key of the object space geometry of every node,
+        equal for nodes sharing identical or instanced geometry, or None
+        for nodes that have descendant transforms or more or less than one
+        mesh shape.
+        """
+
+        raise NotImplementedError
+
+    def world_matrices(self, nodes):
+        """
+        Returns the 4x4 row vector matrix from the object space of every
+        node to world space.
+        """
+
+        raise NotImplementedError
+
+    def world_points(self, nodes):
+        """
+        Returns the world space vertex positions of every node and its
+        descendants as a list of (V, 3) arrays.
+        """
+
+        raise NotImplementedError
+
+    def world_triangles(self, nodes):
+        """
+        Returns the world space triangles of the meshes of every node and
+        its descendants as a list of (T, 3, 3) arrays, one row of three
+        corners per triangle.
+        """
+
+        raise NotImplementedError
+
+    def fingerprint(self, node):
+        """
+        Returns a cheap hashable summary of a node's geometry and transform
+        state that changes when its world bounds are likely to change.
+        """
+
+        raise NotImplementedError
+
+    def fingerprints(self, nodes):
+        """
+        Returns the fingerprint of every node.
+        """
+
+        return [self.fingerprint(node) for node in nodes]
+
+    def world_pivot(self, node):
+        """
+        Returns the world space position of a node's rotate pivot.
+        """
+
+        raise NotImplementedError
+
+    def world_pivots(self, nodes):
+        """
+        Returns the world space pivot of every node.
+        """
+
+        return [self.world_pivot(node) for node in nodes]
+
+    def set_world_pivot(self, nodes, position):
+        """
+        Moves the pivots of nodes to a world space position without
+        moving the nodes.
+        """
+
+        raise NotImplementedError
+
+    def set_world_pivots(self, nodes, positions):
+        """
+        Moves the pivot of every node to its own world space position.
+        """
+
+        for node, position in zip(nodes, positions):
+            self.set_world_pivot([node], position)
+
+    def set_world_translation(self, node, position):
+        """
+        Sets the world space translation of a node.
+        """
+
+        raise NotImplementedError
+
+    def set_world_translations(self, nodes, positions):
+        """
+        Sets the world space translation of every node.
+        """
+
+        for node, position in zip(nodes, positions):
+            self.set_world_translation(node, position)
+
+    def freeze(self, nodes):
+        """
+        Freezes the translation, rotation and scale of nodes and their
+        descendants while keeping the pivots in place.
+        """
+
+        raise NotImplementedError
+
+    def local_matrices(self, nodes):
+        """
+        Returns the 4x4 row vector matrix from the object space of every
+        node to the space of its parent.
+        """
+
+        raise NotImplementedError
+
+    def object_pivots(self, nodes):
+        """
+        Returns the object space rotate pivot of every node.
+        """
+
+        raise NotImplementedError
+
+    def object_points(self, nodes):
+        """
+        Returns the object space points of the mesh shapes directly below
+        every node as a list of (V, 3) arrays, None for nodes without a
+        mesh.
+        """
+
+        raise NotImplementedError
+
+    def set_object_points(self, nodes, points):
+        """
+        Replaces the object space points of the mesh shapes directly below
+        every node, points are laid out as returned by object_points.
+        """
+
+        raise NotImplementedError
+
+    def reset_transforms(self, nodes, pivots):
+        """
+        Resets the translation, rotation and scale of every node to
+        identity and sets its rotate and scale pivots to an object space
+        position without compensating for the move.
+        """
+
+        raise NotImplementedError
+
+    def joint_position(self, joint):
+        """
+        Returns the world space position of a joint.
+        """
+
+        raise NotImplementedError
+
+    def joint_positions(self, joints):
+        """
+        Returns the world space position of every joint.
+        """
+
+        return [self.joint_position(joint) for joint in joints]
+
+    def parent(self, node):
+        """
+        Returns the name of a node's parent or None for top level nodes.
+        """
+
+        raise NotImplementedError
+
+    def parents(self, nodes):
+        """
+        Returns the parent of every node.
+        """
+
+        return [self.parent(node) for node in nodes]
+
+    def children(self, node):
+        """
+        Returns the names of the transforms directly below a node.
+        """
+
+        raise NotImplementedError
+
+    def hierarchy(self, nodes):
+        """
+        Returns a dict mapping nodes and every one of their descendant
+        transforms to the list of their child transforms.
+        """
+
+        children = {}
+        pending = list(nodes)
+        while pending:
+            node = pending.pop()
+            if node not in children:
+                children[node] = self.children(node)
+                pending.extend(children[node])
+
+        return children
+
+    def world_rotation(self, node):
+        """
+        Returns the world space XYZ rotation of a node in degrees.
+        """
+
+        raise NotImplementedError
+
+    def component_positions(self, components):
+        """
+        Returns the world space positions of the vertices of a component
+        selection as a flat list of coordinates.
+
+        Faces and edges are converted to their vertices.
+        """
+
+        raise NotImplementedError
+
+    def pin_manip_pivot(self, pinned):
+        """
+        Pins or unpins the pivot of the manipulator.
+        """
+
+        raise NotImplementedError
+
+    def manip_pivot(self):
+        """
+        Returns the world space position and XYZ orientation in degrees of
+        the manipulator pivot.
+        """
+
+        raise NotImplementedError
+
+    def create_joint(self, position, name=None, orientation=None, parent=None):
+        """
+        Creates a joint at a world space position and returns its name.
+
+        orientation is the XYZ joint orient of the joint in degrees and
+        parent a joint to create the joint under.
+        """
+
+        raise NotImplementedError
+
+    def create_joints(self, positions, names=None, parents=None):
+        """
+        Creates a joint at every world space position and returns their
+        names.
+
+        names holds the name of every joint and parents the index of an
+        earlier joint of the batch to create every joint under, or None.
+        """
+
+        names = names or [None] * len(positions)
+        parents = parents or [None] * len(positions)
+
+        joints = []
+        for position, name, parent in zip(positions, names, parents):
+            joints.append(self.create_joint(
+                position, name=name, parent=None if parent is None else joints[parent]))
+
+        return joints
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name='OriginPivot'):
+        """
+        Groups the edits made inside the context into one undo step.
+        """
+
+        yield
+
+    def undo(self):
+        """
+        Undoes the last undo chunk.
+        """
+
+        raise NotImplementedError
+
+    def undo_name(self):
+        """
+        Returns the name of the undo step undo would revert, None when
+        there is nothing to undo.
+        """
+
+        raise NotImplementedError
+
+    def process_events(self):
+        """
+        Lets the host process its pending UI events, called between the
+        chunks of long running operations.
+        """
+
+    def error(self, message):
+        """
+        Reports an error to the user.
+        """
+
+        raise NotImplementedError
+
+    def warning(self, message):
+        """
+        Reports a warning to the user.
+        """
+
+        raise NotImplementedError
@@ -0,0 +1,352 @@
+"""
+Scene backend running inside Maya through maya.cmds.
+"""
+
+import contextlib
+
+from .base import SceneBackend
+
+
+class MayaBackend(SceneBackend):
+    """
+    Backend issuing maya.cmds commands.
+
+    maya.cmds is imported when the backend is created so that the rest of
+    the package can be imported without Maya. Any object exposing the same
+    commands can be given as cmds.
+
+    Nodes are returned as full DAG paths, short names are ambiguous and
+    would not match the keys of the bounds caches.
+
+    bake_freezes has edit plans freeze through baking.freeze_transforms
+    instead of makeIdentity, only for scenes of meshes.
+    """
+
+    def __init__(self, cmds=None, bake_freezes=False):
+        if cmds is None:
+            import maya.cmds as cmds # pylint: disable=import-error
+
+        self.cmds = cmds
+        self.bake_freezes = bake_freezes
+
+    def selection(self):
+        return self.cmds.ls(sl=True, long=True) or []
+
+    def select(self, nodes):
+        if nodes:
+            self.cmds.select(nodes, r=True)
+        else:
+            self.cmds.select(cl=True)
+
+    def object_type(self, node):
+        return self.cmds.objectType(node)
+
+    def is_type(self, node, type_name):
+        return self.cmds.objectType(node, isType=type_name)
+
+    def up_axis(self):
+        return self.cmds.upAxis(q=True, axis=True)
+
+    def world_bounding_box(self, nodes):
+        return self.cmds.exactWorldBoundingBox(nodes)
+
+    def world_bounding_boxes(self, nodes):
+        return [self.cmds.exactWorldBoundingBox(node) for node in nodes]
+
+    def shape_bounds(self, nodes):
+        bounds = []
+        for node in nodes:
+            shapes = self.cmds.listRelatives(
+                node, shapes=True, noIntermediate=True, fullPath=True)
+            bounds.append(self.cmds.exactWorldBoundingBox(shapes) if shapes else None)
+
+        return bounds
+
+    def geometry_keys(self, nodes):
+        keys = []
+        for node in nodes:
+            if self.cmds.listRelatives(node, children=True, type='transform'):
+                keys.append(None)
+                continue
+
+            # instances share their shape node and its uuid, duplicated
+            # geometry is not recognized without reading every vertex
+            shapes = self.cmds.listRelatives(
+                node, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+            keys.append(self.cmds.ls(shapes[0], uuid=True)[0] if len(shapes) == 1 else None)
+
+        return keys
+
+    def world_matrices(self, nodes):
+        return [
+            [self.cmds.xform(node, q=True, ws=True, m=True)[row * 4:row * 4 + 4] for row in range(4)]
+            for node in nodes]
+
+    def object_points(self, nodes):
+        import numpy as np # pylint: disable=import-error
+
+        points = []
+        for node in nodes:
+            shapes = self.cmds.listRelatives(
+                node, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+            if not shapes:
+                points.append(None)
+                continue
+            positions = []
+            for shape in shapes:
+                positions.extend(self.cmds.xform(
+                    '{0}.vtx[*]'.format(shape), q=True, os=True, t=True))
+            points.append(np.array(positions, dtype=np.float64).reshape(-1, 3))
+
+        return points
+
+    def world_points(self, nodes):
+        import numpy as np # pylint: disable=import-error
+
+        points = []
+        for node in nodes:
+            shapes = self.cmds.listRelatives(
+                node, allDescendents=True, type='mesh', noIntermediate=True, fullPath=True) or []
+            positions = []
+            for shape in shapes:
+                positions.extend(self.cmds.xform(
+                    '{0}.vtx[*]'.format(shape), q=True, ws=True, t=True))
+            points.append(np.array(positions, dtype=np.float64).reshape(-1, 3))
+
+        return points
+
+    def world_triangles(self, nodes):
+        import numpy as np # pylint: disable=import-error
+
+        triangles = []
+        for node in nodes:
+            shapes = self.cmds.listRelatives(
+                node, allDescendents=True, type='mesh', noIntermediate=True, fullPath=True) or []
+            corners = []
+            for shape in shapes:
+                positions = np.array(self.cmds.xform(
+                    '{0}.vtx[*]'.format(shape), q=True, ws=True, t=True),
+                    dtype=np.float64).reshape(-1, 3)
+
+                # every face is split into a fan of triangles around its first vertex
+                indices = []
+                for face in self.cmds.polyInfo(shape, faceToVertex=True) or []:
+                    vertices = [int(value) for value in face.split(':')[1].split()]
+                    indices.extend(
+                        (vertices[0], vertices[index], vertices[index + 1])
+                        for index in range(1, len(vertices) - 1))
+
+                if indices:
+                    corners.append(positions[np.array(indices)])
+
+            triangles.append(np.concatenate(corners) if corners else np.empty((0, 3, 3)))
+
+        return triangles
+
+    def fingerprint(self, node):
+        return self.fingerprints([node])[0]
+
+    def fingerprints(self, nodes):
+        # the world pivot of every node, which nodes without geometry are
+        # reduced to, and the world matrix and object space bounds of every
+        # shape below it, which change when vertices or any transform of
+        # the hierarchy move. Maya keeps the bounds of shapes up to date so
+        # reading them does not visit the vertices.
+        fingerprints = []
+        for node in nodes:
+            shapes = self.cmds.listRelatives(
+                node, allDescendents=True, type='geometryShape',
+                noIntermediate=True, fullPath=True) or []
+            fingerprints.append((
+                tuple(self.cmds.xform(node, q=True, ws=True, piv=True)[:3]),
+                tuple(
+                    (shape,
+                     tuple(self.cmds.getAttr('{0}.worldMatrix[0]'.format(shape))),
+                     tuple(self.cmds.getAttr('{0}.boundingBoxMin'.format(shape))[0]),
+                     tuple(self.cmds.getAttr('{0}.boundingBoxMax'.format(shape))[0]))
+                    for shape in shapes)))
+
+        return fingerprints
+
+    def world_pivot(self, node):
+        # piv returns the rotate pivot followed by the scale pivot
+        return self.cmds.xform(node, q=True, ws=True, piv=True)[:3]
+
+    def world_pivots(self, nodes):
+        return [self.cmds.xform(node, q=True, ws=True, piv=True)[:3] for node in nodes]
+
+    def set_world_pivot(self, nodes, position):
+        self.cmds.xform(nodes, piv=list(position), ws=True)
+
+    def set_world_translation(self, node, position):
+        self.cmds.xform(node, translate=list(position), ws=True)
+
+    def set_world_translations(self, nodes, positions):
+        for node, position in zip(nodes, positions):
+            self.cmds.xform(node, translate=list(position), ws=True)
+
+    def freeze(self, nodes):
+        self.cmds.makeIdentity(
+            nodes, translate=True, rotate=True, scale=True,
+            apply=True, normal=False, pn=True)
+
+    def local_matrices(self, nodes):
+        import numpy as np # pylint: disable=import-error
+
+        # the matrix attribute holds every transform attribute, pivots,
+        # rotate axis and joint orient included, in row vector order
+        return [
+            np.array(self.cmds.getAttr('{0}.matrix'.format(node)), dtype=np.float64).reshape(4, 4)
+            for node in nodes]
+
+    def object_pivots(self, nodes):
+        return [list(self.cmds.getAttr('{0}.rotatePivot'.format(node))[0]) for node in nodes]
+
+    def set_object_points(self, nodes, points):
+        import numpy as np # pylint: disable=import-error
+
+        for node, node_points in zip(nodes, points):
+            node_points = np.asarray(node_points, dtype=np.float64).reshape(-1, 3)
+            shapes = self.cmds.listRelatives(
+                node, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+
+            start = 0
+            for shape in shapes:
+                current = np.array(self.cmds.xform(
+                    '{0}.vtx[*]'.format(shape), q=True, os=True, t=True),
+                    dtype=np.float64).reshape(-1, 3)
+                if not len(current):
+                    continue
+                end = start + len(current)
+
+                # the points are moved through their tweaks with setAttr,
+                # which unlike MFnMesh.setPoints is recorded for undo
+                plug = '{0}.pnts[0:{1}]'.format(shape, len(current) - 1)
+                tweaks = np.array(self.cmds.getAttr(plug), dtype=np.float64).reshape(-1, 3)
+                tweaks += node_points[start:end] - current
+                self.cmds.setAttr(plug, *tweaks.ravel().tolist(), type='float3')
+
+                start = end
+
+    def reset_transforms(self, nodes, pivots):
+        for node, pivot in zip(nodes, pivots):
+            self.cmds.setAttr('{0}.translate'.format(node), 0.0, 0.0, 0.0)
+            self.cmds.setAttr('{0}.rotate'.format(node), 0.0, 0.0, 0.0)
+            self.cmds.setAttr('{0}.scale'.format(node), 1.0, 1.0, 1.0)
+            self.cmds.setAttr('{0}.shear'.format(node), 0.0, 0.0, 0.0)
+            self.cmds.setAttr('{0}.rotateAxis'.format(node), 0.0, 0.0, 0.0)
+            if self.cmds.objectType(node, isType='joint'):
+                self.cmds.setAttr('{0}.jointOrient'.format(node), 0.0, 0.0, 0.0)
+            for attribute in ('rotatePivotTranslate', 'scalePivotTranslate'):
+                self.cmds.setAttr('{0}.{1}'.format(node, attribute), 0.0, 0.0, 0.0)
+            for attribute in ('rotatePivot', 'scalePivot'):
+                self.cmds.setAttr('{0}.{1}'.format(node, attribute), *pivot)
+
+    def joint_position(self, joint):
+        return self.cmds.joint(joint, q=True, p=True)
+
+    def parent(self, node):
+        parents = self.cmds.listRelatives(node, parent=True, fullPath=True)
+
+        return parents[0] if parents else None
+
+    def children(self, node):
+        return self.cmds.listRelatives(
+            node, children=True, type='transform', fullPath=True) or []
+
+    def hierarchy(self, nodes):
+        children = {}
+        for node in nodes:
+            children.setdefault(self.cmds.ls(node, long=True)[0], [])
+
+            # one query lists the whole subtree, the parent of every
+            # descendant is read from its full path which sorts after the
+            # path of its parent
+            descendants = self.cmds.listRelatives(
+                node, allDescendents=True, type='transform', fullPath=True) or []
+            for path in sorted(descendants):
+                children.setdefault(path, [])
+                children[path.rpartition('|')[0]].append(path)
+
+        return children
+
+    def world_rotation(self, node):
+        return self.cmds.xform(node, q=True, ws=True, ro=True)
+
+    def component_positions(self, components):
+        vertices = self.cmds.polyListComponentConversion(components, toVertex=True)
+        if not vertices:
+            return []
+
+        # a single query returns the positions of every vertex
+        return self.cmds.xform(vertices, q=True, ws=True, t=True)
+
+    def pin_manip_pivot(self, pinned):
+        self.cmds.manipPivot(pinPivot=pinned)
+
+    def manip_pivot(self):
+        return (
+            self.cmds.manipPivot(q=True, p=True)[0],
+            self.cmds.manipPivot(q=True, o=True)[0])
+
+    def create_joint(self, position, name=None, orientation=None, parent=None):
+        kwargs = {'name': name} if name else {}
+        if orientation is not None:
+            kwargs['orientation'] = list(orientation)
+
+        # joint creates the new joint under the selected one
+        if parent is not None:
+            self.cmds.select(parent, r=True)
+
+        self.cmds.joint(position=list(position), rotate=True, **kwargs)
+
+        # joint selects the joint it creates
+        return self.cmds.ls(sl=True, long=True)[0]
+
+    def create_joints(self, positions, names=None, parents=None):
+        names = names or [None] * len(positions)
+        parents = parents or [None] * len(positions)
+
+        joints = []
+        for position, name, parent in zip(positions, names, parents):
+            # joint selects the joint it creates, the next one would be
+            # created under it
+            if parent is None:
+                self.cmds.select(cl=True)
+            else:
+                self.cmds.select(joints[parent], r=True)
+
+            kwargs = {'name': name} if name else {}
+            self.cmds.joint(position=list(position), **kwargs)
+
+            # full paths stay unique when joints share a name
+            joints.append(self.cmds.ls(sl=True, long=True)[0])
+
+        return joints
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name='OriginPivot'):
+        self.cmds.undoInfo(openChunk=True, chunkName=name)
+        try:
+            yield
+        finally:
+            self.cmds.undoInfo(closeChunk=True)
+
+    def undo(self):
+        self.cmds.undo()
+
+    def undo_name(self):
+        return self.cmds.undoInfo(q=True, undoName=True) or None
+
+    def process_events(self):
+        import maya.utils # pylint: disable=import-error
+
+        maya.utils.processIdleEvents()
+
+    def error(self, message):
+        self.cmds.confirmDialog(
+            title='Error', message=message,
+            button=['OK'], defaultButton='Yes', messageAlign='center')
+
+    def warning(self, message):
+        self.cmds.warning(message)
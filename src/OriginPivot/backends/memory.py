@@ -0,0 +1,661 @@
+"""
+Pure Python stand-in scene used to run the pivot functions without Maya.
+
+The scene follows Maya's conventions closely enough for the functions in
+core to behave the same way they do in Maya: row vector matrices, XYZ
+rotation order in degrees, pivots stored in object space and freezing
+that bakes transforms into the points of a node and its descendants while
+keeping pivots in place.
+
+Edits made inside an undo chunk can be undone, edits made outside of one
+are not recorded.
+"""
+
+import collections
+import contextlib
+import copy
+import hashlib
+import re
+
+import numpy as np # pylint: disable=import-error
+
+from .. import geometry
+from .base import SceneBackend
+
+
+def _translation_matrix(offset):
+    matrix = np.identity(4)
+    matrix[3, :3] = offset
+
+    return matrix
+
+
+def _rotation_matrix(rotate):
+    rx, ry, rz = np.radians(rotate)
+    cx, sx = np.cos(rx), np.sin(rx)
+    cy, sy = np.cos(ry), np.sin(ry)
+    cz, sz = np.cos(rz), np.sin(rz)
+
+    x_matrix = np.array([[1, 0, 0], [0, cx, sx], [0, -sx, cx]])
+    y_matrix = np.array([[cy, 0, -sy], [0, 1, 0], [sy, 0, cy]])
+    z_matrix = np.array([[cz, sz, 0], [-sz, cz, 0], [0, 0, 1]])
+
+    return x_matrix.dot(y_matrix).dot(z_matrix)
+
+
+def _euler_angles(matrix):
+    """
+    Returns the XYZ rotation in degrees of the 3x3 part of a matrix.
+    """
+
+    rows = matrix[:3, :3] / np.linalg.norm(matrix[:3, :3], axis=1)[:, np.newaxis]
+    ry = np.arcsin(np.clip(-rows[0, 2], -1.0, 1.0))
+
+    if abs(np.cos(ry)) > 1e-9:
+        rx = np.arctan2(rows[1, 2], rows[2, 2])
+        rz = np.arctan2(rows[0, 1], rows[0, 0])
+    else:
+        # gimbal lock, the z rotation is folded into x
+        rx = np.arctan2(-rows[2, 1], rows[1, 1])
+        rz = 0.0
+
+    return np.degrees([rx, ry, rz])
+
+
+def split_component(component):
+    """
+    Returns the node of a selection string and the slice of vertices it
+    selects, or None when it selects the whole node.
+
+    The stand-in scene has no topology, only vertices can be selected.
+    """
+
+    node, _, name = component.partition('.')
+    if not name:
+        return node, None
+
+    match = re.match(r'vtx\[(\*|\d+)(?::(\d+))?\]$', name)
+    if match is None:
+        raise ValueError('Unsupported component: {0}'.format(component))
+
+    start, end = match.groups()
+    if start == '*':
+        return node, slice(None)
+
+    return node, slice(int(start), int(end or start) + 1)
+
+
+def _transform_points(points, matrix):
+    return points.dot(matrix[:3, :3]) + matrix[3, :3]
+
+
+class Node(object):
+    """
+    A transform of the stand-in scene with its optional shape points.
+
+    points are in object space, faces the optional (F, 3) vertex indices
+    of the triangles of the shape, pivot is the object space rotate and
+    scale pivot and pivot_offset the translation Maya adds to keep an
+    object in place when its pivot moves.
+    """
+
+    def __init__(self, name, node_type='transform', parent=None, points=None, faces=None):
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.children = []
+        self.points = None if points is None else np.array(points, dtype=np.float64).reshape(-1, 3)
+        self.faces = None if faces is None else np.array(faces, dtype=np.int64).reshape(-1, 3)
+        self.translate = np.zeros(3)
+        self.rotate = np.zeros(3)
+        self.scale = np.ones(3)
+        self.pivot = np.zeros(3)
+        self.pivot_offset = np.zeros(3)
+        # incremented every time the node is edited
+        self.version = 0
+
+    def linear(self):
+        """
+        Returns the 3x3 scale and rotation part of the local matrix.
+        """
+
+        return np.diag(self.scale).dot(_rotation_matrix(self.rotate))
+
+    def local_matrix(self):
+        """
+        Returns the 4x4 matrix from object space to parent space.
+        """
+
+        matrix = np.identity(4)
+        matrix[:3, :3] = self.linear()
+
+        return _translation_matrix(-self.pivot).dot(matrix).dot(
+            _translation_matrix(self.pivot + self.pivot_offset + self.translate))
+
+
+class MemoryScene(SceneBackend):
+    """
+    In-memory scene implementing the backend interface.
+
+    Every interface call is counted in calls so that the number of host
+    round trips an operation makes can be measured. Errors and warnings
+    are collected in messages instead of opening dialogs.
+    """
+
+    def __init__(self, up_axis='y'):
+        self.nodes = collections.OrderedDict()
+        self.calls = collections.Counter()
+        self.messages = []
+        self._selection = []
+        self._up_axis = up_axis
+        self.manip_position = (0.0, 0.0, 0.0)
+        self.manip_orientation = (0.0, 0.0, 0.0)
+        self.manip_pinned = False
+        # selection, node states and name of the open undo chunk
+        self._undo_record = None
+        self._undo_depth = 0
+        self._undo_stack = []
+
+    # scene construction
+
+    def _unique_name(self, name):
+        if name not in self.nodes:
+            return name
+
+        base = name.rstrip('0123456789')
+        index = 1
+        while '{0}{1}'.format(base, index) in self.nodes:
+            index += 1
+
+        return '{0}{1}'.format(base, index)
+
+    def add_node(self, name, node_type='transform', parent=None, points=None,
+                 translate=None, rotate=None, scale=None, faces=None):
+        """
+        Adds a node to the scene and returns its name.
+        """
+
+        name = self._unique_name(name)
+        node = Node(name, node_type=node_type, parent=parent, points=points, faces=faces)
+
+        if translate is not None:
+            node.translate = np.array(translate, dtype=np.float64)
+        if rotate is not None:
+            node.rotate = np.array(rotate, dtype=np.float64)
+        if scale is not None:
+            node.scale = np.array(scale, dtype=np.float64)
+
+        if parent is not None:
+            self._record_undo(parent)
+            self.nodes[parent].children.append(name)
+
+        self._record_undo(name)
+        self.nodes[name] = node
+
+        return name
+
+    def add_mesh(self, name, points, parent=None, translate=None, rotate=None, scale=None,
+                 faces=None):
+        """
+        Adds a transform with object space points, and optionally the
+        vertex indices of its triangles, and returns its name.
+        """
+
+        return self.add_node(
+            name, points=points, parent=parent,
+            translate=translate, rotate=rotate, scale=scale, faces=faces)
+
+    def add_joint(self, name, position, parent=None, orientation=None):
+        """
+        Adds a joint at a parent space position and returns its name.
+
+        The joint orient is stored as the rotation of the node.
+        """
+
+        return self.add_node(
+            name, node_type='joint', parent=parent, translate=position, rotate=orientation)
+
+    def _record_undo(self, node):
+        """
+        Saves the state of a node before its first edit in the open undo
+        chunk, None for a node that does not exist yet.
+        """
+
+        if self._undo_record is None or node in self._undo_record[1]:
+            return
+
+        self._undo_record[1][node] = copy.deepcopy(self.nodes.get(node))
+
+    # scene queries that are not part of the backend interface
+
+    def world_matrix(self, node):
+        """
+        Returns the 4x4 matrix from a node's object space to world space.
+        """
+
+        matrix = self.nodes[node].local_matrix()
+        parent = self.nodes[node].parent
+
+        while parent is not None:
+            matrix = matrix.dot(self.nodes[parent].local_matrix())
+            parent = self.nodes[parent].parent
+
+        return matrix
+
+    def parent_matrix(self, node):
+        """
+        Returns the world matrix of a node's parent.
+        """
+
+        parent = self.nodes[node].parent
+
+        return np.identity(4) if parent is None else self.world_matrix(parent)
+
+    def descendants(self, node):
+        """
+        Returns a node and all of its descendants, parents first.
+        """
+
+        result = [node]
+        for child in self.nodes[node].children:
+            result.extend(self.descendants(child))
+
+        return result
+
+    def shape_points(self, node):
+        """
+        Returns the world space points of a node's own shape.
+        """
+
+        points = self.nodes[node].points
+        if points is None:
+            return np.empty((0, 3))
+
+        return _transform_points(points, self.world_matrix(node))
+
+    # backend interface
+
+    def selection(self):
+        self.calls['selection'] += 1
+
+        return list(self._selection)
+
+    def select(self, nodes):
+        self.calls['select'] += 1
+        self._selection = list(nodes)
+
+    def object_type(self, node):
+        self.calls['object_type'] += 1
+
+        return self.nodes[node].type
+
+    def is_type(self, node, type_name):
+        self.calls['is_type'] += 1
+
+        return self.nodes[node].type == type_name
+
+    def up_axis(self):
+        self.calls['up_axis'] += 1
+
+        return self._up_axis
+
+    def world_bounding_box(self, nodes):
+        self.calls['world_bounding_box'] += 1
+
+        points = [
+            self.shape_points(descendant)
+            for node in nodes
+            for descendant in self.descendants(node)]
+        points = np.concatenate(points) if points else np.empty((0, 3))
+
+        # objects without geometry are reduced to their pivots
+        if not len(points):
+            points = np.array([self._world_pivot(node) for node in nodes]).reshape(-1, 3)
+
+        return geometry.bounds_from_points(points).tolist()
+
+    def world_bounding_boxes(self, nodes):
+        self.calls['world_bounding_boxes'] += 1
+
+        bounds = []
+        for node in nodes:
+            points = [self.shape_points(descendant) for descendant in self.descendants(node)]
+            points = np.concatenate(points)
+            if not len(points):
+                points = self._world_pivot(node)[np.newaxis]
+            bounds.append(geometry.bounds_from_points(points).tolist())
+
+        return bounds
+
+    def shape_bounds(self, nodes):
+        self.calls['shape_bounds'] += 1
+
+        bounds = []
+        for node in nodes:
+            points = self.shape_points(node)
+            if len(points):
+                bounds.append(geometry.bounds_from_points(points).tolist())
+            else:
+                bounds.append(None)
+
+        return bounds
+
+    def geometry_keys(self, nodes):
+        self.calls['geometry_keys'] += 1
+
+        keys = []
+        for node in nodes:
+            data = self.nodes[node]
+            if data.children or data.points is None:
+                keys.append(None)
+            else:
+                keys.append(hashlib.sha1(np.ascontiguousarray(data.points).tobytes()).hexdigest())
+
+        return keys
+
+    def world_matrices(self, nodes):
+        self.calls['world_matrices'] += 1
+
+        return [self.world_matrix(node) for node in nodes]
+
+    def world_points(self, nodes):
+        self.calls['world_points'] += 1
+
+        return [
+            np.concatenate([self.shape_points(descendant) for descendant in self.descendants(node)])
+            for node in nodes]
+
+    def world_triangles(self, nodes):
+        self.calls['world_triangles'] += 1
+
+        triangles = []
+        for node in nodes:
+            corners = [
+                self.shape_points(descendant)[self.nodes[descendant].faces]
+                for descendant in self.descendants(node)
+                if self.nodes[descendant].faces is not None]
+            triangles.append(np.concatenate(corners) if corners else np.empty((0, 3, 3)))
+
+        return triangles
+
+    def fingerprint(self, node):
+        self.calls['fingerprint'] += 1
+
+        return self._fingerprint(node)
+
+    def _fingerprint(self, node):
+        descendants = self.descendants(node)
+
+        return (
+            tuple(self.world_matrix(node).ravel().tolist()),
+            tuple(self.nodes[descendant].version for descendant in descendants))
+
+    def fingerprints(self, nodes):
+        self.calls['fingerprints'] += 1
+
+        return [self._fingerprint(node) for node in nodes]
+
+    def _world_pivot(self, node):
+        return _transform_points(
+            self.nodes[node].pivot[np.newaxis], self.world_matrix(node))[0]
+
+    def world_pivot(self, node):
+        self.calls['world_pivot'] += 1
+
+        return self._world_pivot(node).tolist()
+
+    def world_pivots(self, nodes):
+        self.calls['world_pivots'] += 1
+
+        if not nodes:
+            return []
+
+        # every pivot is moved by its world matrix in one batch
+        matrices = np.array([self.world_matrix(node) for node in nodes])
+        pivots = np.array([self.nodes[node].pivot for node in nodes])
+
+        return (np.einsum('ni,nij->nj', pivots, matrices[:, :3, :3]) + matrices[:, 3, :3]).tolist()
+
+    def _set_world_pivot(self, node, position):
+        self._record_undo(node)
+        data = self.nodes[node]
+        inverse = np.linalg.inv(self.world_matrix(node))
+        pivot = _transform_points(np.asarray(position, dtype=np.float64)[np.newaxis], inverse)[0]
+
+        # offsets the pivot translation so the object does not move
+        delta = pivot - data.pivot
+        data.pivot_offset = data.pivot_offset - delta + delta.dot(data.linear())
+        data.pivot = pivot
+        data.version += 1
+
+    def set_world_pivot(self, nodes, position):
+        self.calls['set_world_pivot'] += 1
+
+        for node in nodes:
+            self._set_world_pivot(node, position)
+
+    def set_world_pivots(self, nodes, positions):
+        self.calls['set_world_pivots'] += 1
+
+        for node, position in zip(nodes, positions):
+            self._set_world_pivot(node, position)
+
+    def _set_world_translation(self, node, position):
+        self._record_undo(node)
+        inverse = np.linalg.inv(self.parent_matrix(node))
+        translate = _transform_points(np.asarray(position, dtype=np.float64)[np.newaxis], inverse)[0]
+        self.nodes[node].translate = translate
+        self.nodes[node].version += 1
+
+    def set_world_translation(self, node, position):
+        self.calls['set_world_translation'] += 1
+        self._set_world_translation(node, position)
+
+    def set_world_translations(self, nodes, positions):
+        self.calls['set_world_translations'] += 1
+
+        for node, position in zip(nodes, positions):
+            self._set_world_translation(node, position)
+
+    def freeze(self, nodes):
+        self.calls['freeze'] += 1
+
+        targets = collections.OrderedDict()
+        for node in nodes:
+            for descendant in self.descendants(node):
+                targets[descendant] = True
+
+        # matrices to the space of the closest ancestor that is not frozen,
+        # computed before any node is modified
+        matrices = {}
+        for node in targets:
+            matrix = self.nodes[node].local_matrix()
+            parent = self.nodes[node].parent
+            while parent in targets:
+                matrix = matrix.dot(self.nodes[parent].local_matrix())
+                parent = self.nodes[parent].parent
+            matrices[node] = matrix
+
+        for node in targets:
+            self._record_undo(node)
+            data = self.nodes[node]
+            if data.points is not None:
+                data.points = _transform_points(data.points, matrices[node])
+            data.pivot = _transform_points(data.pivot[np.newaxis], matrices[node])[0]
+            data.translate = np.zeros(3)
+            data.rotate = np.zeros(3)
+            data.scale = np.ones(3)
+            data.pivot_offset = np.zeros(3)
+            data.version += 1
+
+    def local_matrices(self, nodes):
+        self.calls['local_matrices'] += 1
+
+        return [self.nodes[node].local_matrix() for node in nodes]
+
+    def object_pivots(self, nodes):
+        self.calls['object_pivots'] += 1
+
+        return [self.nodes[node].pivot.tolist() for node in nodes]
+
+    def object_points(self, nodes):
+        self.calls['object_points'] += 1
+
+        return [
+            None if self.nodes[node].points is None else self.nodes[node].points.copy()
+            for node in nodes]
+
+    def set_object_points(self, nodes, points):
+        self.calls['set_object_points'] += 1
+
+        for node, node_points in zip(nodes, points):
+            self._record_undo(node)
+            self.nodes[node].points = np.array(node_points, dtype=np.float64).reshape(-1, 3)
+            self.nodes[node].version += 1
+
+    def reset_transforms(self, nodes, pivots):
+        self.calls['reset_transforms'] += 1
+
+        for node, pivot in zip(nodes, pivots):
+            self._record_undo(node)
+            data = self.nodes[node]
+            data.translate = np.zeros(3)
+            data.rotate = np.zeros(3)
+            data.scale = np.ones(3)
+            data.pivot = np.array(pivot, dtype=np.float64)
+            data.pivot_offset = np.zeros(3)
+            data.version += 1
+
+    def joint_position(self, joint):
+        self.calls['joint_position'] += 1
+
+        return self._world_pivot(joint).tolist()
+
+    def joint_positions(self, joints):
+        self.calls['joint_positions'] += 1
+
+        return [self._world_pivot(joint).tolist() for joint in joints]
+
+    def parent(self, node):
+        self.calls['parent'] += 1
+
+        return self.nodes[node].parent
+
+    def parents(self, nodes):
+        self.calls['parents'] += 1
+
+        return [self.nodes[node].parent for node in nodes]
+
+    def children(self, node):
+        self.calls['children'] += 1
+
+        return list(self.nodes[node].children)
+
+    def hierarchy(self, nodes):
+        self.calls['hierarchy'] += 1
+
+        return dict(
+            (descendant, list(self.nodes[descendant].children))
+            for node in nodes
+            for descendant in self.descendants(node))
+
+    def world_rotation(self, node):
+        self.calls['world_rotation'] += 1
+
+        return _euler_angles(self.world_matrix(node)).tolist()
+
+    def component_positions(self, components):
+        self.calls['component_positions'] += 1
+
+        positions = []
+        for component in components:
+            node, indices = split_component(component)
+            points = self.shape_points(node)
+            positions.append(points if indices is None else points[indices])
+
+        return np.concatenate(positions).ravel().tolist() if positions else []
+
+    def pin_manip_pivot(self, pinned):
+        self.calls['pin_manip_pivot'] += 1
+        self.manip_pinned = pinned
+
+    def manip_pivot(self):
+        self.calls['manip_pivot'] += 1
+
+        return self.manip_position, self.manip_orientation
+
+    def create_joint(self, position, name=None, orientation=None, parent=None):
+        self.calls['create_joint'] += 1
+
+        return self._create_joint(position, name, orientation, parent)
+
+    def _create_joint(self, position, name=None, orientation=None, parent=None):
+        if parent is None:
+            return self.add_joint(name or 'joint1', position, orientation=orientation)
+
+        joint = self.add_joint(
+            name or 'joint1', [0.0, 0.0, 0.0], parent=parent, orientation=orientation)
+        self._set_world_translation(joint, position)
+
+        return joint
+
+    def create_joints(self, positions, names=None, parents=None):
+        self.calls['create_joints'] += 1
+
+        names = names or [None] * len(positions)
+        parents = parents or [None] * len(positions)
+
+        joints = []
+        for position, name, parent in zip(positions, names, parents):
+            joints.append(self._create_joint(
+                position, name, parent=None if parent is None else joints[parent]))
+
+        return joints
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name='OriginPivot'):
+        self.calls['undo_chunk'] += 1
+
+        # nested chunks are part of the outermost one
+        if not self._undo_depth:
+            self._undo_record = (list(self._selection), collections.OrderedDict(), name)
+        self._undo_depth += 1
+        try:
+            yield
+        finally:
+            self._undo_depth -= 1
+            if not self._undo_depth:
+                self._undo_stack.append(self._undo_record)
+                self._undo_record = None
+
+    def undo(self):
+        self.calls['undo'] += 1
+
+        if not self._undo_stack:
+            self.messages.append(('warning', 'There are no more commands to undo.'))
+            return
+
+        selection, states, _ = self._undo_stack.pop()
+        for node, state in reversed(list(states.items())):
+            if state is None:
+                del self.nodes[node]
+                continue
+
+            # a new version keeps fingerprints taken after the edit stale
+            state.version = self.nodes[node].version + 1
+            self.nodes[node] = state
+
+        self._selection = selection
+
+    def undo_name(self):
+        self.calls['undo_name'] += 1
+
+        return self._undo_stack[-1][2] if self._undo_stack else None
+
+    def error(self, message):
+        self.calls['error'] += 1
+        self.messages.append(('error', message))
+
+    def warning(self, message):
+        self.calls['warning'] += 1
+        self.messages.append(('warning', message))
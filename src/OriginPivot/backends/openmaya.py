@@ -0,0 +1,333 @@
+"""
+Scene backend running inside Maya through the OpenMaya 2.0 API.
+
+Geometry and transforms are read straight from the mesh shapes and
+transforms through the API, skipping the command layer and PyMEL
+altogether. Edits, and the operations the API has no direct equivalent
+for like creating joints, the manipulator and dialogs, are delegated to a
+fallback backend which defaults to a MayaBackend.
+
+Edits made through the API outside of a command plugin are not recorded
+in Maya's undo queue, going through the fallback keeps every edit of an
+undo chunk undoable together.
+"""
+
+import hashlib
+import math
+
+import numpy as np # pylint: disable=import-error
+
+from .. import geometry
+from .base import SceneBackend
+
+
+class OpenMayaBackend(SceneBackend):
+    """
+    Backend calling maya.api.OpenMaya.
+
+    maya.api.OpenMaya is imported when the backend is created, any module
+    exposing the same classes can be given as om, see openmaya_standin.
+
+    bake_freezes has edit plans freeze through baking.freeze_transforms,
+    which reads the matrices and points through the API, instead of the
+    freeze of the fallback, only for scenes of meshes.
+    """
+
+    def __init__(self, om=None, fallback=None, bake_freezes=False):
+        if om is None:
+            import maya.api.OpenMaya as om # pylint: disable=import-error
+        if fallback is None:
+            from .mayacmds import MayaBackend
+            fallback = MayaBackend()
+
+        self.om = om
+        self.fallback = fallback
+        self.bake_freezes = bake_freezes
+
+    # API helpers
+
+    def _dag_path(self, node):
+        return self.om.MSelectionList().add(node).getDagPath(0)
+
+    def _descendant_paths(self, node):
+        paths = [self._dag_path(node)]
+        index = 0
+        while index < len(paths):
+            function_set = self.om.MFnDagNode(paths[index])
+            for child_index in range(function_set.childCount()):
+                child = function_set.child(child_index)
+                # shapes are reached through numberOfShapesDirectlyBelow
+                if child.hasFn(self.om.MFn.kTransform):
+                    paths.append(self.om.MDagPath.getAPathTo(child))
+            index += 1
+
+        return paths
+
+    def _own_shape_paths(self, path):
+        shapes = []
+        for index in range(path.numberOfShapesDirectlyBelow()):
+            shape = self.om.MDagPath(path).extendToShape(index)
+            if self.om.MFnDependencyNode(shape.node()).typeName != 'mesh':
+                continue
+            if self.om.MFnDagNode(shape).isIntermediateObject:
+                continue
+            shapes.append(shape)
+
+        return shapes
+
+    def _shape_paths(self, node):
+        shapes = []
+        for path in self._descendant_paths(node):
+            shapes.extend(self._own_shape_paths(path))
+
+        return shapes
+
+    def _mesh_points(self, shape):
+        points = self.om.MFnMesh(shape).getPoints(self.om.MSpace.kWorld)
+
+        return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+    # backend interface
+
+    def selection(self):
+        return list(self.om.MGlobal.getActiveSelectionList().getSelectionStrings())
+
+    def select(self, nodes):
+        selection_list = self.om.MSelectionList()
+        for node in nodes:
+            selection_list.add(node)
+        self.om.MGlobal.setActiveSelectionList(selection_list)
+
+    def object_type(self, node):
+        return self.om.MFnDependencyNode(
+            self.om.MSelectionList().add(node).getDependNode(0)).typeName
+
+    def up_axis(self):
+        return 'z' if self.om.MGlobal.isZAxisUp() else 'y'
+
+    def world_points(self, nodes):
+        points = []
+        for node in nodes:
+            shapes = [self._mesh_points(shape) for shape in self._shape_paths(node)]
+            points.append(np.concatenate(shapes) if shapes else np.empty((0, 3)))
+
+        return points
+
+    def world_triangles(self, nodes):
+        triangles = []
+        for node in nodes:
+            corners = []
+            for shape in self._shape_paths(node):
+                _, vertices = self.om.MFnMesh(shape).getTriangles()
+                indices = np.array(vertices, dtype=np.int64).reshape(-1, 3)
+                corners.append(self._mesh_points(shape)[indices])
+            triangles.append(np.concatenate(corners) if corners else np.empty((0, 3, 3)))
+
+        return triangles
+
+    def world_bounding_box(self, nodes):
+        points = np.concatenate(self.world_points(nodes))
+        if not len(points):
+            points = np.array(self.world_pivots(nodes)).reshape(-1, 3)
+
+        return geometry.bounds_from_points(points).tolist()
+
+    def world_bounding_boxes(self, nodes):
+        bounds = []
+        for node, points in zip(nodes, self.world_points(nodes)):
+            if not len(points):
+                points = np.array([self.world_pivot(node)])
+            bounds.append(geometry.bounds_from_points(points).tolist())
+
+        return bounds
+
+    def shape_bounds(self, nodes):
+        bounds = []
+        for node in nodes:
+            shapes = self._own_shape_paths(self._dag_path(node))
+            if shapes:
+                points = np.concatenate([self._mesh_points(shape) for shape in shapes])
+                bounds.append(geometry.bounds_from_points(points).tolist())
+            else:
+                bounds.append(None)
+
+        return bounds
+
+    def geometry_keys(self, nodes):
+        keys = []
+        for node in nodes:
+            if self.children(node) or len(self._own_shape_paths(self._dag_path(node))) != 1:
+                keys.append(None)
+                continue
+
+            points = self.object_points([node])[0]
+            keys.append(hashlib.sha1(np.ascontiguousarray(points).tobytes()).hexdigest())
+
+        return keys
+
+    def world_matrices(self, nodes):
+        matrices = []
+        for node in nodes:
+            matrix = self._dag_path(node).inclusiveMatrix()
+            matrices.append(np.array([matrix[index] for index in range(16)]).reshape(4, 4))
+
+        return matrices
+
+    def fingerprint(self, node):
+        return self.fingerprints([node])[0]
+
+    def fingerprints(self, nodes):
+        # the world pivot of every node, which nodes without geometry are
+        # reduced to, and the world matrix and object space bounds of every
+        # mesh shape below it, like MayaBackend.fingerprints. The API keeps
+        # the bounds of shapes up to date so reading them does not visit
+        # the vertices.
+        fingerprints = []
+        for node in nodes:
+            shapes = []
+            for shape in self._shape_paths(node):
+                matrix = shape.inclusiveMatrix()
+                box = self.om.MFnDagNode(shape).boundingBox
+                shapes.append((
+                    shape.fullPathName(),
+                    tuple(matrix[index] for index in range(16)),
+                    (box.min.x, box.min.y, box.min.z),
+                    (box.max.x, box.max.y, box.max.z)))
+            fingerprints.append((tuple(self.world_pivot(node)), tuple(shapes)))
+
+        return fingerprints
+
+    def world_pivot(self, node):
+        pivot = self.om.MFnTransform(self._dag_path(node)).rotatePivot(self.om.MSpace.kWorld)
+
+        return [pivot.x, pivot.y, pivot.z]
+
+    def set_world_pivot(self, nodes, position):
+        self.fallback.set_world_pivot(nodes, position)
+
+    def set_world_pivots(self, nodes, positions):
+        self.fallback.set_world_pivots(nodes, positions)
+
+    def set_world_translation(self, node, position):
+        self.fallback.set_world_translation(node, position)
+
+    def set_world_translations(self, nodes, positions):
+        self.fallback.set_world_translations(nodes, positions)
+
+    def freeze(self, nodes):
+        self.fallback.freeze(nodes)
+
+    def local_matrices(self, nodes):
+        matrices = []
+        for node in nodes:
+            matrix = self.om.MFnTransform(self._dag_path(node)).transformationMatrix()
+            matrices.append(np.array([matrix[index] for index in range(16)]).reshape(4, 4))
+
+        return matrices
+
+    def object_pivots(self, nodes):
+        pivots = []
+        for node in nodes:
+            pivot = self.om.MFnTransform(self._dag_path(node)).rotatePivot(self.om.MSpace.kObject)
+            pivots.append([pivot.x, pivot.y, pivot.z])
+
+        return pivots
+
+    def object_points(self, nodes):
+        points = []
+        for node in nodes:
+            shapes = self._own_shape_paths(self._dag_path(node))
+            if not shapes:
+                points.append(None)
+                continue
+            points.append(np.concatenate([
+                np.array(self.om.MFnMesh(shape).getPoints(self.om.MSpace.kObject),
+                         dtype=np.float64).reshape(-1, 4)[:, :3]
+                for shape in shapes]))
+
+        return points
+
+    def set_object_points(self, nodes, points):
+        self.fallback.set_object_points(nodes, points)
+
+    def reset_transforms(self, nodes, pivots):
+        self.fallback.reset_transforms(nodes, pivots)
+
+    def joint_position(self, joint):
+        position = self.om.MFnTransform(self._dag_path(joint)).translation(self.om.MSpace.kWorld)
+
+        return [position.x, position.y, position.z]
+
+    def parent(self, node):
+        path = self.om.MDagPath(self._dag_path(node))
+        path.pop()
+
+        return path.partialPathName() if path.length() else None
+
+    def children(self, node):
+        function_set = self.om.MFnDagNode(self._dag_path(node))
+        children = []
+        for index in range(function_set.childCount()):
+            child = function_set.child(index)
+            if child.hasFn(self.om.MFn.kTransform):
+                children.append(self.om.MDagPath.getAPathTo(child).partialPathName())
+
+        return children
+
+    def world_rotation(self, node):
+        rotation = self.om.MTransformationMatrix(
+            self._dag_path(node).inclusiveMatrix()).rotation()
+
+        return [math.degrees(rotation.x), math.degrees(rotation.y), math.degrees(rotation.z)]
+
+    def component_positions(self, components):
+        selection_list = self.om.MSelectionList()
+        for component in components:
+            selection_list.add(component)
+
+        positions = []
+        for index in range(selection_list.length()):
+            path, component = selection_list.getComponent(index)
+
+            if component.isNull():
+                positions.extend(self.world_points([path.partialPathName()]))
+            elif component.apiType() == self.om.MFn.kMeshVertComponent:
+                elements = self.om.MFnSingleIndexedComponent(component).getElements()
+                positions.append(self._mesh_points(path)[list(elements)])
+            else:
+                # faces and edges need the topology conversion of the
+                # command layer
+                return self.fallback.component_positions(components)
+
+        return np.concatenate(positions).ravel().tolist() if positions else []
+
+    def pin_manip_pivot(self, pinned):
+        self.fallback.pin_manip_pivot(pinned)
+
+    def manip_pivot(self):
+        return self.fallback.manip_pivot()
+
+    def create_joint(self, position, name=None, orientation=None, parent=None):
+        return self.fallback.create_joint(
+            position, name=name, orientation=orientation, parent=parent)
+
+    def create_joints(self, positions, names=None, parents=None):
+        return self.fallback.create_joints(positions, names=names, parents=parents)
+
+    def undo_chunk(self, name='OriginPivot'):
+        return self.fallback.undo_chunk(name)
+
+    def undo(self):
+        self.fallback.undo()
+
+    def undo_name(self):
+        return self.fallback.undo_name()
+
+    def process_events(self):
+        self.fallback.process_events()
+
+    def error(self, message):
+        self.fallback.error(message)
+
+    def warning(self, message):
+        self.fallback.warning(message)
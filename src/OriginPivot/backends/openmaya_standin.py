@@ -0,0 +1,449 @@
+"""
+Stand-in for the subset of maya.api.OpenMaya used by OpenMayaBackend.
+
+The classes answer from a MemoryScene so the logic of the backend can run
+without Maya:
+
+    scene = MemoryScene()
+    backend = OpenMayaBackend(om=openmaya_standin.create(scene), fallback=scene)
+
+Nodes of the scene holding points stand for a transform with a single
+mesh shape below it. Only vertex components can be selected.
+"""
+
+import numpy as np # pylint: disable=import-error
+
+from .memory import _euler_angles, _transform_points, split_component
+
+
+class MSpace(object):
+    kObject = 2
+    kWorld = 4
+
+
+class MFn(object):
+    kInvalid = 0
+    kTransform = 110
+    kJoint = 121
+    kMesh = 296
+    kMeshVertComponent = 550
+
+
+class MPoint(object):
+    """
+    Homogeneous point, iterates over x, y, z and w.
+    """
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.w = float(w)
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+
+class MVector(object):
+    """
+    Vector, iterates over x, y and z.
+    """
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+
+class MPointArray(list):
+    """
+    List of MPoint built from any sequence of coordinates.
+    """
+
+    def __init__(self, points=()):
+        super(MPointArray, self).__init__(
+            point if isinstance(point, MPoint) else MPoint(*point) for point in points)
+
+
+class MBoundingBox(object):
+    """
+    Axis aligned box given by its min and max corners.
+    """
+
+    def __init__(self, minimum=None, maximum=None):
+        self.min = minimum or MPoint()
+        self.max = maximum or MPoint()
+
+
+class MEulerRotation(object):
+    """
+    XYZ rotation in radians.
+    """
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+
+class MMatrix(object):
+    """
+    4x4 row vector matrix indexed by its 16 elements in row order.
+    """
+
+    def __init__(self, matrix=None):
+        self.matrix = np.identity(4) if matrix is None else np.array(matrix, dtype=np.float64)
+
+    def __len__(self):
+        return 16
+
+    def __getitem__(self, index):
+        return float(self.matrix.flat[index])
+
+
+class MTransformationMatrix(object):
+
+    def __init__(self, matrix=None):
+        self.matrix = np.identity(4) if matrix is None else matrix.matrix
+
+    def rotation(self):
+        return MEulerRotation(*np.radians(_euler_angles(self.matrix)))
+
+
+class MObject(object):
+    """
+    Handle to a node of the scene, its pseudo mesh shape or a vertex
+    component. A handle without a scene is null.
+    """
+
+    def __init__(self, scene=None, node=None, shape=False, indices=None):
+        self.scene = scene
+        self.node = node
+        self.shape = shape
+        self.indices = indices
+
+    def isNull(self): # pylint: disable=invalid-name
+        return self.scene is None
+
+    def apiType(self): # pylint: disable=invalid-name
+        if self.scene is None:
+            return MFn.kInvalid
+        if self.indices is not None:
+            return MFn.kMeshVertComponent
+        if self.shape:
+            return MFn.kMesh
+        if self.scene.nodes[self.node].type == 'joint':
+            return MFn.kJoint
+
+        return MFn.kTransform
+
+    def hasFn(self, function_type): # pylint: disable=invalid-name
+        api_type = self.apiType()
+        if function_type == MFn.kTransform:
+            return api_type in (MFn.kTransform, MFn.kJoint)
+
+        return api_type == function_type
+
+
+class MDagPath(object):
+    """
+    Path to a node of the scene or to its pseudo mesh shape.
+    """
+
+    def __init__(self, path=None):
+        self.scene = None
+        self.node_name = None
+        self.shape = False
+        if path is not None:
+            self.scene = path.scene
+            self.node_name = path.node_name
+            self.shape = path.shape
+
+    @staticmethod
+    def getAPathTo(obj): # pylint: disable=invalid-name
+        path = MDagPath()
+        path.scene = obj.scene
+        path.node_name = obj.node
+        path.shape = obj.shape
+
+        return path
+
+    def node(self):
+        return MObject(self.scene, self.node_name, self.shape)
+
+    def _names(self):
+        names = ['{0}Shape'.format(self.node_name)] if self.shape else []
+        node = self.node_name
+        while node is not None:
+            names.insert(0, node)
+            node = self.scene.nodes[node].parent
+
+        return names
+
+    def length(self):
+        return len(self._names()) if self.node_name is not None else 0
+
+    def partialPathName(self): # pylint: disable=invalid-name
+        return self._names()[-1] if self.node_name is not None else ''
+
+    def fullPathName(self): # pylint: disable=invalid-name
+        if self.node_name is None:
+            return ''
+
+        return ''.join('|{0}'.format(name) for name in self._names())
+
+    def inclusiveMatrix(self): # pylint: disable=invalid-name
+        return MMatrix(self.scene.world_matrix(self.node_name))
+
+    def numberOfShapesDirectlyBelow(self): # pylint: disable=invalid-name
+        if self.shape or self.scene.nodes[self.node_name].points is None:
+            return 0
+
+        return 1
+
+    def extendToShape(self, index=0): # pylint: disable=invalid-name
+        if self.numberOfShapesDirectlyBelow() <= index:
+            raise RuntimeError('No shape below {0}'.format(self.partialPathName()))
+        self.shape = True
+
+        return self
+
+    def pop(self, count=1):
+        for _ in range(count):
+            if self.shape:
+                self.shape = False
+            else:
+                self.node_name = self.scene.nodes[self.node_name].parent
+
+        return self
+
+
+class MSelectionList(object):
+
+    def __init__(self, scene):
+        self.scene = scene
+        self._items = []
+
+    def add(self, name):
+        node, indices = split_component(name)
+        if node not in self.scene.nodes:
+            raise RuntimeError('No object matches name: {0}'.format(name))
+        self._items.append((name, node, indices))
+
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def getSelectionStrings(self): # pylint: disable=invalid-name
+        return [name for name, _, _ in self._items]
+
+    def getDependNode(self, index): # pylint: disable=invalid-name
+        return MObject(self.scene, self._items[index][1])
+
+    def getDagPath(self, index): # pylint: disable=invalid-name
+        return MDagPath.getAPathTo(self.getDependNode(index))
+
+    def getComponent(self, index): # pylint: disable=invalid-name
+        _, node, indices = self._items[index]
+        path = MDagPath.getAPathTo(MObject(self.scene, node))
+        if indices is None:
+            return path, MObject()
+
+        count = len(self.scene.nodes[node].points)
+        elements = list(range(*indices.indices(count)))
+
+        return path.extendToShape(), MObject(self.scene, node, True, elements)
+
+
+class MFnDependencyNode(object):
+
+    def __init__(self, obj):
+        self.object = obj
+
+    @property
+    def typeName(self): # pylint: disable=invalid-name
+        if self.object.shape:
+            return 'mesh'
+
+        return self.object.scene.nodes[self.object.node].type
+
+    def name(self):
+        if self.object.shape:
+            return '{0}Shape'.format(self.object.node)
+
+        return self.object.node
+
+
+class MFnDagNode(object):
+    """
+    Function set over a path, the pseudo shape of a node comes after its
+    transform children.
+    """
+
+    isIntermediateObject = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def _children(self):
+        if self.path.shape:
+            return []
+
+        data = self.path.scene.nodes[self.path.node_name]
+        children = [MObject(self.path.scene, child) for child in data.children]
+        if data.points is not None:
+            children.append(MObject(self.path.scene, self.path.node_name, True))
+
+        return children
+
+    def childCount(self): # pylint: disable=invalid-name
+        return len(self._children())
+
+    @property
+    def boundingBox(self): # pylint: disable=invalid-name
+        # only the object space bounds of shapes are needed
+        points = self.path.scene.nodes[self.path.node_name].points
+        if not self.path.shape or points is None or not len(points):
+            return MBoundingBox()
+
+        return MBoundingBox(MPoint(*points.min(axis=0)), MPoint(*points.max(axis=0)))
+
+    def child(self, index):
+        return self._children()[index]
+
+
+class MFnMesh(object):
+
+    def __init__(self, path):
+        self.path = path
+
+    @property
+    def numVertices(self): # pylint: disable=invalid-name
+        return len(self.path.scene.nodes[self.path.node_name].points)
+
+    def getPoints(self, space=MSpace.kObject): # pylint: disable=invalid-name
+        data = self.path.scene.nodes[self.path.node_name]
+        if space == MSpace.kWorld:
+            points = self.path.scene.shape_points(self.path.node_name)
+        else:
+            points = data.points
+
+        return MPointArray(points.tolist())
+
+    def getTriangles(self): # pylint: disable=invalid-name
+        # every face of the stand-in scene is a triangle
+        faces = self.path.scene.nodes[self.path.node_name].faces
+        if faces is None:
+            return [], []
+
+        return [1] * len(faces), faces.ravel().tolist()
+
+
+class MFnSingleIndexedComponent(object):
+
+    def __init__(self, component):
+        self.component = component
+
+    def getElements(self): # pylint: disable=invalid-name
+        return list(self.component.indices)
+
+
+class MFnTransform(object):
+    """
+    Read only function set over a transform path, edits go through the
+    fallback backend.
+    """
+
+    def __init__(self, path):
+        self.scene = path.scene
+        self.node = path.node_name
+
+    def transformationMatrix(self): # pylint: disable=invalid-name
+        return MMatrix(self.scene.nodes[self.node].local_matrix())
+
+    def rotatePivot(self, space): # pylint: disable=invalid-name
+        if space == MSpace.kObject:
+            return MPoint(*self.scene.nodes[self.node].pivot)
+
+        return MPoint(*self.scene._world_pivot(self.node)) # pylint: disable=protected-access
+
+    def translation(self, space): # pylint: disable=unused-argument
+        translate = self.scene.nodes[self.node].translate[np.newaxis]
+
+        return MVector(*_transform_points(translate, self.scene.parent_matrix(self.node))[0])
+
+
+class MGlobal(object):
+    """
+    Global functions acting on the selection and messages of a scene.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def getActiveSelectionList(self): # pylint: disable=invalid-name
+        selection_list = MSelectionList(self.scene)
+        for name in self.scene._selection: # pylint: disable=protected-access
+            selection_list.add(name)
+
+        return selection_list
+
+    def setActiveSelectionList(self, selection_list): # pylint: disable=invalid-name
+        self.scene._selection = selection_list.getSelectionStrings() # pylint: disable=protected-access
+
+    def isZAxisUp(self): # pylint: disable=invalid-name
+        return self.scene._up_axis == 'z' # pylint: disable=protected-access
+
+    def displayWarning(self, message): # pylint: disable=invalid-name
+        self.scene.messages.append(('warning', message))
+
+    def displayError(self, message): # pylint: disable=invalid-name
+        self.scene.messages.append(('error', message))
+
+
+class OpenMaya(object):
+    """
+    Module-like namespace bound to one scene.
+    """
+
+    MSpace = MSpace
+    MFn = MFn
+    MPoint = MPoint
+    MPointArray = MPointArray
+    MBoundingBox = MBoundingBox
+    MVector = MVector
+    MEulerRotation = MEulerRotation
+    MMatrix = MMatrix
+    MTransformationMatrix = MTransformationMatrix
+    MObject = MObject
+    MDagPath = MDagPath
+    MFnDependencyNode = MFnDependencyNode
+    MFnDagNode = MFnDagNode
+    MFnMesh = MFnMesh
+    MFnSingleIndexedComponent = MFnSingleIndexedComponent
+    MFnTransform = MFnTransform
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.MGlobal = MGlobal(scene) # pylint: disable=invalid-name
+
+    def MSelectionList(self): # pylint: disable=invalid-name
+        return MSelectionList(self.scene)
+
+
+def create(scene):
+    """
+    Returns a stand-in OpenMaya module answering from a MemoryScene.
+    """
+
+    return OpenMaya(scene)
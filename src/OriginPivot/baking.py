@@ -0,0 +1,106 @@
+"""
+Freezing transforms by baking matrices into vertex arrays.
+
+freeze_transforms does what makeIdentity with apply does to meshes: the
+transforms of nodes and their descendants are baked into the points of
+their shapes, reset to identity and the pivots are kept in place. Instead
+of one host operation per object it reads every local matrix, pivot and
+point array in one bulk call each, multiplies the matrices level by level
+of the hierarchy in one batched product and writes points and transforms
+back in two bulk calls.
+
+Only mesh points and pivots are baked, normals are left untouched and
+other shape types are not supported, use SceneBackend.freeze for them.
+"""
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+
+
+def _hierarchy_order(hierarchy, nodes):
+    """
+    Returns the nodes of a hierarchy dict parents first, along with the
+    parent of every node within the hierarchy.
+    """
+
+    parents = {}
+    for node, children in hierarchy.items():
+        for child in children:
+            parents[child] = node
+
+    members = []
+    visited = set()
+    pending = list(reversed(nodes))
+    while pending:
+        node = pending.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        members.append(node)
+        pending.extend(reversed(hierarchy.get(node, [])))
+
+    return members, [parents.get(member) for member in members]
+
+
+def baked_matrices(local_matrices, parent_indices):
+    """
+    Returns the matrices from the object space of every node to the space
+    of its closest ancestor that is not baked.
+
+    local_matrices is an (N, 4, 4) array of row vector local matrices and
+    parent_indices the index of the parent of every node, -1 for nodes
+    whose parent is not baked. Parents come before their children.
+
+    Nodes are multiplied with their parents one hierarchy level at a time
+    so every level is a single batched product.
+    """
+
+    local_matrices = np.asarray(local_matrices, dtype=np.float64).reshape(-1, 4, 4)
+    parent_indices = np.asarray(parent_indices, dtype=np.int64)
+
+    depths = np.zeros(len(parent_indices), dtype=np.int64)
+    for index, parent in enumerate(parent_indices):
+        if parent >= 0:
+            depths[index] = depths[parent] + 1
+
+    matrices = local_matrices.copy()
+    for depth in range(1, int(depths.max()) + 1 if len(depths) else 0):
+        level = np.flatnonzero(depths == depth)
+        matrices[level] = np.matmul(matrices[level], matrices[parent_indices[level]])
+
+    return matrices
+
+
+def freeze_transforms(backend, nodes):
+    """
+    Freezes the translation, rotation and scale of nodes and their
+    descendants while keeping the pivots in place.
+
+    Issues one hierarchy, local_matrices, object_pivots, object_points,
+    set_object_points and reset_transforms call each.
+    """
+
+    if not nodes:
+        return
+
+    members, parents = _hierarchy_order(backend.hierarchy(nodes), nodes)
+    rows = dict((member, row) for row, member in enumerate(members))
+    parent_indices = [rows.get(parent, -1) for parent in parents]
+
+    matrices = baked_matrices(backend.local_matrices(members), parent_indices)
+
+    pivots = geometry.as_points(backend.object_pivots(members))
+    pivots = np.einsum('ni,nij->nj', pivots, matrices[:, :3, :3]) + matrices[:, 3, :3]
+
+    shapes = []
+    points = []
+    for member, member_points, matrix in zip(members, backend.object_points(members), matrices):
+        if member_points is None or not len(member_points):
+            continue
+        shapes.append(member)
+        points.append(geometry.as_points(member_points).dot(matrix[:3, :3]) + matrix[3, :3])
+
+    if shapes:
+        backend.set_object_points(shapes, points)
+    backend.reset_transforms(members, pivots)
@@ -0,0 +1,316 @@
+"""
+Normalize the pivots of every OBJ file of a directory tree in parallel.
+
+Files are spread over a process pool and every finished file is appended
+to a journal along with the operation, the up axis and the size and
+modification time of its source, so an interrupted run picks up where it
+stopped when it is started again with the same journal. Files whose
+source or parameters changed since they were journaled are normalized
+again.
+
+With a manifest, files are only normalized when their content or the
+operation changed since the last run, see manifest.Manifest. The manifest
+is updated as files finish, with the source size and modification time
+the workers read, and committed in batches so it replaces the journal.
+
+Usage:
+    python -m OriginPivot.batch SOURCE DESTINATION [--operation bottom]
+    python -m OriginPivot.batch SOURCE DESTINATION --manifest assets.sqlite
+"""
+
+from __future__ import print_function
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+from . import manifest as asset_manifest
+from . import obj
+from . import vertex_cache as vertex_caches
+
+JOURNAL_NAME = '.originpivot_journal'
+
+
+def find_obj_files(root):
+    """
+    Returns the paths of the OBJ files under root relative to root, sorted.
+    """
+
+    paths = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.lower().endswith('.obj'):
+                paths.append(os.path.relpath(os.path.join(directory, name), root))
+
+    return sorted(paths)
+
+
+def read_journal(path):
+    """
+    Returns a dict of the relative paths a journal records as successfully
+    processed to the operation, up axis, source size and source
+    modification time they were processed with.
+
+    The last line of a path wins, lines written by older versions without
+    these fields are left out.
+    """
+
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with io.open(path, 'r', encoding='utf8') as journal:
+        for line in journal:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 7:
+                continue
+            if fields[1] == 'ok':
+                done[fields[0]] = (fields[3], fields[4], int(fields[5]), int(fields[6]))
+            else:
+                done.pop(fields[0], None)
+
+    return done
+
+
+def _normalize_task(task):
+    """
+    Normalizes one file in a worker process.
+
+    Errors are returned instead of raised so one broken file does not
+    stop the pool. With hash_source the content hash of the source is
+    computed here, unless the task already holds it, so the files are
+    hashed in parallel, and returned for the manifest.
+    """
+
+    (relative_path, source, destination, operation, up_axis, cache_directory,
+     content_hash, hash_source) = task
+
+    start = time.time()
+    try:
+        offset = None
+        # the state of the source before it is read is what the journal
+        # and the manifest compare the next run against
+        stat = asset_manifest.file_stat(source)
+        if hash_source and content_hash is None:
+            content_hash = asset_manifest.file_hash(source)
+        directory = os.path.dirname(destination)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another worker created it first
+                if not os.path.isdir(directory):
+                    raise
+        cache = None
+        if cache_directory is not None:
+            cache = vertex_caches.VertexCache(cache_directory)
+        offset = obj.normalize_obj(
+            source, destination, operation, up_axis, cache, content_hash=content_hash)
+    except Exception as error: # pylint: disable=broad-except
+        return relative_path, 'error', str(error), time.time() - start, None, offset, None
+
+    return relative_path, 'ok', '', time.time() - start, stat, offset, content_hash
+
+
+class BatchReport(object):
+    """
+    Counts and timings of a batch run.
+    """
+
+    def __init__(self):
+        self.processed = 0
+        self.skipped = 0
+        self.failures = []
+        self.bytes = 0
+        self.file_seconds = 0.0
+        self.elapsed = 0.0
+
+    def summary(self):
+        """
+        Returns a human readable summary of the run.
+        """
+
+        elapsed = self.elapsed or float('nan')
+        lines = [
+            'processed: {0}'.format(self.processed),
+            'skipped: {0}'.format(self.skipped),
+            'failed: {0}'.format(len(self.failures)),
+            'elapsed: {0:.2f}s'.format(self.elapsed),
+            'throughput: {0:.2f} files/s, {1:.2f} MB/s'.format(
+                self.processed / elapsed, self.bytes / elapsed / 1e6),
+        ]
+        if self.processed:
+            lines.append('mean time per file: {0:.4f}s'.format(
+                self.file_seconds / self.processed))
+        for relative_path, message in self.failures:
+            lines.append('error: {0}: {1}'.format(relative_path, message))
+
+        return '\n'.join(lines)
+
+
+def _dirty_tasks(source, destination, operation, up_axis, manifest, report, vertex_cache):
+    """
+    Returns the tasks of the files the manifest does not record as up to
+    date. The files the manifest did not need to hash are hashed by the
+    workers.
+    """
+
+    relative_paths = find_obj_files(source)
+    manifest.remove(set(manifest.paths()).difference(relative_paths))
+
+    parameters = {'up_axis': up_axis}
+    tasks = []
+    for relative_path in relative_paths:
+        source_path = os.path.join(source, relative_path)
+        destination_path = os.path.join(destination, relative_path)
+
+        current, content_hash = manifest.status(relative_path, source_path, operation, parameters)
+        if current and os.path.exists(destination_path):
+            if content_hash is not None:
+                # same content with a new modification time
+                manifest.touch(relative_path, source_path)
+            report.skipped += 1
+            continue
+
+        tasks.append((
+            relative_path, source_path, destination_path, operation, up_axis, vertex_cache,
+            content_hash, True))
+
+    return tasks
+
+
+def run_batch(source, destination, operation='bottom', up_axis='y',
+              processes=None, journal=None, chunksize=1, manifest=None, vertex_cache=None):
+    """
+    Normalizes every OBJ file under source into the same relative path
+    under destination and returns a BatchReport.
+
+    journal defaults to a file in destination. Files it records as done
+    with the same operation, up axis and source size and modification
+    time are skipped, files are appended to it as they finish.
+
+    manifest is the path of a manifest database used instead of the
+    journal: only the files whose content, operation or up axis changed
+    since they were recorded, or whose output is missing, are normalized.
+
+    vertex_cache is a directory the vertices of the sources are cached in,
+    see vertex_cache.VertexCache, so later runs skip parsing them.
+    """
+
+    if operation not in obj.OPERATIONS:
+        raise ValueError('Unsupported operation: {0}'.format(operation))
+
+    if manifest is not None:
+        # the manifest records finished files, the journal is not needed
+        journal = os.devnull
+    elif journal is None:
+        journal = os.path.join(destination, JOURNAL_NAME)
+    journal_directory = os.path.dirname(os.path.abspath(manifest or journal))
+    if not os.path.isdir(journal_directory):
+        os.makedirs(journal_directory)
+
+    report = BatchReport()
+
+    if manifest is None:
+        done = read_journal(journal)
+        tasks = []
+        for relative_path in find_obj_files(source):
+            source_path = os.path.join(source, relative_path)
+            destination_path = os.path.join(destination, relative_path)
+            state = (operation, up_axis) + asset_manifest.file_stat(source_path)
+            if done.get(relative_path) == state and os.path.exists(destination_path):
+                report.skipped += 1
+                continue
+            tasks.append((
+                relative_path, source_path, destination_path,
+                operation, up_axis, vertex_cache, None, False))
+    else:
+        manifest = asset_manifest.Manifest(manifest)
+
+    start = time.time()
+    try:
+        if manifest is not None:
+            tasks = _dirty_tasks(
+                source, destination, operation, up_axis, manifest, report, vertex_cache)
+
+        if tasks:
+            pool = multiprocessing.Pool(processes)
+            try:
+                with io.open(journal, 'a', encoding='utf8') as journal_file:
+                    results = pool.imap_unordered(_normalize_task, tasks, chunksize)
+                    for (relative_path, status, message, seconds, stat, offset,
+                         content_hash) in results:
+                        size, mtime = stat or (0, 0)
+                        journal_file.write(u'{0}\t{1}\t{2:.6f}\t{3}\t{4}\t{5}\t{6}\n'.format(
+                            relative_path, status, seconds, operation, up_axis, size, mtime))
+                        journal_file.flush()
+
+                        if status != 'ok':
+                            report.failures.append((relative_path, message))
+                            continue
+
+                        report.processed += 1
+                        report.bytes += size
+                        report.file_seconds += seconds
+                        if manifest is not None:
+                            manifest.record(
+                                relative_path, os.path.join(source, relative_path),
+                                content_hash, operation, {'up_axis': up_axis}, offset,
+                                stat=stat)
+            finally:
+                pool.close()
+                pool.join()
+    finally:
+        if manifest is not None:
+            # commits the records of the last batch
+            manifest.close()
+    report.elapsed = time.time() - start
+
+    return report
+
+
+def main(argv=None):
+    """
+    Command line entry point, returns the process exit code.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Normalize the pivots of a directory tree of OBJ files.')
+    parser.add_argument('source', help='directory searched for OBJ files')
+    parser.add_argument('destination', help='directory the normalized files are written to')
+    parser.add_argument(
+        '--operation', choices=obj.OPERATIONS, default='bottom',
+        help='point of the bounding box moved to the origin')
+    parser.add_argument('--up-axis', choices=('y', 'z'), default='y')
+    parser.add_argument(
+        '--processes', type=int, default=None,
+        help='number of worker processes, defaults to the number of CPUs')
+    parser.add_argument(
+        '--journal', default=None,
+        help='checkpoint journal, defaults to {0} in the destination'.format(JOURNAL_NAME))
+    parser.add_argument(
+        '--chunksize', type=int, default=1,
+        help='number of files handed to a worker at a time')
+    parser.add_argument(
+        '--manifest', default=None,
+        help='manifest database, only files changed since the last run are normalized')
+    parser.add_argument(
+        '--vertex-cache', default=None,
+        help='directory the parsed vertices of the sources are cached in')
+    args = parser.parse_args(argv)
+
+    report = run_batch(
+        args.source, args.destination, operation=args.operation,
+        up_axis=args.up_axis, processes=args.processes,
+        journal=args.journal, chunksize=args.chunksize, manifest=args.manifest,
+        vertex_cache=args.vertex_cache)
+    print(report.summary())
+
+    return 1 if report.failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Benchmarks of the pivot functions on synthetic in-memory scenes.
+
+Every function of core runs against MemoryScene scenes of increasing size
+and the wall time, number of backend calls and peak memory of each run
+are recorded. Results can be saved as a JSON baseline and later runs
+compared against it, the command exits with a non zero status when a
+run regresses past the threshold.
+
+Usage:
+    python -m OriginPivot.benchmark --baseline benchmark.json --update
+    python -m OriginPivot.benchmark --baseline benchmark.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import io
+import json
+import sys
+import time
+
+import numpy as np # pylint: disable=import-error
+
+from . import core
+from .backends import MemoryScene
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+SIZES = (100, 1000, 10000)
+
+# relative slowdown or memory growth tolerated before a run is a regression
+THRESHOLD = 0.25
+
+
+def synthetic_scene(count, vertices=8, joints=16, seed=0, up_axis='y'):
+    """
+    Returns a MemoryScene holding count meshes of vertices random points
+    with random transforms and a chain of joints, along with the names of
+    the meshes and of the joints.
+    """
+
+    random = np.random.RandomState(seed)
+    scene = MemoryScene(up_axis=up_axis)
+
+    meshes = []
+    for index in range(count):
+        meshes.append(scene.add_mesh(
+            'mesh{0}'.format(index),
+            random.uniform(-1.0, 1.0, (vertices, 3)),
+            translate=random.uniform(-100.0, 100.0, 3),
+            rotate=random.uniform(-180.0, 180.0, 3),
+            scale=random.uniform(0.5, 2.0, 3)))
+
+    joint_names = []
+    parent = None
+    for index in range(joints):
+        parent = scene.add_joint(
+            'joint{0}'.format(index), random.uniform(-10.0, 10.0, 3), parent=parent)
+        joint_names.append(parent)
+
+    return scene, meshes, joint_names
+
+
+def _select_objects(scene, meshes, joints):
+    scene.select(meshes)
+
+
+def _select_objects_and_joint(scene, meshes, joints):
+    scene.select(meshes + joints[-1:])
+
+
+def _select_objects_and_joints(scene, meshes, joints):
+    scene.select(meshes + joints)
+
+
+def _select_components(scene, meshes, joints):
+    scene.select(['{0}.vtx[*]'.format(mesh) for mesh in meshes])
+
+
+# name, function, keyword arguments and selection of every benchmark
+BENCHMARKS = (
+    ('move_pivot_to_bottom', core.move_pivot_to_bottom, {}, _select_objects),
+    ('move_pivot_to_bottom_per_object', core.move_pivot_to_bottom,
+     {'per_object': True}, _select_objects),
+    ('move_to_origin', core.move_to_origin, {}, _select_objects),
+    ('move_pivot_to_origin', core.move_pivot_to_origin, {}, _select_objects),
+    ('move_pivot_to_joint', core.move_pivot_to_joint, {}, _select_objects_and_joint),
+    ('move_pivot_to_nearest_joint', core.move_pivot_to_joint,
+     {'nearest': 'joint'}, _select_objects_and_joints),
+    ('create_joint_at_pivot', core.create_joint_at_pivot, {}, _select_objects),
+    ('create_joint_at_pivot_per_object', core.create_joint_at_pivot,
+     {'per_object': True, 'parenting': 'hierarchy'}, _select_objects),
+    ('create_pivot_bone', core.create_pivot_bone, {}, _select_components),
+)
+
+
+def run_benchmark(function, kwargs, select, count, vertices=8, repeat=3):
+    """
+    Runs function on fresh synthetic scenes of count meshes and returns a
+    dict with the best wall time in seconds, the backend calls and the
+    peak memory in bytes.
+
+    Memory is traced in one extra run so tracing does not slow down the
+    timed runs.
+    """
+
+    def prepare():
+        scene, meshes, joints = synthetic_scene(count, vertices)
+        select(scene, meshes, joints)
+        scene.calls.clear()
+        return scene
+
+    seconds = None
+    for _ in range(repeat):
+        scene = prepare()
+        start = time.time()
+        function(backend=scene, **kwargs)
+        elapsed = time.time() - start
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+
+    scene = prepare()
+    peak = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+    function(backend=scene, **kwargs)
+    if tracemalloc is not None:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'calls': sum(scene.calls.values()),
+        'calls_by_method': dict(scene.calls),
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(sizes=SIZES, vertices=8, repeat=3, names=None):
+    """
+    Runs every benchmark, or the ones in names, at every size and returns
+    the results keyed by 'name/size'.
+    """
+
+    results = {}
+    for name, function, kwargs, select in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for count in sizes:
+            results['{0}/{1}'.format(name, count)] = run_benchmark(
+                function, kwargs, select, count, vertices, repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Returns a message for every result that regressed against a baseline.
+
+    Wall time and peak memory may grow by threshold, the number of
+    backend calls is deterministic and may not grow at all.
+    """
+
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        result = results[key]
+        reference = baseline[key]
+
+        if result['calls'] > reference['calls']:
+            regressions.append('{0}: backend calls {1} > {2}'.format(
+                key, result['calls'], reference['calls']))
+
+        for metric in ('seconds', 'peak_bytes'):
+            if result.get(metric) is None or reference.get(metric) is None:
+                continue
+            if result[metric] > reference[metric] * (1.0 + threshold):
+                regressions.append('{0}: {1} {2:.6g} > {3:.6g} * {4}'.format(
+                    key, metric, result[metric], reference[metric], 1.0 + threshold))
+
+    return regressions
+
+
+def format_results(results):
+    """
+    Returns the results as a text table.
+    """
+
+    lines = ['{0:<44} {1:>12} {2:>10} {3:>14}'.format('benchmark', 'seconds', 'calls', 'peak bytes')]
+    for key in sorted(results, key=lambda key: (key.split('/')[0], int(key.split('/')[1]))):
+        result = results[key]
+        lines.append('{0:<44} {1:>12.6f} {2:>10} {3:>14}'.format(
+            key, result['seconds'], result['calls'], result['peak_bytes']))
+
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point, returns the process exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark the OriginPivot functions.')
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(SIZES),
+        help='numbers of objects of the synthetic scenes, 100000 is supported but slow')
+    parser.add_argument('--vertices', type=int, default=8, help='vertices per object')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the best is kept')
+    parser.add_argument('--only', nargs='+', default=None, help='names of the benchmarks to run')
+    parser.add_argument('--baseline', default=None, help='JSON baseline file')
+    parser.add_argument(
+        '--update', action='store_true', help='write the results to the baseline file')
+    parser.add_argument(
+        '--calls-only', action='store_true',
+        help='leave wall time and peak memory out of the baseline written by --update')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.vertices, args.repeat, args.only)
+    print(format_results(results))
+
+    if not args.baseline:
+        return 0
+
+    if args.update:
+        if args.calls_only:
+            # call counts do not depend on the machine, a baseline without
+            # timings can be checked on any of them
+            for result in results.values():
+                result['seconds'] = None
+                result['peak_bytes'] = None
+        with io.open(args.baseline, 'w', encoding='utf8') as baseline_file:
+            baseline_file.write(json.dumps(results, indent=2, sort_keys=True) + u'\n')
+        return 0
+
+    with io.open(args.baseline, 'r', encoding='utf8') as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print('regression: {0}'.format(regression))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
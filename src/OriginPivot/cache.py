@@ -0,0 +1,336 @@
+"""
+Cache of exact world bounding boxes.
+
+Exact bounds are the most expensive query the pivot functions make, the
+cache keeps them per object under a fingerprint of the object's geometry
+and transform state so running several functions on the same objects
+only queries them once. Entries are dropped least recently used first once
+the cache grows past its memory cap.
+
+The fingerprint is cheap but not exhaustive, functions that edit objects
+invalidate their entries explicitly.
+
+A cache can be switched to hierarchical mode where the bounds of every
+transform's own shapes are cached instead, see BoundsHierarchy, which
+suits deep group hierarchies edited one object after the other.
+"""
+
+import collections
+import sys
+import weakref
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+
+# default memory cap of a cache in bytes
+MAX_BYTES = 64 * 1024 * 1024
+
+_caches = weakref.WeakKeyDictionary()
+
+
+def _size_of(value):
+    """
+    Returns an estimate of the memory used by a cache key or value.
+    """
+
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_size_of(item) for item in value)
+
+    return sys.getsizeof(value)
+
+
+class BoundsHierarchy(object):
+    """
+    World bounding boxes of transform hierarchies merged bottom-up.
+
+    The bounds of the shapes directly below every transform are queried
+    once and kept under the transform's fingerprint, the bounds of a
+    subtree are merged from the bounds of its transform and of its child
+    subtrees. When one transform changes only its own shapes are queried
+    again and only the subtrees above it are merged again, the subtrees of
+    its siblings are reused.
+
+    The hierarchy is read once per root, call invalidate without nodes
+    after reparenting objects.
+    """
+
+    def __init__(self):
+        self._children = {}
+        self._parents = {}
+        # fingerprint and bounds, or None without shapes, of every transform
+        self._shapes = {}
+        # bounds, or None without shapes, of the subtree of every transform
+        self._subtrees = {}
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def _load(self, backend, nodes):
+        missing = [node for node in nodes if node not in self._children]
+        if not missing:
+            return
+
+        for node, children in backend.hierarchy(missing).items():
+            self._children[node] = list(children)
+            for child in children:
+                self._parents[child] = node
+
+    def _members(self, nodes):
+        """
+        Returns nodes and their descendants, parents first.
+        """
+
+        members = []
+        visited = set()
+        pending = list(reversed(nodes))
+        while pending:
+            node = pending.pop()
+            if node in visited:
+                continue
+            visited.add(node)
+            members.append(node)
+            pending.extend(reversed(self._children[node]))
+
+        return members
+
+    def _drop_subtrees(self, node):
+        # the subtree of a node and of all its ancestors include its shapes
+        while node is not None:
+            self._subtrees.pop(node, None)
+            node = self._parents.get(node)
+
+    def _subtree(self, node):
+        if node in self._subtrees:
+            return self._subtrees[node]
+
+        # merges children before their parents
+        for member in reversed(self._members([node])):
+            if member in self._subtrees:
+                continue
+            boxes = [self._shapes[member][1]] + [
+                self._subtrees[child] for child in self._children[member]]
+            boxes = [box for box in boxes if box is not None]
+            self._subtrees[member] = geometry.merge_bounds(boxes) if boxes else None
+
+        return self._subtrees[node]
+
+    def invalidate(self, nodes=None):
+        """
+        Drops the shape bounds of nodes and their descendants, or the whole
+        hierarchy when nodes is None.
+        """
+
+        if nodes is None:
+            self._children.clear()
+            self._parents.clear()
+            self._shapes.clear()
+            self._subtrees.clear()
+            return
+
+        for member in self._members([node for node in nodes if node in self._children]):
+            self._shapes.pop(member, None)
+            self._drop_subtrees(member)
+
+    def refresh(self, backend, nodes):
+        """
+        Keeps the shape bounds of nodes and their descendants under their
+        current fingerprints, see BoundsCache.refresh.
+        """
+
+        members = [
+            member for member in self._members([node for node in nodes if node in self._children])
+            if member in self._shapes]
+        if not members:
+            return
+
+        for member, fingerprint in zip(members, backend.fingerprints(members)):
+            self._shapes[member] = (fingerprint, self._shapes[member][1])
+
+    def world_bounding_boxes(self, backend, nodes):
+        """
+        Returns the world bounding box of every node and its descendants as
+        an (N, 6) array.
+
+        Every transform of the hierarchies is fingerprinted in one bulk
+        call and the shapes of the transforms that changed are queried in
+        another one.
+        """
+
+        self._load(backend, nodes)
+        members = self._members(nodes)
+
+        changed = []
+        changed_fingerprints = []
+        for member, fingerprint in zip(members, backend.fingerprints(members)):
+            entry = self._shapes.get(member)
+            if entry is None or entry[0] != fingerprint:
+                changed.append(member)
+                changed_fingerprints.append(fingerprint)
+
+        if changed:
+            queried = backend.shape_bounds(changed)
+            for member, fingerprint, bounds in zip(changed, changed_fingerprints, queried):
+                if bounds is not None:
+                    bounds = np.array(bounds, dtype=np.float64)
+                self._shapes[member] = (fingerprint, bounds)
+                self._drop_subtrees(member)
+
+        bounds = [self._subtree(node) for node in nodes]
+
+        # objects without geometry are reduced to their pivots
+        empty = [index for index, value in enumerate(bounds) if value is None]
+        if empty:
+            pivots = backend.world_pivots([nodes[index] for index in empty])
+            for index, pivot in zip(empty, pivots):
+                bounds[index] = np.concatenate((pivot, pivot))
+
+        return np.array(bounds, dtype=np.float64).reshape(-1, 6)
+
+
+class BoundsCache(object):
+    """
+    Least recently used cache of per object world bounding boxes.
+
+    With hierarchical set the bounds are merged from the shapes of the
+    transforms of every hierarchy instead, see BoundsHierarchy, whose
+    entries are not bound by max_bytes.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, hierarchical=False):
+        self.hierarchy = BoundsHierarchy() if hierarchical else None
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, node):
+        return node in self._entries
+
+    def get(self, node, fingerprint):
+        """
+        Returns the cached bounds of a node or None when the node is not
+        cached or was cached under another fingerprint.
+        """
+
+        entry = self._entries.get(node)
+        if entry is None or entry[0] != fingerprint:
+            self.misses += 1
+            return None
+
+        self._entries.pop(node)
+        self._entries[node] = entry
+        self.hits += 1
+
+        return entry[1]
+
+    def put(self, node, fingerprint, bounds):
+        """
+        Caches the bounds of a node and evicts entries past the memory cap.
+        """
+
+        entry = self._entries.pop(node, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+        bounds = np.array(bounds, dtype=np.float64)
+        size = _size_of(node) + _size_of(fingerprint) + _size_of(bounds)
+        if size > self.max_bytes:
+            return
+
+        self._entries[node] = (fingerprint, bounds, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def invalidate(self, nodes=None):
+        """
+        Drops the entries of nodes, or every entry when nodes is None.
+        """
+
+        if self.hierarchy is not None:
+            self.hierarchy.invalidate(nodes)
+
+        if nodes is None:
+            self._entries.clear()
+            self.size = 0
+            return
+
+        for node in nodes:
+            entry = self._entries.pop(node, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def refresh(self, backend, nodes):
+        """
+        Keeps the entries of nodes under their current fingerprints.
+
+        Used after edits that change the fingerprint of objects without
+        changing their world bounds, like freezing or moving pivots.
+        """
+
+        if self.hierarchy is not None:
+            self.hierarchy.refresh(backend, nodes)
+
+        cached = [node for node in nodes if node in self._entries]
+        if not cached:
+            return
+
+        for node, fingerprint in zip(cached, backend.fingerprints(cached)):
+            self.put(node, fingerprint, self._entries[node][1])
+
+    def world_bounding_boxes(self, backend, nodes):
+        """
+        Returns the world bounding box of every node as an (N, 6) array.
+
+        Nodes missing from the cache are queried from the backend in a
+        single bulk call.
+        """
+
+        if self.hierarchy is not None:
+            return self.hierarchy.world_bounding_boxes(backend, nodes)
+
+        fingerprints = backend.fingerprints(nodes)
+        bounds = [self.get(node, fingerprint) for node, fingerprint in zip(nodes, fingerprints)]
+
+        missing = [index for index, value in enumerate(bounds) if value is None]
+        if missing:
+            queried = backend.world_bounding_boxes([nodes[index] for index in missing])
+            for index, value in zip(missing, queried):
+                bounds[index] = np.array(value, dtype=np.float64)
+                self.put(nodes[index], fingerprints[index], value)
+
+        return np.array(bounds, dtype=np.float64).reshape(-1, 6)
+
+
+def get_cache(backend):
+    """
+    Returns the bounds cache of a backend, creating it on first use.
+    """
+
+    bounds_cache = _caches.get(backend)
+    if bounds_cache is None:
+        bounds_cache = _caches[backend] = BoundsCache()
+
+    return bounds_cache
+
+
+def set_hierarchical(backend, hierarchical=True):
+    """
+    Switches the bounds cache of a backend to or from merging the bounds
+    of hierarchies bottom-up and drops its entries.
+    """
+
+    bounds_cache = get_cache(backend)
+    bounds_cache.invalidate()
+    bounds_cache.hierarchy = BoundsHierarchy() if hierarchical else None
+
+    return bounds_cache
@@ -0,0 +1,172 @@
+"""
+Chunked execution of the pivot functions over large selections.
+
+A function of core run on tens of thousands of objects blocks the host
+until it returns. iter_chunks runs it on consecutive chunks of the
+selection instead, each in its own undo chunk, lets the host process its
+events between chunks and yields a ChunkProgress after every chunk:
+
+    run = chunked.iter_chunks(core.move_to_origin, chunk_size=500)
+    for progress in run:
+        print(progress)
+        if user_cancelled():
+            run.close()
+
+Closing the generator before it is exhausted cancels the run: the chunks
+already processed are undone and the selection is restored. An error
+raised by a chunk rolls back the same way before it propagates.
+
+Every chunk is named after the run, only the chunks found on top of the
+undo queue under their own name are undone, so edits made between two
+chunks are never undone by a rollback.
+"""
+
+from __future__ import division
+
+import itertools
+import time
+
+from . import backends
+from . import cache
+from . import core
+
+# number of objects processed per chunk
+CHUNK_SIZE = 500
+
+# numbers the runs so the undo chunks of two runs have different names
+_run_ids = itertools.count(1)
+
+
+class ChunkProgress(object):
+    """
+    Progress of a chunked run after a chunk.
+    """
+
+    def __init__(self, done, total, chunks, elapsed):
+        self.done = done
+        self.total = total
+        self.chunks = chunks
+        self.elapsed = elapsed
+
+    @property
+    def fraction(self):
+        """
+        Fraction of the objects processed, between 0 and 1.
+        """
+
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def throughput(self):
+        """
+        Objects processed per second.
+        """
+
+        return self.done / self.elapsed if self.elapsed else float('inf')
+
+    def __repr__(self):
+        return 'ChunkProgress({0}/{1} objects, {2} chunks, {3:.0f} objects/s)'.format(
+            self.done, self.total, self.chunks, self.throughput)
+
+
+def split_selection(function, selection, backend, **kwargs):
+    """
+    Returns the objects of a selection a function can process in chunks
+    and the nodes every chunk needs selected along with them.
+
+    Functions producing a single result for the whole selection cannot be
+    chunked and raise a ValueError.
+    """
+
+    if function is core.move_pivot_to_joint:
+        if kwargs.get('nearest') is None:
+            if not selection or not backend.is_type(selection[-1], 'joint'):
+                raise ValueError('A joint must be selected last')
+            # the joint selected last is the target of every object
+            return selection[:-1], selection[-1:]
+
+        joints = [node for node in selection if backend.is_type(node, 'joint')]
+        joint_set = set(joints)
+        return [node for node in selection if node not in joint_set], joints
+
+    if function is core.move_pivot_to_bottom and kwargs.get('per_object'):
+        return selection, []
+
+    if function in (core.move_to_origin, core.move_pivot_to_origin):
+        return selection, []
+
+    raise ValueError('{0} cannot run in chunks with these arguments'.format(
+        getattr(function, '__name__', function)))
+
+
+def iter_chunks(function, backend=None, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Runs a function of core on the selection one chunk of chunk_size
+    objects at a time and yields a ChunkProgress after every chunk.
+
+    Every chunk is one undo step named after the run, cancelling or
+    failing undoes the steps of the run found on top of the undo queue
+    and warns about the chunks edits made between chunks kept from
+    being undone. kwargs are given to the function.
+    """
+
+    backend = backends.get_backend(backend)
+
+    selection = backend.selection()
+    objects, shared = split_selection(function, selection, backend, **kwargs)
+    chunks = [objects[start:start + chunk_size] for start in range(0, len(objects), chunk_size)]
+
+    name = '{0} #{1}'.format(getattr(function, '__name__', 'OriginPivot'), next(_run_ids))
+    opened = []
+    done = 0
+    start = time.time()
+    finished = False
+    try:
+        for index, chunk in enumerate(chunks):
+            opened.append('{0} {1}/{2}'.format(name, index + 1, len(chunks)))
+            with backend.undo_chunk(opened[-1]):
+                backend.select(chunk + shared)
+                function(backend=backend, **kwargs)
+            done += len(chunk)
+
+            backend.process_events()
+            yield ChunkProgress(done, len(objects), len(opened), time.time() - start)
+
+        finished = True
+
+    finally:
+        if not finished:
+            # the chunks are undone last first as long as the step on top
+            # of the undo queue is one of them, chunks that made no edit,
+            # like one failing before its first, left no step
+            top = backend.undo_name()
+            while top in opened:
+                del opened[opened.index(top):]
+                backend.undo()
+                top = backend.undo_name()
+            if opened:
+                backend.warning(
+                    '{0} chunks of {1} were not undone, they are below later edits'.format(
+                        len(opened), name))
+            cache.get_cache(backend).invalidate(objects)
+
+        backend.select(selection)
+
+
+def run_chunked(function, backend=None, chunk_size=CHUNK_SIZE, progress=None, **kwargs):
+    """
+    Runs iter_chunks to completion and returns the last ChunkProgress, or
+    None when it was cancelled or there was nothing to process.
+
+    progress is called with every ChunkProgress, returning False from it
+    cancels the run.
+    """
+
+    run = iter_chunks(function, backend, chunk_size, **kwargs)
+    last = None
+    for last in run:
+        if progress is not None and progress(last) is False:
+            run.close()
+            return None
+
+    return last
@@ -1,35 +1,178 @@
-def create_joint_at_pivot():
+"""
+Functions to manipulate pivots.
+
+The functions in this module only gather data from a scene backend and
+write the results back, the pivot math lives in the geometry module.
+Every function runs against the current backend unless one is given.
+"""
+
+from . import backends
+from . import cache
+from . import dedup as geometry_dedup
+from . import geometry
+from . import ground as ground_raycast
+from . import profiling
+from . import quantiles
+from . import reduction
+from . import spatial
+from . import transaction
+
+
+# suffix added to the name of an object to name the joint created at its pivot
+JOINT_SUFFIX = '_jnt'
+
+# ways create_joint_at_pivot can parent the joints it creates per object
+PARENTINGS = (None, 'chain', 'hierarchy')
+
+
+def _selected_ancestors(backend, nodes):
+    """
+    Returns the index of the closest ancestor of every node among the
+    nodes, None for nodes without one.
+
+    Issues one parents call per level of the hierarchy.
+    """
+
+    rows = dict((node, row) for row, node in enumerate(nodes))
+    ancestors = [None] * len(nodes)
+
+    current = list(nodes)
+    pending = list(range(len(nodes)))
+    while pending:
+        remaining = []
+        for row, parent in zip(pending, backend.parents([current[row] for row in pending])):
+            if parent is None:
+                continue
+            if parent in rows:
+                ancestors[row] = rows[parent]
+                continue
+            current[row] = parent
+            remaining.append(row)
+        pending = remaining
+
+    return ancestors
+
+def _joint_parents(backend, nodes, parenting):
+    """
+    Returns the index of the node whose joint is the parent of the joint
+    of every node, or None.
+    """
+
+    if parenting is None:
+        return [None] * len(nodes)
+    if parenting == 'chain':
+        return [None] + list(range(len(nodes) - 1))
+
+    return _selected_ancestors(backend, nodes)
+
+def _create_joints_per_object(backend, meshes, parenting):
+    """
+    Creates a joint at the pivot of every object named after it and
+    returns the joints in the order of the objects.
+    """
+
+    parents = _joint_parents(backend, meshes, parenting)
+
+    # joints are created parents first
+    depths = [0] * len(meshes)
+    for row in range(len(meshes)):
+        parent = parents[row]
+        while parent is not None:
+            depths[row] += 1
+            parent = parents[parent]
+    order = sorted(range(len(meshes)), key=lambda row: depths[row])
+    slots = dict((row, slot) for slot, row in enumerate(order))
+
+    pivots = backend.world_pivots(meshes)
+    names = [mesh.rpartition('|')[2].rpartition(':')[2] + JOINT_SUFFIX for mesh in meshes]
+
+    created = backend.create_joints(
+        [pivots[row] for row in order],
+        [names[row] for row in order],
+        [None if parents[row] is None else slots[parents[row]] for row in order])
+
+    return [created[slots[row]] for row in range(len(meshes))]
+
+@profiling.traced
+def create_joint_at_pivot(backend=None, per_object=False, parenting=None):
     """
     If there is a valid selection then get the world space
     position of the selection's pivot and create a joint to that
     position.
+
+    With per_object a joint is created at the pivot of every selected
+    object and named after it with JOINT_SUFFIX. The pivots are queried
+    in one world_pivots call, the joints created in one create_joints
+    call and everything happens in one undo chunk. parenting is one of
+    PARENTINGS:
+    None leaves every joint unparented.
+    'chain' creates every joint under the joint of the object selected
+    before it.
+    'hierarchy' creates every joint under the joint of the closest
+    selected ancestor of its object, mirroring the DAG of the selection.
+
+    Returns the created joints.
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    if parenting not in PARENTINGS:
+        raise ValueError('Unsupported parenting: {0}'.format(parenting))
+
+    backend = backends.get_backend(backend)
 
-    meshes = pm.cmds.ls(sl=True)
+    meshes = backend.selection()
 
     # checks if there are selections
     # generates popup if there is no valid selection
-    if meshes:
-        pm.cmds.makeIdentity(
-            translate=True, rotate=True, scale=True,
-            apply=True, normal=False, pn=True)
+    if meshes and per_object:
+        with backend.undo_chunk('create_joint_at_pivot'):
+            # freeze transforms prior to querying the pivots
+            backend.freeze(meshes)
+
+            joints = _create_joints_per_object(backend, meshes, parenting)
+
+            backend.select(joints)
 
+        cache.get_cache(backend).invalidate(meshes)
+
+        return joints
+
+    if meshes:
         # freeze transforms prior to moving object
+        backend.freeze(meshes)
 
         # gets the current world location of the mesh based on its pivot
-        cur_pos = pm.cmds.xform(meshes, q=True, ws=True, sp=True)
+        cur_pos = backend.world_pivot(meshes[0])
 
         # sets joint position at the current position of the selection
-        pm.cmds.joint(position=cur_pos, rotate=True)
+        joint = backend.create_joint(cur_pos)
 
-    else:
-        pm.cmds.confirmDialog(
-            title='Error', message='A mesh was not selected.\nSelect a mesh and re-run script',
-            button=['OK'], defaultButton='Yes', messageAlign='center')
+        cache.get_cache(backend).invalidate(meshes)
+
+        return [joint]
+
+    backend.error('A mesh was not selected.\nSelect a mesh and re-run script')
+    return []
 
-def move_pivot_to_bottom():
+def _world_points_or_pivots(backend, nodes):
+    """
+    Returns the world space points of every node, its world pivot for
+    nodes without mesh geometry like locators, empty groups or NURBS
+    objects, the same way bounds of such nodes are reduced to their pivot.
+    """
+
+    point_sets = backend.world_points(nodes)
+
+    empty = [index for index, points in enumerate(point_sets) if not len(points)]
+    if empty:
+        pivots = backend.world_pivots([nodes[index] for index in empty])
+        for index, pivot in zip(empty, pivots):
+            point_sets[index] = geometry.as_points(pivot)
+
+    return point_sets
+
+@profiling.traced
+def move_pivot_to_bottom(backend=None, per_object=False, oriented=None, dedup=False,
+                         percentile=None):
     """
     Move an object and its pivot to the origin.
 
@@ -39,61 +182,196 @@ def move_pivot_to_bottom():
     3. Moves the pivot to that point in worldspace
     4. Determines the distance between the new position of the pivot and the origin
     5. Moves the selection to the origin
+
+    With per_object every object gets the bottom center of its own
+    bounding box instead of the one of the whole selection. The bounds
+    are queried in one bulk call, the bottom centers computed in one
+    vectorized step and the pivots written in one bulk call.
+
+    oriented replaces the world axis aligned bounding box with an oriented
+    one fitted to the vertices, the pivot goes to the bottom center of the
+    box along the box axis closest to the up axis:
+    'pca' fits the box to the principal axes of the vertices, which is
+    fast and handles objects tilted in any direction.
+    'hull' keeps the box upright and encloses the footprint with its exact
+    minimum area rectangle, which suits props rotated around the up axis.
+
+    With dedup the geometry of objects sharing identical or instanced
+    meshes is read once per mesh and the bounds of every copy derived
+    from it, see the dedup module.
+
+    percentile replaces the bounding box with the ground contact of the
+    vertices: the pivot goes to that percentile, between 0 and 100, of
+    the vertices along the up axis and to the median of the other two
+    coordinates so stray vertices below an object do not drag it down.
+    The vertices are streamed through quantile sketches in bounded
+    memory, see the quantiles module.
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    backend = backends.get_backend(backend)
 
-    meshes = pm.cmds.ls(sl=True)
+    meshes = backend.selection()
 
     if meshes:
 
-        # gets bounding box of selection and saves info of the bounding box
-        # into a list as xmin, ymin, zmin, xmax, ymax, zmax
-        bounding_box = pm.cmds.exactWorldBoundingBox(meshes)
-        pm.cmds.makeIdentity(
-            translate=True, rotate=True, scale=True,
-            apply=True, normal=False, pn=True)
+        up_axis = backend.up_axis()
+        bounds_cache = cache.get_cache(backend)
 
-        # freeze transforms prior to moving pivot
+        if percentile is not None and oriented is not None:
+            raise ValueError('percentile and oriented cannot be combined')
 
-        # checks if upAxis is y
-        if pm.cmds.upAxis(q=True, axis=True) == 'y':
+        if percentile is not None:
+            # streams the vertices of every object through quantile sketches
+            point_sets = _world_points_or_pivots(backend, meshes)
+            if per_object:
+                bottom_pivots = quantiles.ground_contacts(point_sets, up_axis, percentile)
+            else:
+                chunks = (
+                    chunk for points in point_sets
+                    for chunk in quantiles.iter_point_chunks(points))
+                bottom_pivots = geometry.as_points(
+                    quantiles.ground_contact(chunks, up_axis, percentile))
+
+        elif oriented is not None:
+            # fits an oriented box to the vertices of every object
+            point_sets = _world_points_or_pivots(backend, meshes)
+            if not per_object:
+                point_sets = [geometry.merge_points(point_sets)]
+
+            if oriented == 'pca':
+                boxes = geometry.oriented_bounding_boxes(point_sets)
+            elif oriented == 'hull':
+                boxes = geometry.upright_bounding_boxes(point_sets, up_axis)
+            else:
+                raise ValueError('Unsupported oriented mode: {0}'.format(oriented))
 
-            # define that the selection's pivot should be at the bottom of the
-            # bounding box
-            bottom_pivot = [
-                (bounding_box[0] + bounding_box[3]) / 2,
-                bounding_box[1],
-                (bounding_box[2] + bounding_box[5]) / 2]
+            bottom_pivots = geometry.oriented_bottom_centers(*boxes, up_axis=up_axis)
 
-            # moves pivot to the bottom of the bounding box
-            pm.cmds.xform(meshes, piv=bottom_pivot, ws=True)
+        else:
+            # gets bounding box of every object and saves info of the bounding
+            # boxes into rows as xmin, ymin, zmin, xmax, ymax, zmax
+            if dedup:
+                bounding_boxes = geometry_dedup.world_bounding_boxes(backend, meshes)
+            else:
+                # the shared box is merged from the cached per object ones
+                # so running again on the same objects queries nothing
+                bounding_boxes = bounds_cache.world_bounding_boxes(backend, meshes)
+            if not per_object:
+                bounding_boxes = geometry.merge_bounds(bounding_boxes)
+
+            # define that the pivots should be at the bottom of the bounding
+            # boxes based on the scene's up axis
+            bottom_pivots = geometry.bottom_centers(bounding_boxes, up_axis)
+
+        with transaction.EditPlan(backend) as plan:
+            # freeze transforms prior to moving pivot
+            plan.freeze(meshes)
+
+            # moves pivots to the bottom of the bounding boxes
+            if per_object:
+                plan.set_pivots(meshes, bottom_pivots.tolist())
+            else:
+                plan.set_pivot(meshes, bottom_pivots[0].tolist())
 
-        # checks if upAxis is z
-        elif pm.cmds.upAxis(q=True, axis=True) == 'z':
+            # freeze transforms after the move
+            plan.freeze(meshes)
 
-            # define that the selection's pivot should be at the bottom of the
-            # bounding box
-            bottom_pivot = [
-                (bounding_box[0] + bounding_box[3]) / 2,
-                (bounding_box[1] + bounding_box[4]) / 2,
-                bounding_box[2]
-            ]
+        # freezing and moving pivots leaves the world bounds untouched
+        bounds_cache.refresh(backend, meshes)
 
-            # moves pivot to the bottom of the bounding box
-            pm.cmds.xform(meshes, piv=bottom_pivot, ws=True)
+    else:
+        backend.error('A mesh was not selected.\nSelect a mesh and re-run script')
 
-        # freeze transforms after the move
-        pm.cmds.makeIdentity(
-            translate=True, rotate=True, scale=True,
-            apply=True, normal=False, pn=True)
+def _is_pivot_target(backend, node):
+    """
+    Returns whether the pivot of a node can be moved to a joint.
+    """
 
-    else:
-        pm.cmds.confirmDialog(
-            title='Error', message='A mesh was not selected.\nSelect a mesh and re-run script',
-            button=['OK'], defaultButton='Yes', messageAlign='center')
+    return (
+        backend.is_type(node, 'nurbsSurface') or
+        backend.is_type(node, 'mesh') or
+        backend.is_type(node, 'transform')
+    )
 
-def move_pivot_to_joint():
+def _move_pivots_to_nearest_joints(backend, selection, nearest):
+    """
+    Moves the pivot of every selected object to the selected joint
+    closest to the center of its bounding box.
+
+    With nearest set to 'joint' the distance is measured to the joint
+    positions, with 'bone' it is measured to the bone segments running
+    from every selected joint to its selected child joints and the pivot
+    goes to the joint the closest bone starts from. Joints without a
+    selected child act as zero length bones.
+    """
+
+    joints = [node for node in selection if backend.is_type(node, 'joint')]
+    if not joints:
+        backend.error(
+            'No joint was selected as a target worldspace ' +
+            'position.\nSelect the joints with the objects and re-run script')
+        return
+
+    # list used to collect objects that aren't accounted for
+    error_list = []
+    objects = []
+    joint_set = set(joints)
+    for selected in selection:
+        if selected in joint_set:
+            continue
+        if _is_pivot_target(backend, selected):
+            objects.append(selected)
+        else:
+            error_list.append(selected)
+
+    if objects:
+        joint_positions = geometry.as_points(backend.joint_positions(joints))
+
+        if nearest == 'joint':
+            index = spatial.KDTree(joint_positions)
+            owners = list(range(len(joints)))
+        else:
+            # every bone belongs to the joint it starts from
+            joint_indices = dict((joint, row) for row, joint in enumerate(joints))
+            starts = []
+            ends = []
+            owners = []
+            for joint, parent in zip(joints, backend.parents(joints)):
+                if parent in joint_indices:
+                    starts.append(joint_indices[parent])
+                    ends.append(joint_indices[joint])
+                    owners.append(joint_indices[parent])
+            parents = set(owners)
+            for row in range(len(joints)):
+                if row not in parents:
+                    starts.append(row)
+                    ends.append(row)
+                    owners.append(row)
+            index = spatial.SegmentBVH(joint_positions[starts], joint_positions[ends])
+
+        # finds the closest joint of every object in one pass
+        centers = geometry.bounds_centers(
+            cache.get_cache(backend).world_bounding_boxes(backend, objects))
+        closest, _ = index.query(centers)
+        pivots = joint_positions[[owners[row] for row in closest]]
+
+        with transaction.EditPlan(backend) as plan:
+            # freeze transforms prior to moving the pivots
+            plan.freeze(objects)
+
+            # move the pivots to the worldspace location of their joints
+            plan.set_pivots(objects, pivots.tolist())
+
+            # freeze transforms after moving the pivots
+            plan.freeze(objects)
+
+        cache.get_cache(backend).invalidate(objects)
+
+    if error_list:
+        backend.error('Error running script with these objects {0}'.format(str(error_list)))
+
+@profiling.traced
+def move_pivot_to_joint(backend=None, nearest=None):
     """
     Moves the pivots of selected objects to a selected joint.
 
@@ -101,19 +379,29 @@ def move_pivot_to_joint():
     joint is last object selected then the script can continue.
     The script will then move the pivots of the selected objects
     to the joint.
+
+    With nearest set to 'joint' or 'bone' any number of joints can be
+    selected along with the objects and every object's pivot goes to
+    the joint closest to it, see _move_pivots_to_nearest_joints.
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    backend = backends.get_backend(backend)
+
+    selection = backend.selection()
 
-    selection = pm.cmds.ls(sl=True)
+    if nearest is not None:
+        if nearest not in ('joint', 'bone'):
+            raise ValueError('Unsupported nearest mode: {0}'.format(nearest))
+        _move_pivots_to_nearest_joints(backend, selection, nearest)
+        return
 
     # get last object in selection which should be a joint
-    joint = selection[-1]
+    joint = selection[-1] if selection else None
 
-    if pm.cmds.objectType(joint, isType='joint'):
+    if joint and backend.is_type(joint, 'joint'):
 
         # gets worldspace position of the joint
-        joint_pos = pm.cmds.joint(joint, q=True, p=True)
+        joint_pos = backend.joint_position(joint)
 
         # removes joint from selection list
         selection.pop()
@@ -121,242 +409,256 @@ def move_pivot_to_joint():
         # list used to collect objects that aren't accounted for
         error_list = []
 
+        # the edits of every object are recorded and issued together
+        plan = transaction.EditPlan(backend)
+
         for selected in selection:
 
             # check for valid object type otherwise populate error_list
-            if (
-                    pm.cmds.objectType(selected, isType='nurbsSurface') or
-                    pm.cmds.objectType(selected, isType='mesh') or
-                    pm.cmds.objectType(selected, isType='transform')
-            ):
+            if _is_pivot_target(backend, selected):
 
                 # freeze transforms prior to moving object's pivot
-                pm.cmds.makeIdentity(
-                    translate=True, rotate=True, scale=True,
-                    apply=True, normal=False, pn=True)
+                plan.freeze([selected])
 
                 # move object's pivot to the worldspace location of a joint
-                pm.cmds.xform(selected, piv=joint_pos, ws=True)
+                plan.set_pivot([selected], joint_pos)
 
                 # freeze transforms after to moving object's pivot
-                pm.cmds.makeIdentity(
-                    translate=True, rotate=True, scale=True,
-                    apply=True, normal=False, pn=True)
+                plan.freeze([selected])
 
             else:
                 error_list.append(selected)
                 continue
 
+        plan.flush()
+
+        cache.get_cache(backend).invalidate(selection)
+
         if error_list:
-            pm.cmds.confirmDialog(
-                title='Error',
-                message='Error running script with these objects {0}'.format(str(error_list)),
-                button=['OK'], defaultButton='Yes', messageAlign='center')
+            backend.error('Error running script with these objects {0}'.format(str(error_list)))
 
     else:
-        pm.cmds.confirmDialog(
-            title='Error',
-            message=(
-                'A joint was not selected as the target worldspace ' +
-                'position.\nEnsure a joint is selected last and re-run script'
-            ),
-            button=['OK'], defaultButton='Yes', messaeAlign='center')
-
-def move_pivot_to_origin():
+        backend.error(
+            'A joint was not selected as the target worldspace ' +
+            'position.\nEnsure a joint is selected last and re-run script')
+
+@profiling.traced
+def move_pivot_to_origin(backend=None):
     """
-    Iterates over a selection of objects and moves their pivot to the origin.
+    Moves the pivots of a selection of objects to the origin.
+
+    The selection is frozen once before and once after the pivots are
+    moved so the number of host calls does not depend on the size of
+    the selection:
+    1 selection, 2 freeze and 1 set_world_pivot in 1 undo_chunk
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    backend = backends.get_backend(backend)
 
-    meshes = pm.cmds.ls(sl=True)
+    meshes = backend.selection()
 
     if meshes:
-        for mesh in meshes:
-            # freeze transforms prior to moving object
-            pm.cmds.makeIdentity(
-                translate=True, rotate=True, scale=True,
-                apply=True, normal=False, pn=True)
+        with transaction.EditPlan(backend) as plan:
+            # freeze transforms prior to moving the pivots
+            plan.freeze(meshes)
 
-            # moves pivot to the bottom of the origin
-            pm.cmds.xform(mesh, piv=[0, 0, 0], ws=True)
+            # moves the pivots of every object to the origin
+            plan.set_pivot(meshes, [0, 0, 0])
 
             # freeze transforms after the move
-            pm.cmds.makeIdentity(
-                translate=True, rotate=True, scale=True,
-                apply=True, normal=False, pn=True)
+            plan.freeze(meshes)
+
+        cache.get_cache(backend).invalidate(meshes)
 
     else:
-        pm.cmds.confirmDialog(
-            title='Error', message='A mesh was not selected.\n Select a mesh and re-run script',
-            button=['OK'], defaultButton='Yes', messageAlign='center')
+        backend.error('A mesh was not selected.\n Select a mesh and re-run script')
 
-def move_to_origin():
+@profiling.traced
+def move_to_origin(backend=None):
     """
     Moves the selected objects, based on their pivot,
     to the origin.
+
+    The pivots are all queried before any object is edited, the offsets
+    are computed in a single pass and the selection is frozen once before
+    and once after the move. For N objects the host calls are:
+    1 selection, N world_pivot, 2 freeze and 1 set_world_translations
+    in 1 undo_chunk
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    backend = backends.get_backend(backend)
 
-    meshes = pm.cmds.ls(sl=True)
+    meshes = backend.selection()
 
     if meshes:
-        for mesh in meshes:
-            # freeze transforms prior to moving object
-            pm.cmds.makeIdentity(
-                translate=True, rotate=True, scale=True,
-                apply=True, normal=False, pn=True)
-
-            # gets the current world location of the mesh based on its pivot
-            current_position = pm.cmds.xform(mesh, q=True, ws=True, piv=True)
-
-            # determines the distance to the origin from the current location
-            # in worldspace of the pivot
-            distance_to_origin = [
-                -(current_position[0]),
-                -(current_position[1]),
-                -(current_position[2])
-            ]
-
-            # moves the object to the origin
-            pm.cmds.xform(mesh, translate=distance_to_origin, ws=True)
+        # gets the current world location of every mesh based on its pivot,
+        # freezing keeps the pivots in place so they are queried first
+        current_positions = backend.world_pivots(meshes)
+
+        # determines the distance to the origin from the current location
+        # in worldspace of every pivot
+        distances_to_origin = geometry.origin_offsets(current_positions)
+
+        with transaction.EditPlan(backend) as plan:
+            # freeze transforms prior to moving the objects
+            plan.freeze(meshes)
+
+            # moves the objects to the origin
+            plan.set_translations(meshes, distances_to_origin.tolist())
 
             # freeze transforms after the move
-            pm.cmds.makeIdentity(
-                translate=True, rotate=True, scale=True,
-                apply=True, normal=False, pn=True)
+            plan.freeze(meshes)
+
+        cache.get_cache(backend).invalidate(meshes)
 
     else:
-        pm.cmds.confirmDialog(
-            title='Error', message='A mesh was not selected.\n Select a mesh and re-run script',
-            button=['OK'], defaultButton='Yes', messageAlign='center')
+        backend.error('A mesh was not selected.\n Select a mesh and re-run script')
 
-def create_pivot_bone():
+@profiling.traced
+def drop_to_ground(backend=None, ground=None, max_distance=None):
     """
-    Copy of Randall Hess's repo:
-        https://techanimator.blogspot.com/2018/04/maya-create-bone-at-custom-pivot.html
-
-    Create a bone from the custom pivot context
+    Moves the pivots of the selected objects to the bottom center of their
+    bounding boxes and moves the objects along the up axis until their
+    pivots rest on the ground meshes below them.
+
+    The ground is the object selected last unless ground nodes are given.
+    A ray is cast down from the top center of every object against a BVH
+    of the ground triangles that is reused across calls until the ground
+    changes, see the ground module, and every object is moved in one
+    batch. The first surface below the top is the ground, objects sunk
+    into it are moved up. Objects with no ground below them, or none
+    within max_distance of their bottom, are left in place.
     """
 
-    import pymel.core as pm # pylint: disable=import-error
+    backend = backends.get_backend(backend)
 
-    # get these values
-    loc_xform = None
-    loc_rp = None
+    selection = backend.selection()
 
-    # Get manipulator pos and orient
-    manip_pin = pm.cmds.manipPivot(pinPivot=True)
-    manip_pos = pm.cmds.manipPivot(q=True, p=True)[0]
-    manip_rot = pm.cmds.manipPivot(q=True, o=True)[0]
-
-    # delete existing temp objs
-    temp_joint = None
-    temp_loc = None
-    temp_cluster = None
-    temp_joint_name = 'temp_joint'
-    temp_loc_name = 'temp_loc'
-    temp_cluster_name = 'temp_cluster'
-    temp_objs = [temp_joint_name, temp_loc_name]
-
-    # get the selectMode
-    sel_mode_obj = pm.cmds.selectMode(q=True, o=True)
-    sel_mode_component = pm.cmds.selectMode(q=True, co=True)
-
-    # store and clear selection
-    selection = pm.ls(sl=True)
-
-    if selection:
-        sel = selection[0]
+    if ground is None:
+        ground = selection[-1:]
+        objects = selection[:-1]
+    else:
+        objects = [node for node in selection if node not in ground]
 
-        # create temp joint and set pos/rot
-        pm.cmds.select(cl=True)
-        temp_joint = pm.joint(n=temp_joint_name)
-        temp_loc = pm.spaceLocator(n=temp_loc_name)
+    if objects and ground:
+        up_axis = backend.up_axis()
 
-        # get transform from the selected object
-        if isinstance(sel, pm.nt.Transform):
-            # snap loc to position
-            const = pm.pointConstraint(sel, temp_loc, mo=False, w=1.0)
-            pm.delete(const)
-            const = pm.orientConstraint(sel, temp_loc, mo=False, w=1.0)
-            pm.delete(const)
-
-        elif isinstance(sel, pm.nt.Mesh):
-            parent = sel.getParent()
-            if parent:
-                const = pm.pointConstraint(parent, temp_loc, mo=False, w=1.0)
-                pm.delete(const)
-                const = pm.orientConstraint(parent, temp_loc, mo=False, w=1.0)
-                pm.delete(const)
-
-                # get the transforms
-                loc_xform = pm.xform(temp_loc, q=True, m=True, ws=True)
-                loc_rp = pm.xform(temp_loc, q=True, ws=True, rp=True)
-
-        # rotate the temp_loc if manip rot has been modified
-        if not manip_rot == (0.0, 0.0, 0.0):
-            pm.rotate(temp_loc, manip_rot)
-
-        # move position to the cluster position
-        if not manip_pos == (0.0, 0.0, 0.0):
-            pm.xform(temp_loc, ws=True, t=manip_pos)
-
-        # get the transforms
-        loc_xform = pm.xform(temp_loc, q=True, m=True, ws=True)
-        loc_rp = pm.xform(temp_loc, q=True, ws=True, rp=True)
-
-        # get the position from the component selection
-        if not isinstance(sel, pm.nt.Transform):
-            pm.select(selection, r=True)
-            pm.ConvertSelectionToVertices()
-            try:
-                cluster = pm.cluster(n=temp_cluster_name)[1]
-            except:
-                pm.cmds.warning('You must select a mesh object!')
-                pm.delete(temp_joint)
-                pm.delete(temp_loc)
-                return
+        # the bottom center of every object becomes its pivot
+        bounding_boxes = geometry.as_bounds(
+            cache.get_cache(backend).world_bounding_boxes(backend, objects))
+        bottom_pivots = geometry.bottom_centers(bounding_boxes, up_axis)
+        axis = geometry.up_axis_index(up_axis)
+        heights = bounding_boxes[:, axis + 3] - bounding_boxes[:, axis]
+
+        # casts every object down from its top onto the ground in one pass
+        offsets, hits = ground_raycast.drop_offsets(
+            ground_raycast.ground_bvh(backend, ground), bottom_pivots, up_axis,
+            max_distance, heights)
 
-            # get the cluster position
-            pm.cmds.select(cl=True)
-            pos = pm.xform(cluster, q=True, ws=True, rp=True)
+        dropped = [node for node, hit in zip(objects, hits) if hit]
 
-            # snap to the cluster
-            const = pm.pointConstraint(cluster, temp_loc, mo=False, w=1.0)
-            pm.delete(const)
+        if dropped:
+            with transaction.EditPlan(backend) as plan:
+                # freeze transforms prior to moving the objects
+                plan.freeze(dropped)
 
-            pm.delete(cluster)
+                # moves the pivots to the bottom of the bounding boxes
+                plan.set_pivots(dropped, bottom_pivots[hits].tolist())
 
-            # rotate the temp_loc if manip rot has been modified
-            if not manip_rot == (0.0, 0.0, 0.0):
-                pm.rotate(temp_loc, manip_rot)
+                # moves the objects down onto the ground
+                plan.set_translations(dropped, offsets[hits].tolist())
 
-            # move position to the cluster position
-            if not manip_pos == (0.0, 0.0, 0.0):
-                pm.xform(temp_loc, ws=True, t=manip_pos)
+                # freeze transforms after the move
+                plan.freeze(dropped)
 
-            # get the transforms
-            loc_xform = pm.xform(temp_loc, q=True, m=True, ws=True)
-            loc_rp = pm.xform(temp_loc, q=True, ws=True, rp=True)
+            cache.get_cache(backend).invalidate(dropped)
 
-        # remove temp loc
-        pm.delete(temp_loc)
+        missed = [node for node, hit in zip(objects, hits) if not hit]
+        if missed:
+            backend.warning('No ground below these objects {0}'.format(str(missed)))
 
     else:
-        pm.cmds.warning('You must have a selection!')
-        return
+        backend.error(
+            'Select the objects to drop and the ground last ' +
+            'and re-run script')
+
+@profiling.traced
+def create_pivot_bone(backend=None, component_center='bounds'):
+    """
+    Copy of Randall Hess's repo:
+        https://techanimator.blogspot.com/2018/04/maya-create-bone-at-custom-pivot.html
+
+    Create a bone from the custom pivot context
 
-    # modify the joint and stu
-    if temp_joint:
-        if loc_xform and loc_rp:
-            pm.xform(temp_joint, m=loc_xform, ws=True)
-            pm.xform(temp_joint, piv=loc_rp, ws=True)
+    The bone is placed at the pivot of a selected object or at the
+    center of a component or mesh shape selection and takes the
+    orientation of the object, or of the transform of the shape, unless
+    the pinned manipulator was moved or rotated in which case its
+    position and orientation win.
 
-        # freeze orient
-        pm.select(temp_joint)
-        pm.makeIdentity(apply=True, translate=True, rotate=True, scale=True, n=False)
+    The positions of the selected components are read in one query and
+    reduced to the center of their bounds, where a cluster would put its
+    handle, or to their centroid with component_center='centroid'. No
+    temporary nodes are created.
+    """
+
+    backend = backends.get_backend(backend)
+
+    # Get manipulator pos and orient
+    backend.pin_manip_pivot(True)
+    manip_pos, manip_rot = backend.manip_pivot()
 
-    # unpin pivot
-    pm.cmds.manipPivot(pinPivot=False)
+    try:
+        selection = backend.selection()
+
+        if not selection:
+            backend.warning('You must have a selection!')
+            return
+
+        sel = selection[0]
+
+        # get these values
+        position = [0.0, 0.0, 0.0]
+        orientation = [0.0, 0.0, 0.0]
+
+        # get the position from the component or mesh shape selection
+        if '.' in sel or backend.is_type(sel, 'mesh'):
+            # a shape takes the orientation of its transform
+            if '.' not in sel:
+                parent = backend.parent(sel)
+                if parent:
+                    orientation = backend.world_rotation(parent)
+
+            positions = geometry.as_points(backend.component_positions(selection))
+            if not len(positions):
+                backend.warning('You must select a mesh object!')
+                return
+
+            bounds, centroid, _ = reduction.reduce_points(positions)
+            if component_center == 'centroid':
+                position = centroid.tolist()
+            else:
+                position = geometry.bounds_centers(bounds)[0].tolist()
+
+        # get transform from the selected object
+        else:
+            position = backend.world_pivot(sel)
+            orientation = backend.world_rotation(sel)
+
+        # rotate the bone if manip rot has been modified
+        if not tuple(manip_rot) == (0.0, 0.0, 0.0):
+            orientation = list(manip_rot)
+
+        # move position to the manip position
+        if not tuple(manip_pos) == (0.0, 0.0, 0.0):
+            position = list(manip_pos)
+
+        # create the joint with its orientation frozen into its joint orient
+        with backend.undo_chunk('create_pivot_bone'):
+            backend.select([])
+            joint = backend.create_joint(position, name='temp_joint', orientation=orientation)
+            backend.select([joint])
+
+    finally:
+        # unpin pivot
+        backend.pin_manip_pivot(False)
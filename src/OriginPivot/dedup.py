@@ -0,0 +1,88 @@
+"""
+Bounds of objects sharing identical geometry computed once per mesh.
+
+Kitbashed and set dressed scenes hold many copies or instances of the
+same meshes. Objects are grouped by the key of their object space
+geometry, see SceneBackend.geometry_keys, and the points of one object of
+every group of several objects are read once:
+
+- members that are only scaled and translated get the object space
+  bounds of their group moved by their world matrix
+- other members get the group's points transformed by their world matrix
+
+Neither needs a host query per member. Objects without a key, like
+groups with descendants, and objects whose geometry is not shared are
+queried as usual.
+"""
+
+import collections
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+
+
+def group_by_key(keys):
+    """
+    Returns the indices of every key that is not None, grouped by key in
+    order of first appearance.
+    """
+
+    groups = collections.OrderedDict()
+    for index, key in enumerate(keys):
+        if key is not None:
+            groups.setdefault(key, []).append(index)
+
+    return groups
+
+
+def world_bounding_boxes(backend, nodes):
+    """
+    Returns the world bounding box of every node as an (N, 6) array,
+    reading the geometry shared by several nodes once.
+
+    Issues one geometry_keys call, one world_matrices and object_points
+    call for the nodes sharing their geometry with others, plus one
+    world_bounding_boxes call for the other nodes: reading the points of
+    a mesh used once costs more than querying its bounds.
+    """
+
+    bounds = np.empty((len(nodes), 6))
+    if not nodes:
+        return bounds
+
+    groups = [
+        indices for indices in group_by_key(backend.geometry_keys(nodes)).values()
+        if len(indices) > 1]
+
+    shared = [index for indices in groups for index in indices]
+    if shared:
+        matrices = np.empty((len(nodes), 4, 4))
+        matrices[shared] = np.asarray(
+            backend.world_matrices([nodes[index] for index in shared]),
+            dtype=np.float64).reshape(-1, 4, 4)
+        aligned = np.zeros(len(nodes), dtype=bool)
+        aligned[shared] = geometry.axis_aligned(matrices[shared])
+
+        point_sets = backend.object_points([nodes[indices[0]] for indices in groups])
+
+        for indices, points in zip(groups, point_sets):
+            points = geometry.as_points(points)
+            indices = np.array(indices)
+
+            moved = indices[aligned[indices]]
+            if len(moved):
+                bounds[moved] = geometry.transform_aligned_bounds(
+                    geometry.bounds_from_points(points), matrices[moved])
+
+            for index in indices[~aligned[indices]]:
+                matrix = matrices[index]
+                bounds[index] = geometry.bounds_from_points(
+                    points.dot(matrix[:3, :3]) + matrix[3, :3])
+
+    shared = set(shared)
+    rest = [index for index in range(len(nodes)) if index not in shared]
+    if rest:
+        bounds[rest] = geometry.as_bounds(backend.world_bounding_boxes([nodes[index] for index in rest]))
+
+    return bounds
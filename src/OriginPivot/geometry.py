@@ -0,0 +1,374 @@
+"""
+Host independent pivot geometry.
+
+Every function in this module works on NumPy arrays holding the data of
+N objects at once so that the Maya facing functions in core only have to
+gather the data, make a single call into this module and write the
+results back.
+
+Bounding boxes use the same layout as exactWorldBoundingBox:
+xmin, ymin, zmin, xmax, ymax, zmax
+"""
+
+import numpy as np # pylint: disable=import-error
+
+from . import reduction
+
+# maps the values returned by upAxis(q=True, axis=True) to a column index
+UP_AXES = {'x': 0, 'y': 1, 'z': 2}
+
+
+def up_axis_index(up_axis):
+    """
+    Returns the column index of an up axis name.
+    """
+
+    try:
+        return UP_AXES[up_axis.lower()]
+    except (AttributeError, KeyError):
+        raise ValueError('Unsupported up axis: {0}'.format(up_axis))
+
+
+def as_points(points):
+    """
+    Returns points as a (V, 3) float64 array.
+
+    Accepts a flat list of coordinates like the ones returned by
+    xform queries or any nested sequence of xyz triplets.
+    """
+
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+
+def merge_points(point_sets):
+    """
+    Returns the points of several point clouds as one (V, 3) array.
+    """
+
+    return np.concatenate([as_points(points) for points in point_sets])
+
+
+def as_bounds(bounds):
+    """
+    Returns bounding boxes as an (N, 6) float64 array.
+
+    A single bounding box is promoted to a batch of one.
+    """
+
+    return np.asarray(bounds, dtype=np.float64).reshape(-1, 6)
+
+
+def bounds_from_points(points):
+    """
+    Returns the bounding box of a single point cloud as a (6,) array.
+
+    Arrays of more than reduction.PARALLEL_THRESHOLD points are reduced on
+    several threads with the same result.
+    """
+
+    if isinstance(points, np.ndarray) and points.size >= reduction.PARALLEL_THRESHOLD * 3:
+        return reduction.reduce_points(points)[0]
+
+    points = as_points(points)
+    if not len(points):
+        raise ValueError('Cannot compute the bounds of an empty point set')
+
+    return np.concatenate((points.min(axis=0), points.max(axis=0)))
+
+
+def bounds_from_point_sets(point_sets):
+    """
+    Returns the bounding boxes of several point clouds as an (N, 6) array.
+
+    The point clouds are stacked into one buffer and reduced with a single
+    segmented min and max so the cost does not grow with the number of
+    Python objects.
+    """
+
+    point_sets = [as_points(points) for points in point_sets]
+    if not point_sets:
+        return np.empty((0, 6))
+
+    counts = np.array([len(points) for points in point_sets])
+    if not counts.all():
+        raise ValueError('Cannot compute the bounds of an empty point set')
+
+    minimums, maximums = _segment_bounds(np.concatenate(point_sets), counts)
+
+    return np.hstack((minimums, maximums))
+
+
+def merge_bounds(bounds):
+    """
+    Returns the single bounding box enclosing every box of a batch.
+    """
+
+    bounds = as_bounds(bounds)
+    if not len(bounds):
+        raise ValueError('Cannot merge an empty set of bounds')
+
+    return np.concatenate((bounds[:, :3].min(axis=0), bounds[:, 3:].max(axis=0)))
+
+
+def bounds_centers(bounds):
+    """
+    Returns the center of every bounding box of a batch as an (N, 3) array.
+    """
+
+    bounds = as_bounds(bounds)
+
+    return (bounds[:, :3] + bounds[:, 3:]) / 2.0
+
+
+def bottom_centers(bounds, up_axis='y'):
+    """
+    Returns the bottom center of every bounding box of a batch.
+
+    The bottom center is the center of the box with the coordinate of the
+    up axis replaced by the minimum of the box on that axis.
+    """
+
+    bounds = as_bounds(bounds)
+    axis = up_axis_index(up_axis)
+
+    centers = bounds_centers(bounds)
+    centers[:, axis] = bounds[:, axis]
+
+    return centers
+
+
+def axis_aligned(matrices):
+    """
+    Returns whether every (4, 4) row vector matrix of a batch only scales
+    and translates, which maps bounding boxes to bounding boxes.
+    """
+
+    linear = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)[:, :3, :3]
+
+    return ~(linear * (1.0 - np.identity(3))).any(axis=(1, 2))
+
+
+def transform_aligned_bounds(bounds, matrices):
+    """
+    Returns a bounding box moved by every matrix of a batch of axis
+    aligned matrices, see axis_aligned, as an (N, 6) array.
+
+    The result is the same as the bounds of the transformed points since
+    scaling and translating preserves the order of coordinates.
+    """
+
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(6)
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+
+    scales = np.diagonal(matrices[:, :3, :3], axis1=1, axis2=2)
+    lows = bounds[:3] * scales + matrices[:, 3, :3]
+    highs = bounds[3:] * scales + matrices[:, 3, :3]
+
+    return np.hstack((np.minimum(lows, highs), np.maximum(lows, highs)))
+
+
+def origin_offsets(positions):
+    """
+    Returns the translations that move every position to the origin.
+    """
+
+    return -as_points(positions)
+
+
+def _segment_starts(counts):
+    return np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+
+def _segment_bounds(stacked, counts):
+    """
+    Returns the (N, 3) minimums and maximums of consecutive segments of
+    counts rows of a stacked array.
+
+    Segments of more than reduction.PARALLEL_THRESHOLD rows are reduced
+    on several threads.
+    """
+
+    starts = _segment_starts(counts)
+    if not (counts >= reduction.PARALLEL_THRESHOLD).any():
+        return (
+            np.minimum.reduceat(stacked, starts, axis=0),
+            np.maximum.reduceat(stacked, starts, axis=0))
+
+    bounds = np.array([
+        bounds_from_points(stacked[start:start + count])
+        for start, count in zip(starts, counts)])
+
+    return bounds[:, :3], bounds[:, 3:]
+
+
+def _segment_means(stacked, counts):
+    """
+    Returns the (N, 3) means of consecutive segments of counts rows of a
+    stacked array, reduced on several threads like _segment_bounds.
+    """
+
+    if not (counts >= reduction.PARALLEL_THRESHOLD).any():
+        return np.add.reduceat(stacked, _segment_starts(counts), axis=0) / counts[:, np.newaxis]
+
+    return np.array([
+        reduction.reduce_points(stacked[start:start + count])[1]
+        for start, count in zip(_segment_starts(counts), counts)])
+
+
+def oriented_bounding_boxes(point_sets):
+    """
+    Returns the oriented bounding boxes of several point clouds computed
+    along the principal axes of every cloud.
+
+    The covariance matrices of all clouds are built and diagonalized in
+    one batch. Returns three arrays: the (N, 3) box centers, the (N, 3, 3)
+    box axes stored as unit rows and the (N, 3) half extents along them.
+    """
+
+    point_sets = [as_points(points) for points in point_sets]
+    counts = np.array([len(points) for points in point_sets])
+    if not len(point_sets) or not counts.all():
+        raise ValueError('Cannot compute the bounds of an empty point set')
+
+    stacked = np.concatenate(point_sets)
+    starts = _segment_starts(counts)
+
+    means = _segment_means(stacked, counts)
+    centered = stacked - np.repeat(means, counts, axis=0)
+    outer = centered[:, :, np.newaxis] * centered[:, np.newaxis, :]
+    covariances = np.add.reduceat(outer, starts, axis=0) / counts[:, np.newaxis, np.newaxis]
+
+    # eigh returns the eigenvectors as columns
+    _, vectors = np.linalg.eigh(covariances)
+    axes = np.swapaxes(vectors, 1, 2)
+
+    projected = np.einsum('ij,ikj->ik', centered, np.repeat(axes, counts, axis=0))
+    minimums, maximums = _segment_bounds(projected, counts)
+
+    centers = means + np.einsum('ik,ikj->ij', (minimums + maximums) / 2.0, axes)
+
+    return centers, axes, (maximums - minimums) / 2.0
+
+
+def convex_hull_2d(points):
+    """
+    Returns the vertices of the convex hull of (M, 2) points in counter
+    clockwise order using Andrew's monotone chain.
+    """
+
+    points = np.unique(np.asarray(points, dtype=np.float64).reshape(-1, 2), axis=0)
+    if len(points) < 3:
+        return points
+
+    def cross(origin, first, second):
+        return (
+            (first[0] - origin[0]) * (second[1] - origin[1]) -
+            (first[1] - origin[1]) * (second[0] - origin[0]))
+
+    def half_hull(ordered):
+        hull = []
+        for point in ordered:
+            while len(hull) >= 2 and cross(hull[-2], hull[-1], point) <= 0:
+                hull.pop()
+            hull.append(tuple(point))
+        return hull[:-1]
+
+    ordered = points.tolist()
+
+    return np.array(half_hull(ordered) + half_hull(ordered[::-1]))
+
+
+def minimum_area_rectangle(points):
+    """
+    Returns the minimum area rectangle enclosing (M, 2) points.
+
+    Rotating calipers: the best rectangle has a side collinear with an
+    edge of the convex hull, every edge direction is tried at once.
+    Returns the (2,) center, the (2, 2) unit axes as rows and the (2,)
+    half extents.
+    """
+
+    hull = convex_hull_2d(points)
+    if len(hull) < 3:
+        # degenerate clouds fall back to the world axes
+        axes = np.identity(2)
+        minimums = hull.min(axis=0)
+        maximums = hull.max(axis=0)
+        return (minimums + maximums) / 2.0, axes, (maximums - minimums) / 2.0
+
+    edges = np.roll(hull, -1, axis=0) - hull
+    edges = edges / np.linalg.norm(edges, axis=1)[:, np.newaxis]
+    normals = np.column_stack((-edges[:, 1], edges[:, 0]))
+
+    along = edges.dot(hull.T)
+    across = normals.dot(hull.T)
+    areas = (along.max(axis=1) - along.min(axis=1)) * (across.max(axis=1) - across.min(axis=1))
+    best = int(np.argmin(areas))
+
+    axes = np.array([edges[best], normals[best]])
+    minimums = np.array([along[best].min(), across[best].min()])
+    maximums = np.array([along[best].max(), across[best].max()])
+    center = ((minimums + maximums) / 2.0).dot(axes)
+
+    return center, axes, (maximums - minimums) / 2.0
+
+
+def upright_bounding_boxes(point_sets, up_axis='y'):
+    """
+    Returns the tightest oriented bounding boxes of several point clouds
+    that keep one axis on the up axis.
+
+    The footprint of every cloud is enclosed by its exact minimum area
+    rectangle, see minimum_area_rectangle. Returns the same arrays as
+    oriented_bounding_boxes with the up axis as the last box axis.
+    """
+
+    axis = up_axis_index(up_axis)
+    plane = [index for index in range(3) if index != axis]
+
+    centers = []
+    axes = []
+    extents = []
+    for points in point_sets:
+        points = as_points(points)
+        if not len(points):
+            raise ValueError('Cannot compute the bounds of an empty point set')
+
+        center_2d, axes_2d, extents_2d = minimum_area_rectangle(points[:, plane])
+
+        bounds = bounds_from_points(points)
+
+        center = np.zeros(3)
+        center[plane] = center_2d
+        center[axis] = (bounds[axis] + bounds[axis + 3]) / 2.0
+
+        box_axes = np.zeros((3, 3))
+        box_axes[:2, plane] = axes_2d
+        box_axes[2, axis] = 1.0
+
+        centers.append(center)
+        axes.append(box_axes)
+        extents.append(np.append(extents_2d, (bounds[axis + 3] - bounds[axis]) / 2.0))
+
+    return np.array(centers), np.array(axes), np.array(extents)
+
+
+def oriented_bottom_centers(centers, axes, extents, up_axis='y'):
+    """
+    Returns the bottom center of every oriented bounding box.
+
+    The bottom is the face of the box on the side opposite to the up
+    axis, across the box axis closest to the up axis.
+    """
+
+    up = np.zeros(3)
+    up[up_axis_index(up_axis)] = 1.0
+
+    alignment = axes.dot(up)
+    closest = np.argmax(np.abs(alignment), axis=1)
+    rows = np.arange(len(axes))
+
+    signs = np.sign(alignment[rows, closest])
+    signs[signs == 0] = 1.0
+
+    return centers - (axes[rows, closest] * (signs * extents[rows, closest])[:, np.newaxis])
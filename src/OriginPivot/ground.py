@@ -0,0 +1,88 @@
+"""
+Raycasting objects onto ground meshes.
+
+Dropping props onto a floor or terrain casts a ray from the top of every
+prop, above its bottom center, down the up axis against the triangles of
+the ground meshes, so props already sunk into the ground find it. The
+triangles are gathered in one world_triangles call and indexed by a
+spatial.TriangleBVH that is kept per backend under the fingerprints of
+the ground meshes, so dressing a level prop after prop builds it once and
+only rebuilds it when the ground changes.
+"""
+
+import weakref
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+from . import spatial
+
+_indices = weakref.WeakKeyDictionary()
+
+
+def ground_bvh(backend, ground):
+    """
+    Returns the TriangleBVH of the world space triangles of ground nodes,
+    reusing the one built by the previous call while the ground nodes and
+    their fingerprints are unchanged.
+    """
+
+    ground = list(ground)
+    key = (tuple(ground), tuple(backend.fingerprints(ground)))
+
+    cached = _indices.get(backend)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    triangles = [
+        np.asarray(node_triangles, dtype=np.float64).reshape(-1, 3, 3)
+        for node_triangles in backend.world_triangles(ground)]
+    triangles = np.concatenate(triangles) if triangles else np.empty((0, 3, 3))
+    if not len(triangles):
+        raise ValueError('The ground nodes have no triangles')
+
+    bvh = spatial.TriangleBVH(triangles)
+    _indices[backend] = (key, bvh)
+
+    return bvh
+
+
+def invalidate(backend):
+    """
+    Drops the ground BVH of a backend, for ground edits its fingerprints
+    do not catch.
+    """
+
+    _indices.pop(backend, None)
+
+
+def drop_offsets(bvh, positions, up_axis='y', max_distance=None, heights=None):
+    """
+    Returns the translations moving every position along the up axis onto
+    the ground as an (N, 3) array, along with an (N,) array telling which
+    positions have ground below them within max_distance. The translation
+    of the other positions is zero.
+
+    heights holds the distance from every position up to the top of its
+    object. The rays start there and the first ground surface below the
+    top wins, a position already below the ground is moved up onto it.
+    """
+
+    positions = geometry.as_points(positions)
+    axis = geometry.up_axis_index(up_axis)
+    down = np.zeros(3)
+    down[axis] = -1.0
+
+    heights = (
+        np.zeros(len(positions)) if heights is None else np.asarray(heights, dtype=np.float64))
+    origins = positions.copy()
+    origins[:, axis] += heights
+
+    _, distances = bvh.raycast(
+        origins, down, heights + (np.inf if max_distance is None else max_distance))
+    hits = np.isfinite(distances)
+
+    offsets = np.zeros((len(distances), 3))
+    offsets[hits, axis] = heights[hits] - distances[hits]
+
+    return offsets, hits
@@ -0,0 +1,212 @@
+"""
+Persistent record of the assets a batch run normalized.
+
+The manifest is a SQLite database holding, for every source file, the
+hash of its content, the operation and parameters it was normalized with
+and the offset that was applied. A later run only reprocesses the files
+whose content or parameters changed since they were recorded.
+
+Hashing every file would still read the whole tree, so the size and
+modification time of a file are compared first and the content is only
+hashed when they differ from the recorded ones.
+
+Records are committed in batches of COMMIT_EVERY and when the manifest
+is closed, so a large run does not sync the database once per file.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+# bytes read at a time while hashing a file
+HASH_BLOCK_SIZE = 1 << 20
+
+# records and touches written between two commits
+COMMIT_EVERY = 100
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    offset TEXT NOT NULL,
+    updated REAL NOT NULL
+)
+'''
+
+
+def file_hash(path, block_size=HASH_BLOCK_SIZE):
+    """
+    Returns the SHA-1 hex digest of the content of a file.
+    """
+
+    digest = hashlib.sha1()
+    with io.open(path, 'rb') as source_file:
+        block = source_file.read(block_size)
+        while block:
+            digest.update(block)
+            block = source_file.read(block_size)
+
+    return digest.hexdigest()
+
+
+def file_stat(path):
+    """
+    Returns the size and the modification time in nanoseconds of a file.
+    """
+
+    stat = os.stat(path)
+
+    return stat.st_size, int(getattr(stat, 'st_mtime_ns', stat.st_mtime * 1e9))
+
+
+def _encode_parameters(parameters):
+    return json.dumps(parameters or {}, sort_keys=True)
+
+
+class Manifest(object):
+    """
+    SQLite manifest of normalized assets keyed by their relative path.
+
+    Can be used as a context manager that closes the database on exit.
+    Records and touches are committed every commit_every writes and on
+    close.
+    """
+
+    def __init__(self, path, commit_every=COMMIT_EVERY):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM assets').fetchone()[0]
+
+    def close(self):
+        """
+        Commits the pending writes and closes the database.
+        """
+
+        self.commit()
+        self.connection.close()
+
+    def commit(self):
+        """
+        Commits the pending writes.
+        """
+
+        self.connection.commit()
+        self._pending = 0
+
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def entry(self, relative_path):
+        """
+        Returns the recorded entry of a path as a dict, None if the path
+        was never recorded.
+        """
+
+        row = self.connection.execute(
+            'SELECT size, mtime, hash, operation, parameters, offset FROM assets WHERE path = ?',
+            (relative_path,)).fetchone()
+        if row is None:
+            return None
+
+        size, mtime, content_hash, operation, parameters, offset = row
+
+        return {
+            'size': size,
+            'mtime': mtime,
+            'hash': content_hash,
+            'operation': operation,
+            'parameters': json.loads(parameters),
+            'offset': json.loads(offset),
+        }
+
+    def status(self, relative_path, source, operation, parameters=None):
+        """
+        Returns whether a source file is up to date in the manifest along
+        with its content hash, which is None when it was not needed: the
+        file is new, its operation or parameters changed or the recorded
+        size and modification time were enough to tell it is unchanged.
+        """
+
+        entry = self.entry(relative_path)
+        if entry is None:
+            return False, None
+
+        if entry['operation'] != operation or entry['parameters'] != json.loads(
+                _encode_parameters(parameters)):
+            return False, None
+
+        if (entry['size'], entry['mtime']) == file_stat(source):
+            return True, None
+
+        content_hash = file_hash(source)
+
+        return content_hash == entry['hash'], content_hash
+
+    def touch(self, relative_path, source, stat=None):
+        """
+        Updates the recorded size and modification time of a file whose
+        content did not change.
+
+        stat is the (size, mtime) of the source, see file_stat, it is read
+        from the file when None.
+        """
+
+        size, mtime = stat or file_stat(source)
+        self.connection.execute(
+            'UPDATE assets SET size = ?, mtime = ? WHERE path = ?', (size, mtime, relative_path))
+        self._written()
+
+    def record(self, relative_path, source, content_hash, operation, parameters, offset,
+               stat=None):
+        """
+        Records the normalization of a file.
+
+        stat is the (size, mtime) of the source, see file_stat, it is read
+        from the file when None. Pass the one taken before the file was
+        read so a change made while it was processed is noticed next run.
+        """
+
+        size, mtime = stat or file_stat(source)
+        self.connection.execute(
+            'INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+                relative_path, size, mtime, content_hash, operation,
+                _encode_parameters(parameters),
+                json.dumps([float(value) for value in offset]), time.time()))
+        self._written()
+
+    def remove(self, relative_paths):
+        """
+        Drops the entries of paths, typically files deleted from the source.
+        """
+
+        self.connection.executemany(
+            'DELETE FROM assets WHERE path = ?', [(path,) for path in relative_paths])
+        self.commit()
+
+    def paths(self):
+        """
+        Returns the recorded relative paths.
+        """
+
+        return [row[0] for row in self.connection.execute('SELECT path FROM assets ORDER BY path')]
@@ -0,0 +1,150 @@
+"""
+Pivot normalization of Wavefront OBJ files without a host application.
+
+An OBJ file has no pivot, its origin acts as one. Normalizing a file moves
+its vertices so that a point of its bounding box, the bottom center for
+example, lands on the origin which is what move_pivot_to_bottom followed
+by move_to_origin does to an object inside Maya.
+
+Files are streamed line by line in two passes, the first one computes the
+bounds and the second one writes the translated vertices, so the memory
+used does not depend on the size of the file.
+"""
+
+import io
+import os
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+from . import quantiles
+from . import reduction
+
+# number of vertices parsed into one array while computing bounds
+CHUNK_SIZE = 65536
+
+# point each operation moves to the origin, 'ground' uses the ground
+# contact of the vertices instead of their bounding box
+OPERATIONS = ('bottom', 'center', 'ground')
+
+
+def _is_vertex(line):
+    return line[:2] in (b'v ', b'v\t')
+
+
+def iter_vertex_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields the vertex positions of an OBJ file as (chunk_size, 3) arrays.
+
+    The last chunk holds the remaining vertices.
+    """
+
+    chunk = []
+    with io.open(path, 'rb') as obj_file:
+        for line in obj_file:
+            if _is_vertex(line):
+                chunk.append(line.split()[1:4])
+
+                if len(chunk) == chunk_size:
+                    yield np.array(chunk, dtype=np.float64)
+                    chunk = []
+
+    if chunk:
+        yield np.array(chunk, dtype=np.float64)
+
+
+def obj_bounds(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the bounding box of the vertices of an OBJ file as a (6,) array.
+    """
+
+    bounds, _, count = reduction.reduce_chunks(iter_vertex_chunks(path, chunk_size))
+    if not count:
+        raise ValueError('{0} has no vertices'.format(path))
+
+    return bounds
+
+
+def normalization_offset(bounds, operation='bottom', up_axis='y'):
+    """
+    Returns the translation an operation applies to a bounding box.
+    """
+
+    if operation == 'bottom':
+        target = geometry.bottom_centers(bounds, up_axis)
+    elif operation == 'center':
+        target = geometry.bounds_centers(bounds)
+    else:
+        raise ValueError('Unsupported operation: {0}'.format(operation))
+
+    return geometry.origin_offsets(target)[0]
+
+
+def translate_obj(source, destination, offset):
+    """
+    Writes source to destination with every vertex translated by offset.
+
+    Lines other than vertex positions are copied untouched, as are the
+    optional w and color values of the vertex lines. destination can be
+    the source file, the result is written next to it and moved over it
+    once complete.
+    """
+
+    offset = [float(value) for value in offset]
+    partial = destination + '.part'
+
+    with io.open(source, 'rb') as source_file:
+        with io.open(partial, 'wb') as destination_file:
+            for line in source_file:
+                if _is_vertex(line):
+                    fields = line.split()
+                    position = [
+                        repr(float(value) + delta).encode('ascii')
+                        for value, delta in zip(fields[1:4], offset)]
+                    ending = line[len(line.rstrip(b'\r\n')):]
+                    line = b' '.join([b'v'] + position + fields[4:]) + ending
+
+                destination_file.write(line)
+
+    if os.path.exists(destination):
+        os.remove(destination)
+    os.rename(partial, destination)
+
+
+def normalize_obj(source, destination, operation='bottom', up_axis='y', vertex_cache=None,
+                  percentile=quantiles.DEFAULT_PERCENTILE, content_hash=None):
+    """
+    Moves the vertices of an OBJ file so a point of its bounding box lands
+    on the origin and writes the result to destination.
+
+    operation is 'bottom' to use the bottom center of the bounding box
+    along up_axis or 'center' to use its center. 'ground' uses the ground
+    contact of the vertices, see quantiles.ground_contact, with the up
+    axis at the given percentile.
+
+    With a vertex_cache.VertexCache the bounds are read from the cache
+    instead of being parsed from the source. content_hash is the hash of
+    the source when the caller already computed it, the cache then does
+    not hash the source again.
+
+    Returns the translation applied to the vertices.
+    """
+
+    if operation == 'ground':
+        if vertex_cache is not None:
+            chunks = quantiles.iter_point_chunks(vertex_cache.get(source, content_hash).points)
+        else:
+            chunks = iter_vertex_chunks(source)
+        offset = geometry.origin_offsets(
+            quantiles.ground_contact(chunks, up_axis, percentile))[0]
+
+    else:
+        if vertex_cache is not None:
+            bounds = vertex_cache.bounds(source, content_hash)
+        else:
+            bounds = obj_bounds(source)
+
+        offset = normalization_offset(bounds, operation, up_axis)
+    translate_obj(source, destination, offset)
+
+    return offset.tolist()
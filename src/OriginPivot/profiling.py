@@ -0,0 +1,363 @@
+"""
+Opt-in profiling of the host calls the pivot functions make.
+
+A Profiler instruments a backend in place so every host command it
+issues is timed: the maya.cmds commands of a MayaBackend, or the
+interface methods of any other backend. The backend object stays the
+same so the caches kept per backend stay shared with uninstrumented
+runs. Calls are grouped under the core function they were made
+from along with the calls its edit plans saved by batching, see
+transaction.EditPlan, and the results can be printed as a table or
+written as a Chrome trace file to open in chrome://tracing or Perfetto.
+
+    profiler = profiling.enable()
+    core.move_pivot_to_bottom()
+    profiling.disable()
+    print(profiler.summary())
+    profiler.write_chrome_trace('originpivot_trace.json')
+"""
+
+import collections
+import functools
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np # pylint: disable=import-error
+
+from . import backends
+
+_active_profiler = None
+_previous_backend = None
+
+# marks an attribute the backend did not have before it was instrumented
+_MISSING = object()
+
+
+class Event(object):
+    """
+    A timed host command or operation.
+    """
+
+    __slots__ = ('name', 'category', 'operation', 'start', 'duration', 'thread')
+
+    def __init__(self, name, category, operation, start, duration, thread):
+        self.name = name
+        self.category = category
+        self.operation = operation
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+
+
+class _InstrumentedCommands(object):
+    """
+    Proxy timing every call made through the callables of its target.
+    """
+
+    def __init__(self, target, profiler):
+        self._target = target
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        return _timed(attribute, name, self._profiler)
+
+
+def _timed(function, name, profiler):
+    """
+    Returns function recording every call as a host event of profiler.
+    """
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.record(name, 'host', start, time.time() - start)
+
+    return timed
+
+
+class Profiler(object):
+    """
+    Collects the timings of host commands and of the operations issuing
+    them.
+    """
+
+    def __init__(self):
+        self.events = []
+        # backend calls saved by edit plans, per operation
+        self.saved_calls = collections.Counter()
+        self._local = threading.local()
+        # backend attributes replaced by instrument and their previous values
+        self._replaced = []
+
+    @property
+    def current_operation(self):
+        """
+        Name of the operation running on the current thread.
+        """
+
+        return getattr(self._local, 'operation', None)
+
+    def record(self, name, category, start, duration):
+        """
+        Records an event that started at start and lasted duration seconds.
+        """
+
+        self.events.append(Event(
+            name, category, self.current_operation, start, duration,
+            threading.current_thread().ident))
+
+    def _replace(self, backend, name, value):
+        self._replaced.append((backend, name, backend.__dict__.get(name, _MISSING)))
+        setattr(backend, name, value)
+
+    def record_saved_calls(self, count):
+        """
+        Adds count backend calls an edit plan saved to the operation
+        running on the current thread.
+        """
+
+        self.saved_calls[self.current_operation] += count
+
+    def instrument(self, backend):
+        """
+        Times the host commands of backend until restore is called and
+        returns it.
+
+        Backends issuing commands through a cmds attribute, like
+        MayaBackend, get their commands wrapped, other backends get their
+        interface methods wrapped. The backend is changed in place rather
+        than copied so its bounds cache and ground BVH, which are kept
+        per backend object, see the edits made while profiling.
+        """
+
+        if hasattr(backend, 'cmds'):
+            self._replace(backend, 'cmds', _InstrumentedCommands(backend.cmds, self))
+            return backend
+
+        for name in dir(backends.SceneBackend):
+            if name.startswith('_') or not callable(getattr(backends.SceneBackend, name)):
+                continue
+            self._replace(backend, name, _timed(getattr(backend, name), name, self))
+
+        return backend
+
+    def restore(self):
+        """
+        Removes the instrumentation of every backend instrumented by this
+        profiler.
+        """
+
+        while self._replaced:
+            backend, name, value = self._replaced.pop()
+            if value is _MISSING:
+                delattr(backend, name)
+            else:
+                setattr(backend, name, value)
+
+    def run(self, name, function, *args, **kwargs):
+        """
+        Runs function as the operation name and returns its result.
+        """
+
+        previous = self.current_operation
+        self._local.operation = name
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._local.operation = previous
+            self.record(name, 'operation', start, time.time() - start)
+
+    def clear(self):
+        """
+        Drops every recorded event.
+        """
+
+        self.events = []
+        self.saved_calls.clear()
+
+    def command_stats(self):
+        """
+        Returns a dict of statistics of every host command: call count,
+        total, mean, p50, p90, p99 and max durations in seconds.
+        """
+
+        durations = {}
+        for event in self.events:
+            if event.category == 'host':
+                durations.setdefault(event.name, []).append(event.duration)
+
+        stats = {}
+        for name, values in durations.items():
+            values = np.array(values)
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            stats[name] = {
+                'count': len(values),
+                'total': float(values.sum()),
+                'mean': float(values.mean()),
+                'p50': float(p50),
+                'p90': float(p90),
+                'p99': float(p99),
+                'max': float(values.max()),
+            }
+
+        return stats
+
+    def operation_stats(self):
+        """
+        Returns a dict of totals of every operation: number of runs, wall
+        time, number of host calls, time spent in them and number of host
+        calls saved by edit plans.
+        """
+
+        stats = {}
+        for event in self.events:
+            if event.category == 'operation':
+                entry = stats.setdefault(event.name, {
+                    'runs': 0, 'total': 0.0, 'host_calls': 0, 'host_total': 0.0,
+                    'saved_calls': self.saved_calls[event.name]})
+                entry['runs'] += 1
+                entry['total'] += event.duration
+
+        for event in self.events:
+            if event.category == 'host' and event.operation in stats:
+                stats[event.operation]['host_calls'] += 1
+                stats[event.operation]['host_total'] += event.duration
+
+        return stats
+
+    def summary(self):
+        """
+        Returns the command and operation statistics as text tables sorted
+        by total time.
+        """
+
+        lines = ['{0:<28} {1:>8} {2:>11} {3:>11} {4:>11} {5:>11} {6:>11}'.format(
+            'command', 'calls', 'total s', 'mean ms', 'p50 ms', 'p99 ms', 'max ms')]
+        commands = self.command_stats()
+        for name in sorted(commands, key=lambda name: -commands[name]['total']):
+            stat = commands[name]
+            lines.append(
+                '{0:<28} {1:>8} {2:>11.4f} {3:>11.3f} {4:>11.3f} {5:>11.3f} {6:>11.3f}'.format(
+                    name, stat['count'], stat['total'], stat['mean'] * 1e3,
+                    stat['p50'] * 1e3, stat['p99'] * 1e3, stat['max'] * 1e3))
+
+        lines.append('')
+        lines.append('{0:<28} {1:>8} {2:>11} {3:>11} {4:>11} {5:>11}'.format(
+            'operation', 'runs', 'total s', 'host calls', 'host s', 'saved'))
+        operations = self.operation_stats()
+        for name in sorted(operations, key=lambda name: -operations[name]['total']):
+            stat = operations[name]
+            lines.append('{0:<28} {1:>8} {2:>11.4f} {3:>11} {4:>11.4f} {5:>11}'.format(
+                name, stat['runs'], stat['total'], stat['host_calls'], stat['host_total'],
+                stat['saved_calls']))
+
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        Returns the events in the Chrome trace event format.
+        """
+
+        process = os.getpid()
+        events = []
+        for event in self.events:
+            trace_event = {
+                'name': event.name,
+                'cat': event.category,
+                'ph': 'X',
+                'ts': event.start * 1e6,
+                'dur': event.duration * 1e6,
+                'pid': process,
+                'tid': event.thread,
+            }
+            if event.operation:
+                trace_event['args'] = {'operation': event.operation}
+            events.append(trace_event)
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        """
+        Writes the events to a Chrome trace JSON file.
+        """
+
+        with io.open(path, 'w', encoding='utf8') as trace_file:
+            trace_file.write(u'{0}'.format(json.dumps(self.chrome_trace())))
+
+
+def traced(function):
+    """
+    Decorator running a function as an operation of the active profiler.
+
+    Does nothing but call the function when profiling is disabled.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _active_profiler is None:
+            return function(*args, **kwargs)
+
+        return _active_profiler.run(function.__name__, function, *args, **kwargs)
+
+    return wrapper
+
+
+def record_saved_calls(count):
+    """
+    Adds backend calls saved by an edit plan to the active profiler, does
+    nothing when profiling is disabled.
+    """
+
+    if _active_profiler is not None:
+        _active_profiler.record_saved_calls(count)
+
+
+def enable(backend=None):
+    """
+    Starts profiling and returns the Profiler.
+
+    The backend, or the current one, is instrumented and set as the
+    current backend until disable is called, which restores the backend
+    that was current before.
+    """
+
+    global _active_profiler, _previous_backend # pylint: disable=global-statement
+
+    if _active_profiler is not None:
+        disable()
+
+    _previous_backend = backends.current_backend()
+    backend = backends.get_backend(backend)
+    _active_profiler = Profiler()
+    backends.set_backend(_active_profiler.instrument(backend))
+
+    return _active_profiler
+
+
+def disable():
+    """
+    Stops profiling, restores the current backend and returns the Profiler.
+    """
+
+    global _active_profiler, _previous_backend # pylint: disable=global-statement
+
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.restore()
+        backends.set_backend(_previous_backend)
+
+    _active_profiler = None
+    _previous_backend = None
+
+    return profiler
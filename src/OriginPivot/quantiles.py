@@ -0,0 +1,195 @@
+"""
+Streaming quantiles of vertex coordinates in bounded memory.
+
+The bottom of a bounding box is the lowest vertex of an object, a single
+stray vertex or a cable hanging below a prop drags it down. The ground
+contact of an object is more robust: the coordinate of the up axis is a
+low percentile of the vertices and the footprint center is the median of
+the other two coordinates.
+
+Sorting tens of millions of coordinates to get them is not needed.
+QuantileSketch is a KLL sketch: values are kept in compactors, one per
+level, where a value of level h stands for 2 ** h input values. A full
+compactor is sorted and every other value, starting at a random offset,
+moves up a level. The sketch holds about 3 * k values whatever the
+number of values it saw and the rank of a quantile it returns is off by
+about 1.7 / k of the count, 0.7% with the default k. Until a compactor
+fills up nothing is discarded and the quantiles are exact.
+"""
+
+from __future__ import division
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+
+# size of the largest compactor, the rank error is about 1.7 / K
+K = 256
+
+# ratio between the sizes of consecutive compactors
+_SHRINK = 2.0 / 3.0
+
+# percentile of the up axis used as the ground contact by default
+DEFAULT_PERCENTILE = 1.0
+
+# number of points fed to the sketches at once
+CHUNK_SIZE = 65536
+
+
+class QuantileSketch(object):
+    """
+    KLL sketch of a stream of values.
+
+    Values are added with update, sketches of parts of a stream can be
+    combined with merge. seed makes the random offsets, and so the
+    results, reproducible.
+    """
+
+    def __init__(self, k=K, seed=0):
+        self.k = k
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._levels = [np.empty(0)]
+        self._random = np.random.RandomState(seed)
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * _SHRINK ** depth)))
+
+    def _compress(self):
+        while True:
+            full = [
+                level for level, values in enumerate(self._levels)
+                if len(values) > self._capacity(level)]
+            if not full:
+                return
+
+            level = full[0]
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+
+            values = np.sort(self._levels[level])
+            # an odd value stays on its level with its weight
+            kept = len(values) % 2
+            promoted = values[kept + self._random.randint(2)::2]
+
+            self._levels[level] = values[:kept]
+            self._levels[level + 1] = np.concatenate((self._levels[level + 1], promoted))
+
+    def update(self, values):
+        """
+        Adds an array of values to the sketch.
+        """
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+
+        self.count += len(values)
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._levels[0] = np.concatenate((self._levels[0], values))
+        self._compress()
+
+    def merge(self, other):
+        """
+        Adds the values of another sketch to this one.
+        """
+
+        if not other.count:
+            return
+
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, values in enumerate(other._levels):
+            self._levels[level] = np.concatenate((self._levels[level], values))
+        self._compress()
+
+    def quantile(self, fraction):
+        """
+        Returns the value below which a fraction, between 0 and 1, of the
+        values of the stream lies.
+
+        The smallest and largest values are tracked exactly.
+        """
+
+        if not self.count:
+            raise ValueError('Cannot compute the quantile of an empty sketch')
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError('Quantile fraction out of range: {0}'.format(fraction))
+
+        if fraction == 0.0:
+            return float(self.minimum)
+        if fraction == 1.0:
+            return float(self.maximum)
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level_values), 2 ** level, dtype=np.int64)
+            for level, level_values in enumerate(self._levels)])
+
+        order = np.argsort(values, kind='mergesort')
+        ranks = np.cumsum(weights[order])
+        index = min(int(np.searchsorted(ranks, fraction * ranks[-1])), len(order) - 1)
+
+        return float(values[order[index]])
+
+
+def iter_point_chunks(points, chunk_size=CHUNK_SIZE):
+    """
+    Yields the rows of a point array, a memmap for example, as
+    (chunk_size, 3) arrays.
+    """
+
+    points = np.asarray(points).reshape(-1, 3)
+    for start in range(0, len(points), chunk_size):
+        yield points[start:start + chunk_size]
+
+
+def ground_contact(chunks, up_axis='y', percentile=DEFAULT_PERCENTILE, k=K):
+    """
+    Returns the ground contact point of a stream of (M, 3) point chunks as
+    a (3,) array.
+
+    The coordinate of the up axis is the given percentile, between 0 and
+    100, of the coordinates of the points on that axis and the other two
+    are their medians. Every chunk is added to three QuantileSketch so the
+    points are seen once and never held together.
+    """
+
+    if not 0.0 <= percentile <= 100.0:
+        raise ValueError('Percentile out of range: {0}'.format(percentile))
+
+    axis = geometry.up_axis_index(up_axis)
+    sketches = [QuantileSketch(k) for _ in range(3)]
+    for chunk in chunks:
+        chunk = geometry.as_points(chunk)
+        for column, sketch in enumerate(sketches):
+            sketch.update(chunk[:, column])
+
+    if not sketches[0].count:
+        raise ValueError('Cannot compute the ground contact of an empty point set')
+
+    return np.array([
+        sketch.quantile(percentile / 100.0 if column == axis else 0.5)
+        for column, sketch in enumerate(sketches)])
+
+
+def ground_contacts(point_sets, up_axis='y', percentile=DEFAULT_PERCENTILE, k=K):
+    """
+    Returns the ground contact point of several point clouds as an
+    (N, 3) array, see ground_contact.
+    """
+
+    contacts = [
+        ground_contact(iter_point_chunks(points), up_axis, percentile, k)
+        for points in point_sets]
+
+    return np.array(contacts).reshape(-1, 3)
@@ -0,0 +1,109 @@
+"""
+Multi-threaded bounds and centroid reduction of very large point arrays.
+
+A single pass over tens of millions of vertices is bound by memory
+bandwidth on one core. reduce_points splits the rows of a point array
+into chunks, reduces every chunk with NumPy kernels, which release the
+GIL, on a pool of threads and merges the partial results.
+
+Bounds are identical bit for bit to the serial reduction because min and
+max never round. The centroid is a sum of float64 chunk sums divided by
+the number of points, it only differs from points.mean(axis=0) in the
+order of the additions: the difference stays within MEAN_TOLERANCE times
+the largest absolute coordinate.
+
+The rows are reduced in place, float32 arrays and read-only memmaps of
+the vertex cache are not copied. Streams of chunks parsed from OBJ files
+are reduced with reduce_chunks while the next chunks are parsed.
+"""
+
+from __future__ import division
+
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+import numpy as np # pylint: disable=import-error
+
+# number of points reduced by one task
+CHUNK_SIZE = 1 << 20
+
+# number of points from which geometry.bounds_from_points goes parallel
+PARALLEL_THRESHOLD = 1 << 22
+
+# bound of the difference between the parallel and serial centroids,
+# relative to the largest absolute coordinate
+MEAN_TOLERANCE = 1e-12
+
+
+def _reduce_chunk(chunk):
+    return chunk.min(axis=0), chunk.max(axis=0), chunk.sum(axis=0, dtype=np.float64)
+
+
+def _merge(partials, count):
+    minimums, maximums, sums = (np.array(values) for values in zip(*partials))
+    bounds = np.concatenate((minimums.min(axis=0), maximums.max(axis=0))).astype(np.float64)
+
+    return bounds, sums.sum(axis=0) / count, count
+
+
+def reduce_points(points, chunk_size=CHUNK_SIZE, threads=None):
+    """
+    Returns the bounding box as a (6,) array, the centroid as a (3,) array
+    and the number of points of an (N, 3) point array.
+
+    threads defaults to the number of CPUs, arrays of a single chunk are
+    reduced on the calling thread.
+    """
+
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 3:
+        points = points.reshape(-1, 3)
+    if not len(points):
+        raise ValueError('Cannot reduce an empty point set')
+
+    chunks = [points[start:start + chunk_size] for start in range(0, len(points), chunk_size)]
+
+    if len(chunks) == 1:
+        partials = [_reduce_chunk(chunks[0])]
+    else:
+        pool = ThreadPool(min(threads or multiprocessing.cpu_count(), len(chunks)))
+        try:
+            partials = pool.map(_reduce_chunk, chunks)
+        finally:
+            pool.close()
+            pool.join()
+
+    return _merge(partials, len(points))
+
+
+def reduce_chunks(chunks, threads=None):
+    """
+    Returns the bounding box, centroid and number of points of a stream
+    of (M, 3) point chunks, see reduce_points. The bounding box and the
+    centroid are None for a stream without points.
+
+    The chunks are reduced on a pool of threads as they come so parsing
+    or reading the next chunks, which happens on the pool's feeder
+    thread, overlaps the reduction of the previous ones.
+    """
+
+    counts = []
+
+    def counted():
+        for chunk in chunks:
+            chunk = np.asarray(chunk).reshape(-1, 3)
+            if len(chunk):
+                counts.append(len(chunk))
+                yield chunk
+
+    pool = ThreadPool(threads or multiprocessing.cpu_count())
+    try:
+        partials = list(pool.imap(_reduce_chunk, counted()))
+    finally:
+        pool.close()
+        pool.join()
+
+    if not partials:
+        return None, None, 0
+
+    return _merge(partials, sum(counts))
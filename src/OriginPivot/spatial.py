@@ -0,0 +1,350 @@
+"""
+Spatial indices used to match objects with the closest of many targets.
+
+KDTree answers nearest point queries and SegmentBVH nearest segment
+queries in O(log M) per query for M indexed targets. Both are built once
+from NumPy arrays and queried with an (N, 3) array of positions.
+
+TriangleBVH answers raycasts against triangle meshes, like the floor an
+object is dropped on.
+"""
+
+import heapq
+
+import numpy as np # pylint: disable=import-error
+
+from . import geometry
+
+# number of targets kept in a leaf and compared by brute force
+LEAF_SIZE = 8
+
+# number of triangles kept in a leaf, testing a batch of rays against a
+# leaf costs about as much as descending a level so leaves hold more
+# triangles than segments
+TRIANGLE_LEAF_SIZE = 32
+
+# triangles whose plane is closer than this to being parallel to a ray
+# are never hit by it
+PARALLEL_EPSILON = 1e-12
+
+
+class KDTree(object):
+    """
+    k-d tree over an (M, 3) array of points.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.points = geometry.as_points(points)
+        if not len(self.points):
+            raise ValueError('Cannot build a k-d tree without points')
+
+        self.leaf_size = leaf_size
+        # every node is (axis, split, left, right) or (None, indices, None, None)
+        self._nodes = []
+        self._build(np.arange(len(self.points)))
+
+    def _build(self, indices):
+        index = len(self._nodes)
+        self._nodes.append(None)
+
+        if len(indices) <= self.leaf_size:
+            self._nodes[index] = (None, indices, None, None)
+            return index
+
+        points = self.points[indices]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, axis], kind='mergesort')
+        middle = len(indices) // 2
+        split = points[order[middle], axis]
+
+        left = self._build(indices[order[:middle]])
+        right = self._build(indices[order[middle:]])
+        self._nodes[index] = (axis, split, left, right)
+
+        return index
+
+    def _nearest(self, point):
+        best_index = -1
+        best_distance = np.inf
+        stack = [(0, 0.0)]
+
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_distance:
+                continue
+
+            axis, split, left, right = self._nodes[node]
+            if axis is None:
+                distances = ((self.points[split] - point) ** 2).sum(axis=1)
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best_distance = distances[closest]
+                    best_index = int(split[closest])
+                continue
+
+            delta = point[axis] - split
+            near, far = (left, right) if delta < 0 else (right, left)
+
+            # the far side is pushed first so the near side is visited first
+            stack.append((far, delta * delta))
+            stack.append((near, bound))
+
+        return best_index, np.sqrt(best_distance)
+
+    def query(self, points):
+        """
+        Returns the index of the nearest indexed point of every point and
+        the distance to it as two (N,) arrays.
+        """
+
+        points = geometry.as_points(points)
+        indices = np.empty(len(points), dtype=np.int64)
+        distances = np.empty(len(points))
+
+        for row, point in enumerate(points):
+            indices[row], distances[row] = self._nearest(point)
+
+        return indices, distances
+
+
+def point_segment_distances(point, starts, ends):
+    """
+    Returns the distance from a point to every segment of a batch.
+    """
+
+    direction = ends - starts
+    lengths = (direction ** 2).sum(axis=1)
+    safe_lengths = np.where(lengths > 0, lengths, 1.0)
+    ratio = np.clip(((point - starts) * direction).sum(axis=1) / safe_lengths, 0.0, 1.0)
+    ratio = np.where(lengths > 0, ratio, 0.0)
+    closest = starts + direction * ratio[:, np.newaxis]
+
+    return np.sqrt(((closest - point) ** 2).sum(axis=1))
+
+
+def _box_distance(point, box):
+    return np.sqrt((np.maximum(np.maximum(box[:3] - point, point - box[3:]), 0.0) ** 2).sum())
+
+
+class SegmentBVH(object):
+    """
+    Bounding volume hierarchy over line segments.
+
+    Segments are given as two (M, 3) arrays of start and end points, a
+    segment whose start and end are equal behaves like a point.
+    """
+
+    def __init__(self, starts, ends, leaf_size=LEAF_SIZE):
+        self.starts = geometry.as_points(starts)
+        self.ends = geometry.as_points(ends)
+        if not len(self.starts) or len(self.starts) != len(self.ends):
+            raise ValueError('Segments need as many start points as end points')
+
+        self.leaf_size = leaf_size
+        self._boxes = np.hstack((
+            np.minimum(self.starts, self.ends), np.maximum(self.starts, self.ends)))
+        # every node is (box, left, right, indices), indices only set on leaves
+        self._nodes = []
+        self._build(np.arange(len(self.starts)))
+
+    def _build(self, indices):
+        index = len(self._nodes)
+        self._nodes.append(None)
+        box = geometry.merge_bounds(self._boxes[indices])
+
+        if len(indices) <= self.leaf_size:
+            self._nodes[index] = (box, None, None, indices)
+            return index
+
+        centers = geometry.bounds_centers(self._boxes[indices])
+        axis = int(np.argmax(box[3:] - box[:3]))
+        order = np.argsort(centers[:, axis], kind='mergesort')
+        middle = len(indices) // 2
+
+        left = self._build(indices[order[:middle]])
+        right = self._build(indices[order[middle:]])
+        self._nodes[index] = (box, left, right, None)
+
+        return index
+
+    def _nearest(self, point):
+        best_index = -1
+        best_distance = np.inf
+        heap = [(_box_distance(point, self._nodes[0][0]), 0)]
+
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if bound >= best_distance:
+                break
+
+            _, left, right, indices = self._nodes[node]
+            if indices is not None:
+                distances = point_segment_distances(point, self.starts[indices], self.ends[indices])
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best_distance = distances[closest]
+                    best_index = int(indices[closest])
+                continue
+
+            for child in (left, right):
+                heapq.heappush(heap, (_box_distance(point, self._nodes[child][0]), child))
+
+        return best_index, best_distance
+
+    def query(self, points):
+        """
+        Returns the index of the nearest segment of every point and the
+        distance to it as two (N,) arrays.
+        """
+
+        points = geometry.as_points(points)
+        indices = np.empty(len(points), dtype=np.int64)
+        distances = np.empty(len(points))
+
+        for row, point in enumerate(points):
+            indices[row], distances[row] = self._nearest(point)
+
+        return indices, distances
+
+
+def ray_box_distances(origins, direction, box):
+    """
+    Returns the distance along a direction from every origin of a batch
+    to where its ray enters a bounding box, inf for rays missing it and 0
+    for origins inside it.
+    """
+
+    parallel = direction == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lows = (box[:3] - origins) / direction
+        highs = (box[3:] - origins) / direction
+
+    inside = ((origins >= box[:3]) & (origins <= box[3:])) | ~parallel
+    near = np.where(parallel, -np.inf, np.minimum(lows, highs)).max(axis=1)
+    far = np.where(parallel, np.inf, np.maximum(lows, highs)).min(axis=1)
+
+    hit = inside.all(axis=1) & (near <= far) & (far >= 0)
+
+    return np.where(hit, np.maximum(near, 0.0), np.inf)
+
+
+def _cross(first, second):
+    # np.cross moves axes around, this is faster on small batches
+    return np.stack((
+        first[..., 1] * second[..., 2] - first[..., 2] * second[..., 1],
+        first[..., 2] * second[..., 0] - first[..., 0] * second[..., 2],
+        first[..., 0] * second[..., 1] - first[..., 1] * second[..., 0]), axis=-1)
+
+
+def ray_triangle_distances(origins, direction, corners):
+    """
+    Returns the distance along a direction from every origin of a batch
+    to every triangle of a batch as an (N, T) array, inf where the ray
+    misses the triangle.
+
+    Moller-Trumbore intersection, triangles are hit from both sides.
+    """
+
+    first = corners[:, 1] - corners[:, 0]
+    second = corners[:, 2] - corners[:, 0]
+
+    normal = _cross(direction, second)
+    determinants = (first * normal).sum(axis=1)
+    valid = np.abs(determinants) > PARALLEL_EPSILON
+    inverse = 1.0 / np.where(valid, determinants, 1.0)
+
+    offsets = origins[:, np.newaxis, :] - corners[np.newaxis, :, 0]
+    u = np.einsum('ntj,tj->nt', offsets, normal) * inverse
+    crossed = _cross(offsets, first)
+    v = crossed.dot(direction) * inverse
+    distances = np.einsum('ntj,tj->nt', crossed, second) * inverse
+
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (distances >= 0)
+
+    return np.where(hit, distances, np.inf)
+
+
+class TriangleBVH(object):
+    """
+    Bounding volume hierarchy over an (M, 3, 3) array of triangles, one
+    row of three corners per triangle.
+    """
+
+    def __init__(self, triangles, leaf_size=TRIANGLE_LEAF_SIZE):
+        self.triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 3)
+        if not len(self.triangles):
+            raise ValueError('Cannot build a triangle BVH without triangles')
+
+        self.leaf_size = leaf_size
+        self._boxes = np.hstack((self.triangles.min(axis=1), self.triangles.max(axis=1)))
+        # every node is (box, left, right, indices), indices only set on leaves
+        self._nodes = []
+        self._build(np.arange(len(self.triangles)))
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def _build(self, indices):
+        index = len(self._nodes)
+        self._nodes.append(None)
+        box = geometry.merge_bounds(self._boxes[indices])
+
+        if len(indices) <= self.leaf_size:
+            self._nodes[index] = (box, None, None, indices)
+            return index
+
+        centers = geometry.bounds_centers(self._boxes[indices])
+        axis = int(np.argmax(box[3:] - box[:3]))
+        order = np.argsort(centers[:, axis], kind='mergesort')
+        middle = len(indices) // 2
+
+        left = self._build(indices[order[:middle]])
+        right = self._build(indices[order[middle:]])
+        self._nodes[index] = (box, left, right, None)
+
+        return index
+
+    def raycast(self, origins, direction, max_distance=np.inf):
+        """
+        Returns the index of the closest triangle hit by a ray from every
+        origin along a shared direction and the distance to it as two
+        (N,) arrays, -1 and inf for rays hitting nothing within
+        max_distance, a single distance or one per ray.
+
+        All rays walk the hierarchy together, every node is tested once
+        against the rays that reach it.
+        """
+
+        origins = geometry.as_points(origins)
+        direction = np.asarray(direction, dtype=np.float64).reshape(3)
+        direction = direction / np.linalg.norm(direction)
+
+        indices = np.full(len(origins), -1, dtype=np.int64)
+        distances = np.empty(len(origins))
+        distances[:] = max_distance
+
+        stack = [(0, np.arange(len(origins)))]
+        while stack:
+            node, rays = stack.pop()
+            box, left, right, triangles = self._nodes[node]
+
+            entries = ray_box_distances(origins[rays], direction, box)
+            rays = rays[np.isfinite(entries) & (entries <= distances[rays])]
+            if not len(rays):
+                continue
+
+            if triangles is not None:
+                hits = ray_triangle_distances(origins[rays], direction, self.triangles[triangles])
+                closest = np.argmin(hits, axis=1)
+                nearest = hits[np.arange(len(rays)), closest]
+                closer = nearest < distances[rays]
+                distances[rays[closer]] = nearest[closer]
+                indices[rays[closer]] = triangles[closest[closer]]
+                continue
+
+            stack.append((right, rays))
+            stack.append((left, rays))
+
+        distances[indices < 0] = np.inf
+
+        return indices, distances
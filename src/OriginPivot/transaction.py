@@ -0,0 +1,183 @@
+"""
+Deferred scene edits.
+
+Interleaving queries and edits makes the host re-evaluate the scene
+between every step. An EditPlan records the freezes, pivot moves and
+translations a function intends to make and flushes them at the end in
+a single undo chunk with as few backend calls as possible. The calls
+saved by every flush are reported to the active profiler, see the
+profiling module.
+
+Edits of different objects are assumed to be independent: an object's
+own edits are always issued in the order they were recorded but may be
+grouped with the edits of other objects. Do not record edits for an
+object and one of its descendants in the same plan unless they follow
+the same sequence of steps.
+"""
+
+import collections
+
+from . import baking
+from . import profiling
+
+FREEZE = 'freeze'
+PIVOT = 'pivot'
+TRANSLATE = 'translate'
+
+
+class EditPlan(object):
+    """
+    Records edits and issues them in batches when flushed.
+
+    Can be used as a context manager that flushes on a clean exit:
+
+        with EditPlan(backend) as plan:
+            plan.freeze(nodes)
+            plan.set_pivot(nodes, [0, 0, 0])
+            plan.freeze(nodes)
+
+    With bake set freezes are issued through baking.freeze_transforms,
+    None uses the bake_freezes attribute of the backend.
+    """
+
+    def __init__(self, backend, name='OriginPivot', bake=None):
+        self.backend = backend
+        self.name = name
+        self.bake = backend.bake_freezes if bake is None else bake
+        # number of backend calls the edits would have cost if issued
+        # as they were recorded
+        self.recorded = 0
+        # number of backend calls the flushes issued
+        self.issued = 0
+        # saved calls already reported to the profiler
+        self._reported = 0
+        self._steps = collections.OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self):
+        return sum(len(steps) for steps in self._steps.values())
+
+    @property
+    def saved(self):
+        """
+        Number of backend calls saved by batching the recorded edits.
+        """
+
+        return self.recorded - self.issued
+
+    def _record(self, node, kind, value=None):
+        steps = self._steps.setdefault(node, [])
+
+        if steps and steps[-1][0] == kind:
+            # freezing twice in a row is the same as freezing once and a
+            # pivot or translation overrides the one set just before
+            if kind != FREEZE:
+                steps[-1] = (kind, value)
+            return
+
+        steps.append((kind, value))
+
+    def freeze(self, nodes):
+        """
+        Records freezing the transforms of nodes.
+        """
+
+        self.recorded += 1
+        for node in nodes:
+            self._record(node, FREEZE)
+
+    def set_pivot(self, nodes, position):
+        """
+        Records moving the pivots of nodes to one world space position.
+        """
+
+        self.recorded += 1
+        position = tuple(float(value) for value in position)
+        for node in nodes:
+            self._record(node, PIVOT, position)
+
+    def set_pivots(self, nodes, positions):
+        """
+        Records moving the pivot of every node to its own world space
+        position.
+        """
+
+        self.recorded += 1
+        for node, position in zip(nodes, positions):
+            self._record(node, PIVOT, tuple(float(value) for value in position))
+
+    def set_translations(self, nodes, positions):
+        """
+        Records setting the world space translation of every node.
+        """
+
+        self.recorded += 1
+        for node, position in zip(nodes, positions):
+            self._record(node, TRANSLATE, tuple(float(value) for value in position))
+
+    def _issue(self, kind, nodes, values):
+        if kind == FREEZE:
+            if self.bake:
+                baking.freeze_transforms(self.backend, nodes)
+            else:
+                self.backend.freeze(nodes)
+        elif kind == PIVOT:
+            if len(set(values)) == 1:
+                self.backend.set_world_pivot(nodes, list(values[0]))
+            else:
+                self.backend.set_world_pivots(nodes, [list(value) for value in values])
+        else:
+            self.backend.set_world_translations(nodes, [list(value) for value in values])
+
+        self.issued += 1
+
+    def flush(self):
+        """
+        Issues the recorded edits in one undo chunk and clears the plan.
+
+        The next batch always takes the kind of the oldest pending edit
+        and gathers the pending edits of that kind of every object so
+        objects following the same steps are edited together.
+
+        Returns the number of backend calls issued.
+        """
+
+        issued = self.issued
+        pending = collections.OrderedDict(
+            (node, collections.deque(steps)) for node, steps in self._steps.items() if steps)
+        self._steps = collections.OrderedDict()
+
+        if not pending:
+            self._report()
+            return 0
+
+        with self.backend.undo_chunk(self.name):
+            while pending:
+                kind = next(iter(pending.values()))[0][0]
+
+                nodes = []
+                values = []
+                for node, steps in pending.items():
+                    if steps[0][0] == kind:
+                        nodes.append(node)
+                        values.append(steps.popleft()[1])
+
+                self._issue(kind, nodes, values)
+
+                for node in nodes:
+                    if not pending[node]:
+                        del pending[node]
+
+        self._report()
+
+        return self.issued - issued
+
+    def _report(self):
+        profiling.record_saved_calls(self.saved - self._reported)
+        self._reported = self.saved
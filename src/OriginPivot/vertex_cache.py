@@ -0,0 +1,235 @@
+"""
+On-disk cache of the vertex positions of OBJ files.
+
+Parsing the text of a heavy OBJ file is far slower than reading its
+vertices back as binary, so the first pass over a file can write them to
+a cache file along with their bounds and centroid. Later passes open the
+cache file as a read-only NumPy memmap, which maps the file instead of
+reading it, and most queries only need the header.
+
+A cache file is a 128 byte little endian header followed by the (N, 3)
+vertex positions:
+
+    magic       4s   b'OPVC'
+    version     H
+    dtype       2s   b'f4' or b'f8'
+    count       Q    number of vertices
+    size        Q    size of the source file
+    mtime       q    modification time of the source file in nanoseconds
+    bounds      6d   xmin, ymin, zmin, xmax, ymax, zmax
+    centroid    3d
+    source hash 20s  SHA-1 of the source file
+
+An entry is stale when the hash of its source file changed, the source
+is only hashed when its size or modification time differ from the ones
+in the header, which are updated when the content turns out unchanged.
+"""
+
+import hashlib
+import os
+import struct
+
+import numpy as np # pylint: disable=import-error
+
+from . import manifest
+from . import obj
+from . import reduction
+
+MAGIC = b'OPVC'
+VERSION = 1
+HEADER_SIZE = 128
+EXTENSION = '.opvc'
+
+_HEADER = struct.Struct('<4sH2sQQq6d3d20s')
+# size and mtime of the source, rewritten when only the mtime changed
+_STAT = struct.Struct('<Qq')
+_STAT_OFFSET = struct.calcsize('<4sH2sQ')
+_DTYPES = {b'f4': np.dtype('<f4'), b'f8': np.dtype('<f8')}
+
+
+class VertexCacheEntry(object):
+    """
+    Header fields and memory mapped vertices of a cache file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as cache_file:
+            header = cache_file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError('{0} is not a vertex cache file'.format(path))
+
+        fields = _HEADER.unpack_from(header)
+        magic, version, dtype, count, size, mtime = fields[:6]
+        if magic != MAGIC or version != VERSION or dtype not in _DTYPES:
+            raise ValueError('{0} is not a vertex cache file'.format(path))
+
+        self.dtype = _DTYPES[dtype]
+        self.count = count
+        self.source_size = size
+        self.source_mtime = mtime
+        self.bounds = np.array(fields[6:12])
+        self.centroid = np.array(fields[12:15])
+        self.source_hash = fields[15]
+        self._points = None
+
+    @property
+    def points(self):
+        """
+        The (N, 3) vertex positions mapped from the file.
+        """
+
+        if self._points is None:
+            if self.count:
+                self._points = np.memmap(
+                    self.path, dtype=self.dtype, mode='r',
+                    offset=HEADER_SIZE, shape=(self.count, 3))
+            else:
+                self._points = np.empty((0, 3), dtype=self.dtype)
+
+        return self._points
+
+    def is_current(self, source, content_hash=None):
+        """
+        Returns whether the entry still matches a source file.
+
+        content_hash is the hash of the source when the caller already
+        computed it. A source whose content did not change since the
+        entry was written gets its new size and modification time written
+        to the header, like manifest.Manifest.touch, so it is not hashed
+        again.
+        """
+
+        if not os.path.exists(source):
+            return False
+
+        stat = manifest.file_stat(source)
+        if stat == (self.source_size, self.source_mtime):
+            return True
+
+        if (content_hash or manifest.file_hash(source)) != _hex(self.source_hash):
+            return False
+
+        self.touch(*stat)
+
+        return True
+
+    def touch(self, size, mtime):
+        """
+        Rewrites the size and modification time of the source in the
+        header.
+        """
+
+        with open(self.path, 'r+b') as cache_file:
+            cache_file.seek(_STAT_OFFSET)
+            cache_file.write(_STAT.pack(size, mtime))
+
+        self.source_size = size
+        self.source_mtime = mtime
+
+
+def _hex(digest):
+    return ''.join('{0:02x}'.format(value) for value in bytearray(digest))
+
+
+def write_entry(source, path, dtype='f8', chunk_size=obj.CHUNK_SIZE, content_hash=None):
+    """
+    Parses the vertices of an OBJ file into a cache file and returns the
+    opened VertexCacheEntry.
+
+    Bounds and centroid are computed from the parsed float64 values so
+    they stay exact when the vertices are stored as float32. The source
+    is hashed unless its content_hash is given.
+    """
+
+    dtype = dtype.encode('ascii') if not isinstance(dtype, bytes) else dtype
+    if dtype not in _DTYPES:
+        raise ValueError('Unsupported vertex cache dtype: {0}'.format(dtype))
+
+    size, mtime = manifest.file_stat(source)
+    source_hash = bytes(bytearray.fromhex(content_hash or manifest.file_hash(source)))
+
+    partial = path + '.part'
+
+    with open(partial, 'wb') as cache_file:
+        cache_file.write(b'\0' * HEADER_SIZE)
+
+        def written():
+            for chunk in obj.iter_vertex_chunks(source, chunk_size):
+                cache_file.write(chunk.astype(_DTYPES[dtype]).tobytes())
+                yield chunk
+
+        bounds, centroid, count = reduction.reduce_chunks(written())
+        if not count:
+            bounds, centroid = np.zeros(6), np.zeros(3)
+
+        cache_file.seek(0)
+        cache_file.write(_HEADER.pack(
+            MAGIC, VERSION, dtype, count, size, mtime,
+            *(bounds.ravel().tolist() + centroid.tolist() + [source_hash])))
+
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(partial, path)
+
+    return VertexCacheEntry(path)
+
+
+class VertexCache(object):
+    """
+    Directory of cache files of OBJ sources, one file per source path.
+    """
+
+    def __init__(self, directory, dtype='f8'):
+        self.directory = directory
+        self.dtype = dtype
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another process created it first
+                if not os.path.isdir(directory):
+                    raise
+
+    def entry_path(self, source):
+        """
+        Returns the path of the cache file of a source file.
+        """
+
+        key = hashlib.sha1(os.path.abspath(source).encode('utf8')).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(source))[0]
+
+        return os.path.join(self.directory, '{0}_{1}{2}'.format(name, key, EXTENSION))
+
+    def get(self, source, content_hash=None):
+        """
+        Returns the VertexCacheEntry of a source file, writing it first when
+        it is missing or stale.
+
+        content_hash is the hash of the source when the caller already
+        computed it, the source is then not read again to hash it.
+        """
+
+        path = self.entry_path(source)
+        if os.path.exists(path):
+            try:
+                entry = VertexCacheEntry(path)
+            except ValueError:
+                entry = None
+            if entry is not None and entry.is_current(source, content_hash):
+                return entry
+
+        return write_entry(source, path, self.dtype, content_hash=content_hash)
+
+    def bounds(self, source, content_hash=None):
+        """
+        Returns the bounding box of the vertices of a source file as a
+        (6,) array, see get.
+        """
+
+        entry = self.get(source, content_hash)
+        if not entry.count:
+            raise ValueError('{0} has no vertices'.format(source))
+
+        return entry.bounds
@@ -0,0 +1,11 @@
+"""
+Tests of OriginPivot, run against MemoryScene scenes so Maya is not needed.
+"""
+
+import os
+import sys
+
+# the package lives under src and runs from the checkout without installing
+_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _SOURCE not in sys.path:
+    sys.path.insert(0, _SOURCE)
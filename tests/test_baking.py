@@ -0,0 +1,116 @@
+"""
+Tests of baking.freeze_transforms against MemoryScene.freeze on rotated
+and scaled hierarchies.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import baking
+from OriginPivot import core
+from OriginPivot.backends import MemoryScene
+from OriginPivot.backends import OpenMayaBackend
+from OriginPivot.backends import openmaya_standin
+
+from .test_core import CUBE
+
+NODES = ['root', 'arm', 'hand', 'prop']
+
+
+def _scene():
+    """
+    Returns a rotated and scaled hierarchy of cubes with pivots away from
+    their object space origins, along with an unrelated cube.
+    """
+
+    scene = MemoryScene()
+    scene.add_mesh('root', CUBE, translate=[1.0, 2.0, 3.0], rotate=[10.0, 20.0, 30.0],
+                   scale=[2.0, 1.0, 0.5])
+    scene.add_mesh('arm', CUBE, parent='root', translate=[4.0, 0.0, 0.0],
+                   rotate=[0.0, 0.0, 45.0], scale=[1.0, 3.0, 1.0])
+    scene.add_node('hand', parent='arm', translate=[0.0, 2.0, 0.0], rotate=[90.0, 0.0, 0.0])
+    scene.add_mesh('prop', CUBE, translate=[-5.0, 0.0, 0.0], rotate=[0.0, 60.0, 0.0])
+    scene.set_world_pivot(['root'], [0.0, -1.0, 0.0])
+    scene.set_world_pivot(['arm'], [3.0, 3.0, 3.0])
+
+    return scene
+
+
+class FreezeTransformsTest(unittest.TestCase):
+
+    def assertSameScene(self, baked, frozen):
+        for node in NODES:
+            np.testing.assert_allclose(
+                baked.world_pivot(node), frozen.world_pivot(node), atol=1e-9)
+            np.testing.assert_allclose(
+                baked.world_points([node])[0], frozen.world_points([node])[0], atol=1e-9)
+            np.testing.assert_allclose(
+                baked.local_matrices([node])[0], frozen.local_matrices([node])[0], atol=1e-9)
+
+    def test_matches_freeze(self):
+        baked = _scene()
+        frozen = _scene()
+
+        baking.freeze_transforms(baked, ['root'])
+        frozen.freeze(['root'])
+
+        self.assertSameScene(baked, frozen)
+        # the node outside the frozen hierarchy is untouched
+        np.testing.assert_allclose(baked.world_rotation('prop'), [0.0, 60.0, 0.0], atol=1e-9)
+
+    def test_bulk_calls(self):
+        scene = _scene()
+        scene.calls.clear()
+
+        baking.freeze_transforms(scene, ['root', 'prop'])
+
+        self.assertEqual(dict(scene.calls), {
+            'hierarchy': 1, 'local_matrices': 1, 'object_pivots': 1, 'object_points': 1,
+            'set_object_points': 1, 'reset_transforms': 1})
+
+    def test_edit_plan_bakes(self):
+        baked = _scene()
+        baked.bake_freezes = True
+        frozen = _scene()
+
+        for scene in (baked, frozen):
+            scene.select(['root', 'prop'])
+            core.move_pivot_to_bottom(scene, per_object=True)
+
+        self.assertNotIn('freeze', baked.calls)
+        self.assertEqual(baked.calls['reset_transforms'], 2)
+        self.assertSameScene(baked, frozen)
+
+    def test_openmaya_reads(self):
+        baked = _scene()
+        frozen = _scene()
+        backend = OpenMayaBackend(
+            om=openmaya_standin.create(baked), fallback=baked, bake_freezes=True)
+
+        backend.select(['root'])
+        core.move_pivot_to_bottom(backend)
+        frozen.select(['root'])
+        core.move_pivot_to_bottom(frozen)
+
+        # the matrices, pivots and points were read through the API
+        self.assertNotIn('local_matrices', baked.calls)
+        self.assertEqual(baked.calls['set_object_points'], 2)
+        self.assertSameScene(baked, frozen)
+
+    def test_undo(self):
+        scene = _scene()
+        points = scene.world_points(NODES)
+        matrices = scene.local_matrices(NODES)
+
+        with scene.undo_chunk():
+            baking.freeze_transforms(scene, ['root'])
+        scene.undo()
+
+        for node_points, expected in zip(scene.world_points(NODES), points):
+            np.testing.assert_allclose(node_points, expected, atol=1e-9)
+        np.testing.assert_allclose(scene.local_matrices(NODES), matrices, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
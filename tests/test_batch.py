@@ -0,0 +1,129 @@
+"""
+Tests of batch runs over a temporary directory of OBJ files.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from OriginPivot import batch
+from OriginPivot import manifest
+
+TRIANGLE = 'v 0 1 2\nv 1 2 3\nv 2 0 1\nf 1 2 3\n'
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, 'source')
+        self.destination = os.path.join(self.root, 'destination')
+        os.makedirs(self.source)
+        for name in ('a.obj', 'b.obj'):
+            with open(os.path.join(self.source, name), 'w') as obj_file:
+                obj_file.write(TRIANGLE)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_journal_resume(self):
+        report = batch.run_batch(self.source, self.destination, processes=1)
+        self.assertEqual((report.processed, report.skipped), (2, 0))
+
+        report = batch.run_batch(self.source, self.destination, processes=1)
+        self.assertEqual((report.processed, report.skipped), (0, 2))
+
+        report = batch.run_batch(self.source, self.destination, operation='center', processes=1)
+        self.assertEqual((report.processed, report.skipped), (2, 0))
+
+    def test_manifest_records_worker_hashes(self):
+        path = os.path.join(self.root, 'assets.sqlite')
+        vertex_cache = os.path.join(self.root, 'cache')
+
+        report = batch.run_batch(
+            self.source, self.destination, processes=1, manifest=path, vertex_cache=vertex_cache)
+        self.assertEqual((report.processed, report.skipped), (2, 0))
+
+        connection = sqlite3.connect(path)
+        try:
+            hashes = dict(connection.execute('SELECT path, hash FROM assets'))
+        finally:
+            connection.close()
+        expected = manifest.file_hash(os.path.join(self.source, 'a.obj'))
+        self.assertEqual(hashes, {'a.obj': expected, 'b.obj': expected})
+
+        report = batch.run_batch(
+            self.source, self.destination, processes=1, manifest=path, vertex_cache=vertex_cache)
+        self.assertEqual((report.processed, report.skipped), (0, 2))
+
+    def test_manifest_records_worker_stats(self):
+        path = os.path.join(self.root, 'assets.sqlite')
+        calls = []
+        file_stat = manifest.file_stat
+
+        def counting_stat(source):
+            calls.append(source)
+            return file_stat(source)
+
+        # only the parent process sees the calls, the workers stat their
+        # own sources
+        manifest.file_stat = counting_stat
+        try:
+            report = batch.run_batch(self.source, self.destination, processes=1, manifest=path)
+        finally:
+            manifest.file_stat = file_stat
+
+        self.assertEqual(report.processed, 2)
+        self.assertEqual(calls, [])
+        with manifest.Manifest(path) as assets:
+            self.assertEqual(
+                (assets.entry('a.obj')['size'], assets.entry('a.obj')['mtime']),
+                file_stat(os.path.join(self.source, 'a.obj')))
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'assets.sqlite')
+        self.source = os.path.join(self.root, 'a.obj')
+        with open(self.source, 'w') as obj_file:
+            obj_file.write(TRIANGLE)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _committed(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            return [row[0] for row in connection.execute('SELECT path FROM assets ORDER BY path')]
+        finally:
+            connection.close()
+
+    def test_record_stat(self):
+        with manifest.Manifest(self.path) as assets:
+            assets.record('a.obj', self.source, 'hash', 'bottom', {}, [0.0, 0.0, 0.0], stat=(1, 2))
+
+            entry = assets.entry('a.obj')
+            self.assertEqual((entry['size'], entry['mtime']), (1, 2))
+
+    def test_batched_commits(self):
+        assets = manifest.Manifest(self.path, commit_every=2)
+        try:
+            assets.record('a.obj', self.source, 'hash', 'bottom', {}, [0.0, 0.0, 0.0])
+            self.assertEqual(self._committed(), [])
+
+            assets.record('b.obj', self.source, 'hash', 'bottom', {}, [0.0, 0.0, 0.0])
+            self.assertEqual(self._committed(), ['a.obj', 'b.obj'])
+
+            assets.record('c.obj', self.source, 'hash', 'bottom', {}, [0.0, 0.0, 0.0])
+        finally:
+            assets.close()
+
+        self.assertEqual(self._committed(), ['a.obj', 'b.obj', 'c.obj'])
+
+
+if __name__ == '__main__':
+    unittest.main()
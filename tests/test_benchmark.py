@@ -0,0 +1,93 @@
+"""
+Regression test of the backend calls of every benchmark against a stored
+baseline, and tests of the comparison against a baseline.
+
+The baseline only holds call counts, which are deterministic, wall time
+and peak memory depend on the machine and are left out. Regenerate it
+after an intended change, from src, with:
+    python -m OriginPivot.benchmark --sizes 100 --repeat 1 --calls-only
+        --baseline ../tests/benchmark_baseline.json --update
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from OriginPivot import benchmark
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_no_regression(self):
+        with io.open(BASELINE, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+        results = benchmark.run_benchmarks(sizes=(100,), repeat=1)
+
+        self.assertEqual(sorted(results), sorted(baseline))
+        self.assertEqual(benchmark.compare(results, baseline), [])
+
+    def test_update_calls_only(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'baseline.json')
+            arguments = [
+                '--sizes', '10', '--repeat', '1', '--only', 'move_to_origin', '--baseline', path]
+
+            self.assertEqual(benchmark.main(arguments + ['--update', '--calls-only']), 0)
+            with io.open(path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            self.assertEqual(benchmark.main(arguments), 0)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(sorted(baseline), ['move_to_origin/10'])
+        self.assertIsNone(baseline['move_to_origin/10']['seconds'])
+        self.assertIsNone(baseline['move_to_origin/10']['peak_bytes'])
+
+
+def _result(calls=10, seconds=1.0, peak_bytes=1000):
+    return {'calls': calls, 'seconds': seconds, 'peak_bytes': peak_bytes}
+
+
+class CompareTest(unittest.TestCase):
+
+    def test_within_threshold(self):
+        results = {'a/100': _result(seconds=1.2, peak_bytes=1200)}
+
+        self.assertEqual(benchmark.compare(results, {'a/100': _result()}, threshold=0.25), [])
+
+    def test_beyond_threshold(self):
+        results = {'a/100': _result(seconds=1.3, peak_bytes=1300)}
+
+        regressions = benchmark.compare(results, {'a/100': _result()}, threshold=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('a/100: seconds'))
+        self.assertTrue(regressions[1].startswith('a/100: peak_bytes'))
+
+    def test_missing_metrics_skipped(self):
+        results = {'a/100': _result(seconds=100.0, peak_bytes=None)}
+        baseline = {'a/100': _result(seconds=None, peak_bytes=1000)}
+
+        self.assertEqual(benchmark.compare(results, baseline), [])
+
+    def test_calls_may_not_grow(self):
+        results = {'a/100': _result(calls=11), 'b/100': _result(calls=9)}
+        baseline = {'a/100': _result(), 'b/100': _result()}
+
+        self.assertEqual(
+            benchmark.compare(results, baseline, threshold=10.0),
+            ['a/100: backend calls 11 > 10'])
+
+    def test_new_benchmarks_ignored(self):
+        self.assertEqual(benchmark.compare({'a/100': _result(calls=50)}, {}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
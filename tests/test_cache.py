@@ -0,0 +1,91 @@
+"""
+Tests of the bounds cache on MemoryScene scenes.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import cache
+from OriginPivot.backends import MemoryScene
+
+from .test_core import CUBE
+
+
+class BoundsCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = MemoryScene()
+        self.nodes = [
+            self.scene.add_mesh(name, CUBE, translate=[float(index), 0.0, 0.0])
+            for index, name in enumerate('abcd')]
+
+    def test_hits(self):
+        bounds_cache = cache.BoundsCache()
+
+        bounds = bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+        again = bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        # the second query is answered from the cache
+        self.assertEqual(self.scene.calls['world_bounding_boxes'], 1)
+        self.assertEqual((bounds_cache.hits, bounds_cache.misses), (4, 4))
+        np.testing.assert_array_equal(again, bounds)
+        np.testing.assert_array_equal(bounds, self.scene.world_bounding_boxes(self.nodes))
+
+    def test_lru_eviction(self):
+        bounds_cache = cache.BoundsCache()
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes[:1])
+        entry_size = bounds_cache.size
+        bounds_cache.max_bytes = entry_size * 3
+
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes[1:3])
+        # reading the first node makes the second the least recently used
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes[:1])
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes[3:])
+
+        self.assertEqual([node in bounds_cache for node in self.nodes], [True, False, True, True])
+        self.assertLessEqual(bounds_cache.size, bounds_cache.max_bytes)
+
+    def test_oversized_entry_skipped(self):
+        bounds_cache = cache.BoundsCache(max_bytes=1)
+
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        self.assertEqual((len(bounds_cache), bounds_cache.size), (0, 0))
+
+    def test_fingerprint_invalidation(self):
+        bounds_cache = cache.BoundsCache()
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        # an edit changes the fingerprint, no explicit invalidation needed
+        self.scene.set_world_translations(self.nodes[:1], [[0.0, 10.0, 0.0]])
+        bounds = bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        np.testing.assert_allclose(bounds[0], [-1.0, 9.0, -1.0, 1.0, 11.0, 1.0])
+        self.assertEqual(bounds_cache.misses, 5)
+
+    def test_invalidate(self):
+        bounds_cache = cache.BoundsCache()
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        bounds_cache.invalidate(self.nodes[:2])
+        self.assertEqual(len(bounds_cache), 2)
+
+        bounds_cache.invalidate()
+        self.assertEqual((len(bounds_cache), bounds_cache.size), (0, 0))
+
+    def test_refresh(self):
+        bounds_cache = cache.BoundsCache()
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        # freezing changes the fingerprints but not the world bounds
+        self.scene.freeze(self.nodes)
+        bounds_cache.refresh(self.scene, self.nodes)
+        bounds_cache.world_bounding_boxes(self.scene, self.nodes)
+
+        self.assertEqual(bounds_cache.hits, 4)
+        self.assertEqual(self.scene.calls['world_bounding_boxes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
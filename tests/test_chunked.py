@@ -0,0 +1,106 @@
+"""
+Tests of chunked runs, their cancellation and rollback on MemoryScene
+scenes.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import chunked
+from OriginPivot import core
+from OriginPivot.backends import MemoryScene
+
+from .test_core import CUBE
+
+
+class ChunkedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = MemoryScene()
+        self.objects = [
+            self.scene.add_mesh('mesh', CUBE, translate=[float(index), 1.0, 0.0])
+            for index in range(7)]
+        self.scene.select(self.objects)
+        self.pivots = self.scene.world_pivots(self.objects)
+
+    def assertRestored(self):
+        np.testing.assert_allclose(
+            self.scene.world_pivots(self.objects), self.pivots, atol=1e-9)
+        self.assertEqual(self.scene.selection(), self.objects)
+
+    def test_chunk_boundaries(self):
+        progress = list(chunked.iter_chunks(core.move_to_origin, self.scene, chunk_size=3))
+
+        self.assertEqual([(step.done, step.chunks) for step in progress], [(3, 1), (6, 2), (7, 3)])
+        self.assertEqual(progress[-1].fraction, 1.0)
+        # one undo step per chunk named after the run
+        self.assertTrue(self.scene.undo_name().startswith('move_to_origin #'))
+        self.assertTrue(self.scene.undo_name().endswith(' 3/3'))
+        np.testing.assert_allclose(
+            self.scene.world_pivots(self.objects), np.zeros((7, 3)), atol=1e-9)
+        self.assertEqual(self.scene.selection(), self.objects)
+
+    def test_cancel_restores(self):
+        run = chunked.iter_chunks(core.move_to_origin, self.scene, chunk_size=3)
+        next(run)
+        next(run)
+
+        run.close()
+
+        self.assertRestored()
+        self.assertEqual(self.scene.calls['undo'], 2)
+        self.assertEqual(self.scene.messages, [])
+
+    def test_progress_cancels(self):
+        last = chunked.run_chunked(
+            core.move_to_origin, self.scene, chunk_size=3, progress=lambda step: step.chunks < 2)
+
+        self.assertIsNone(last)
+        self.assertRestored()
+
+    def test_error_rolls_back(self):
+        calls = []
+
+        def process_events():
+            calls.append(None)
+            if len(calls) == 2:
+                raise RuntimeError('host error')
+
+        self.scene.process_events = process_events
+
+        with self.assertRaises(RuntimeError):
+            chunked.run_chunked(core.move_to_origin, self.scene, chunk_size=3)
+
+        self.assertRestored()
+
+    def test_edits_between_chunks_kept(self):
+        run = chunked.iter_chunks(core.move_to_origin, self.scene, chunk_size=3)
+        next(run)
+        with self.scene.undo_chunk('user'):
+            self.scene.set_world_translations([self.objects[-1]], [[0.0, 9.0, 0.0]])
+
+        run.close()
+
+        # the chunk below the edit is not undone, the user edit stays
+        self.assertNotIn('undo', self.scene.calls)
+        np.testing.assert_allclose(self.scene.world_pivot(self.objects[-1]), [0.0, 9.0, 0.0])
+        np.testing.assert_allclose(self.scene.world_pivot(self.objects[0]), [0.0, 0.0, 0.0])
+        self.assertEqual(self.scene.messages[-1][0], 'warning')
+
+    def test_nearest_joint_split(self):
+        joint = self.scene.add_joint('joint', [0.0, 0.0, 0.0])
+
+        objects, shared = chunked.split_selection(
+            core.move_pivot_to_joint, self.objects + [joint], self.scene, nearest=True)
+
+        self.assertEqual(objects, self.objects)
+        self.assertEqual(shared, [joint])
+
+    def test_unsupported_function(self):
+        with self.assertRaises(ValueError):
+            list(chunked.iter_chunks(core.move_pivot_to_bottom, self.scene))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,379 @@
+"""
+Behaviour tests of the pivot functions of core on MemoryScene scenes.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import core
+from OriginPivot import geometry
+from OriginPivot.backends import MemoryScene
+
+# object space corners of a 2 x 2 x 2 cube centered on the origin
+CUBE = [
+    [x, y, z] for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)]
+
+
+def _scene(up_axis='y'):
+    """
+    Returns a scene holding two cubes, one at (0, 5, 0) and one scaled by
+    2 at (10, 0, 0).
+    """
+
+    scene = MemoryScene(up_axis=up_axis)
+    scene.add_mesh('a', CUBE, translate=[0.0, 5.0, 0.0])
+    scene.add_mesh('b', CUBE, translate=[10.0, 0.0, 0.0], scale=[2.0, 2.0, 2.0])
+
+    return scene
+
+
+class PivotTestCase(unittest.TestCase):
+    """
+    Assertions on the world pivots and points of MemoryScene nodes.
+    """
+
+    def assertPivot(self, scene, node, expected):
+        np.testing.assert_allclose(scene.world_pivot(node), expected, atol=1e-9)
+
+    def assertPoints(self, scene, node, expected):
+        np.testing.assert_allclose(scene.world_points([node])[0], expected, atol=1e-9)
+
+
+class MovePivotToBottomTest(PivotTestCase):
+
+    def test_shared(self):
+        scene = _scene()
+        points = scene.world_points(['a', 'b'])
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_bottom(scene)
+
+        # the selection spans x -1..12, y -2..6 and z -2..2
+        self.assertPivot(scene, 'a', [5.5, -2.0, 0.0])
+        self.assertPivot(scene, 'b', [5.5, -2.0, 0.0])
+        self.assertPoints(scene, 'a', points[0])
+        self.assertPoints(scene, 'b', points[1])
+
+    def test_shared_cached(self):
+        scene = _scene()
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_bottom(scene)
+        core.move_pivot_to_bottom(scene)
+
+        # the second run reads the bounds of the first one from the cache
+        self.assertEqual(scene.calls['world_bounding_boxes'], 1)
+        self.assertNotIn('world_bounding_box', scene.calls)
+        self.assertPivot(scene, 'a', [5.5, -2.0, 0.0])
+
+    def test_per_object(self):
+        scene = _scene()
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_bottom(scene, per_object=True)
+
+        self.assertPivot(scene, 'a', [0.0, 4.0, 0.0])
+        self.assertPivot(scene, 'b', [10.0, -2.0, 0.0])
+
+    def test_z_up(self):
+        scene = _scene(up_axis='z')
+        scene.select(['a'])
+
+        core.move_pivot_to_bottom(scene)
+
+        self.assertPivot(scene, 'a', [0.0, 5.0, -1.0])
+
+    def test_dedup_matches_plain(self):
+        scene = _scene()
+        scene.add_mesh('c', CUBE, translate=[0.0, 0.0, 8.0], rotate=[0.0, 45.0, 0.0])
+        scene.select(['a', 'b', 'c'])
+        core.move_pivot_to_bottom(scene, per_object=True, dedup=True)
+
+        plain = _scene()
+        plain.add_mesh('c', CUBE, translate=[0.0, 0.0, 8.0], rotate=[0.0, 45.0, 0.0])
+        plain.select(['a', 'b', 'c'])
+        core.move_pivot_to_bottom(plain, per_object=True)
+
+        for node in ('a', 'b', 'c'):
+            self.assertPivot(scene, node, plain.world_pivot(node))
+
+    def test_dedup_reads_shared_points_only(self):
+        scene = _scene()
+        scene.add_mesh('c', np.array(CUBE) * 3.0, translate=[0.0, 0.0, 8.0])
+        read = []
+        object_points = scene.object_points
+        scene.object_points = lambda nodes: read.extend(nodes) or object_points(nodes)
+        scene.select(['a', 'b', 'c'])
+
+        core.move_pivot_to_bottom(scene, per_object=True, dedup=True)
+
+        # a and b share their cube, c is queried through its bounds
+        self.assertEqual(read, ['a'])
+        self.assertPivot(scene, 'c', [0.0, -3.0, 8.0])
+
+    def test_oriented(self):
+        scene = MemoryScene()
+        scene.add_mesh('a', CUBE, translate=[0.0, 3.0, 0.0], rotate=[0.0, 30.0, 0.0])
+        scene.select(['a'])
+
+        core.move_pivot_to_bottom(scene, oriented='hull')
+
+        self.assertPivot(scene, 'a', [0.0, 2.0, 0.0])
+
+    def test_percentile_ignores_stray_vertex(self):
+        scene = MemoryScene()
+        points = np.random.RandomState(0).uniform(-1.0, 1.0, (1000, 3))
+        points[0] = [0.0, -50.0, 0.0]
+        scene.add_mesh('a', points)
+        scene.select(['a'])
+
+        core.move_pivot_to_bottom(scene, percentile=1.0)
+
+        self.assertGreater(scene.world_pivot('a')[1], -1.0)
+
+    def test_modes_fall_back_to_pivots(self):
+        for kwargs in ({'oriented': 'pca'}, {'percentile': 1.0}):
+            scene = _scene()
+            scene.add_node('locator', translate=[0.0, -7.0, 0.0])
+            scene.select(['a', 'locator'])
+
+            core.move_pivot_to_bottom(scene, per_object=True, **kwargs)
+
+            self.assertPivot(scene, 'locator', [0.0, -7.0, 0.0])
+
+    def test_empty_selection(self):
+        scene = _scene()
+
+        core.move_pivot_to_bottom(scene)
+
+        self.assertEqual([kind for kind, _ in scene.messages], ['error'])
+
+    def test_undo(self):
+        scene = _scene()
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_bottom(scene, per_object=True)
+        scene.undo()
+
+        self.assertPivot(scene, 'a', [0.0, 5.0, 0.0])
+        self.assertPivot(scene, 'b', [10.0, 0.0, 0.0])
+
+
+class MoveToOriginTest(PivotTestCase):
+
+    def test_move_pivot_to_origin(self):
+        scene = _scene()
+        points = scene.world_points(['a', 'b'])
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_origin(scene)
+
+        self.assertPivot(scene, 'a', [0.0, 0.0, 0.0])
+        self.assertPivot(scene, 'b', [0.0, 0.0, 0.0])
+        self.assertPoints(scene, 'a', points[0])
+        self.assertPoints(scene, 'b', points[1])
+
+    def test_move_to_origin(self):
+        scene = _scene()
+        points = scene.world_points(['a', 'b'])
+        scene.select(['a', 'b'])
+
+        core.move_to_origin(scene)
+
+        self.assertPivot(scene, 'a', [0.0, 0.0, 0.0])
+        self.assertPivot(scene, 'b', [0.0, 0.0, 0.0])
+        self.assertPoints(scene, 'a', points[0] - [0.0, 5.0, 0.0])
+        self.assertPoints(scene, 'b', points[1] - [10.0, 0.0, 0.0])
+
+    def test_move_pivot_to_origin_calls(self):
+        # the host calls do not depend on the size of the selection
+        for count in (1, 10, 100):
+            scene = MemoryScene()
+            scene.select([scene.add_mesh('mesh', CUBE) for _ in range(count)])
+            scene.calls.clear()
+
+            core.move_pivot_to_origin(scene)
+
+            self.assertEqual(dict(scene.calls), {
+                'selection': 1, 'freeze': 2, 'set_world_pivot': 1, 'undo_chunk': 1})
+
+    def test_move_to_origin_calls(self):
+        # the pivots of every object are read in one call
+        for count in (1, 10, 100):
+            scene = MemoryScene()
+            scene.select([scene.add_mesh('mesh', CUBE) for _ in range(count)])
+            scene.calls.clear()
+
+            core.move_to_origin(scene)
+
+            self.assertEqual(dict(scene.calls), {
+                'selection': 1, 'world_pivots': 1, 'freeze': 2,
+                'set_world_translations': 1, 'undo_chunk': 1})
+
+
+class MovePivotToJointTest(PivotTestCase):
+
+    def test_last_joint(self):
+        scene = _scene()
+        scene.add_joint('joint', [1.0, 2.0, 3.0])
+        scene.select(['a', 'b', 'joint'])
+
+        core.move_pivot_to_joint(scene)
+
+        self.assertPivot(scene, 'a', [1.0, 2.0, 3.0])
+        self.assertPivot(scene, 'b', [1.0, 2.0, 3.0])
+
+    def test_nearest_joint(self):
+        scene = _scene()
+        scene.add_joint('near_a', [0.0, 6.0, 0.0])
+        scene.add_joint('near_b', [9.0, 0.0, 0.0])
+        scene.select(['a', 'b', 'near_a', 'near_b'])
+
+        core.move_pivot_to_joint(scene, nearest='joint')
+
+        self.assertPivot(scene, 'a', [0.0, 6.0, 0.0])
+        self.assertPivot(scene, 'b', [9.0, 0.0, 0.0])
+
+    def test_nearest_bone(self):
+        scene = _scene()
+        root = scene.add_joint('root', [0.0, 0.0, 0.0])
+        scene.add_joint('tip', [0.0, 10.0, 0.0], parent=root)
+        scene.add_joint('side', [12.0, 0.0, 0.0])
+        scene.select(['a', 'b', 'root', 'tip', 'side'])
+
+        core.move_pivot_to_joint(scene, nearest='bone')
+
+        # a lies on the bone from root to tip, which belongs to root
+        self.assertPivot(scene, 'a', [0.0, 0.0, 0.0])
+        self.assertPivot(scene, 'b', [12.0, 0.0, 0.0])
+
+    def test_no_joint(self):
+        scene = _scene()
+        scene.select(['a', 'b'])
+
+        core.move_pivot_to_joint(scene)
+
+        self.assertEqual([kind for kind, _ in scene.messages], ['error'])
+
+
+class CreateJointTest(PivotTestCase):
+
+    def test_at_pivot(self):
+        scene = _scene()
+        scene.select(['a', 'b'])
+
+        joints = core.create_joint_at_pivot(scene)
+
+        self.assertEqual(len(joints), 1)
+        self.assertPivot(scene, joints[0], [0.0, 5.0, 0.0])
+
+    def test_per_object_hierarchy(self):
+        scene = _scene()
+        child = scene.add_mesh('child', CUBE, parent='a', translate=[3.0, 0.0, 0.0])
+        scene.select(['a', child])
+
+        joints = core.create_joint_at_pivot(scene, per_object=True, parenting='hierarchy')
+
+        self.assertEqual(joints, ['a' + core.JOINT_SUFFIX, 'child' + core.JOINT_SUFFIX])
+        self.assertEqual(scene.parent(joints[1]), joints[0])
+        self.assertPivot(scene, joints[1], [3.0, 5.0, 0.0])
+
+    def test_per_object_calls(self):
+        # the pivots of every object are read in one call
+        for count in (1, 10, 100):
+            scene = MemoryScene()
+            scene.select([scene.add_mesh('mesh', CUBE) for _ in range(count)])
+            scene.calls.clear()
+
+            joints = core.create_joint_at_pivot(scene, per_object=True)
+
+            self.assertEqual(len(joints), count)
+            self.assertEqual(dict(scene.calls), {
+                'selection': 1, 'freeze': 1, 'world_pivots': 1, 'create_joints': 1,
+                'select': 1, 'undo_chunk': 1})
+
+    def test_pivot_bone_components(self):
+        scene = _scene()
+        scene.select(['b.vtx[*]'])
+
+        core.create_pivot_bone(scene)
+
+        joint = scene.selection()[0]
+        self.assertPivot(scene, joint, [10.0, 0.0, 0.0])
+        self.assertFalse(scene.manip_pinned)
+
+    def test_pivot_bone_mesh_shape(self):
+        scene = MemoryScene()
+        scene.add_node('prop', translate=[0.0, 2.0, 0.0], rotate=[0.0, 90.0, 0.0])
+        shape = scene.add_node(
+            'propShape', node_type='mesh', parent='prop', points=np.array(CUBE) + [4.0, 0.0, 0.0])
+        scene.select([shape])
+
+        core.create_pivot_bone(scene)
+
+        # the bone goes to the center of the shape with the orientation of
+        # its transform
+        joint = scene.selection()[0]
+        center = geometry.bounds_centers(scene.world_bounding_box([shape]))[0]
+        self.assertPivot(scene, joint, center)
+        np.testing.assert_allclose(
+            scene.world_rotation(joint), scene.world_rotation('prop'), atol=1e-9)
+        self.assertGreater(np.abs(center - scene.world_pivot('prop')).max(), 1.0)
+
+
+class DropToGroundTest(PivotTestCase):
+
+    def _ground(self, scene, height):
+        return scene.add_mesh(
+            'ground',
+            [[-50.0, height, -50.0], [50.0, height, -50.0],
+             [50.0, height, 50.0], [-50.0, height, 50.0]],
+            faces=[[0, 1, 2], [0, 2, 3]])
+
+    def test_drop(self):
+        scene = _scene()
+        ground = self._ground(scene, -3.0)
+        scene.select(['a', 'b', ground])
+
+        core.drop_to_ground(scene)
+
+        self.assertPivot(scene, 'a', [0.0, -3.0, 0.0])
+        self.assertPivot(scene, 'b', [10.0, -3.0, 0.0])
+
+    def test_sunk_object(self):
+        scene = _scene()
+        scene.add_mesh('c', CUBE, translate=[20.0, -3.5, 0.0], scale=[1.0, 2.0, 1.0])
+        ground = self._ground(scene, -2.0)
+        scene.select(['c', ground])
+
+        core.drop_to_ground(scene)
+
+        self.assertPivot(scene, 'c', [20.0, -2.0, 0.0])
+        self.assertEqual(scene.messages, [])
+
+    def test_max_distance(self):
+        scene = _scene()
+        ground = self._ground(scene, -3.0)
+        scene.select(['a', 'b', ground])
+
+        core.drop_to_ground(scene, max_distance=2.0)
+
+        # a is 7 above the ground and stays, b is 1 above it
+        self.assertPivot(scene, 'a', [0.0, 5.0, 0.0])
+        self.assertPivot(scene, 'b', [10.0, -3.0, 0.0])
+        self.assertEqual(scene.messages, [('warning', "No ground below these objects ['a']")])
+
+    def test_no_ground_below(self):
+        scene = _scene()
+        ground = self._ground(scene, 20.0)
+        scene.select(['a', ground])
+
+        core.drop_to_ground(scene)
+
+        self.assertPivot(scene, 'a', [0.0, 5.0, 0.0])
+        self.assertEqual([kind for kind, _ in scene.messages], ['warning'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests of the node names MayaBackend returns, against a minimal stand-in
+of the maya.cmds queries it issues.
+"""
+
+import unittest
+
+from OriginPivot.backends import MayaBackend
+
+
+class FakeCmds(object):
+    """
+    Answers ls and listRelatives over a fixed DAG of full paths.
+    """
+
+    def __init__(self, paths, selection):
+        self.paths = paths
+        self.selection = selection
+
+    def _long(self, node):
+        if node.startswith('|'):
+            return node
+        matches = [path for path in self.paths if path.rpartition('|')[2] == node]
+        assert len(matches) == 1, node
+        return matches[0]
+
+    def ls(self, node=None, sl=False, long=False): # pylint: disable=redefined-builtin
+        nodes = self.selection if sl else [node]
+        return [self._long(name) if long else name for name in nodes]
+
+    def listRelatives(self, node, parent=False, allDescendents=False, fullPath=False, **_): # pylint: disable=invalid-name
+        path = self._long(node)
+        if parent:
+            found = [path.rpartition('|')[0]] if path.count('|') > 1 else []
+        elif allDescendents:
+            found = [other for other in self.paths if other.startswith(path + '|')]
+        else:
+            found = []
+
+        return [name if fullPath else name.rpartition('|')[2] for name in found] or None
+
+
+class MayaBackendNamesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MayaBackend(FakeCmds(
+            ['|grp', '|grp|child', '|grp|child|leaf'], ['grp', 'child']))
+
+    def test_selection_is_long(self):
+        self.assertEqual(self.backend.selection(), ['|grp', '|grp|child'])
+
+    def test_parent_is_long(self):
+        self.assertEqual(self.backend.parent('|grp|child'), '|grp')
+        self.assertIsNone(self.backend.parent('|grp'))
+
+    def test_hierarchy_is_long(self):
+        self.assertEqual(self.backend.hierarchy(['grp']), {
+            '|grp': ['|grp|child'],
+            '|grp|child': ['|grp|child|leaf'],
+            '|grp|child|leaf': []})
+
+
+class AttributeCmds(object):
+    """
+    Answers getAttr and objectType and records setAttr over a dict of
+    attribute values.
+    """
+
+    def __init__(self, attributes, joints=()):
+        self.attributes = attributes
+        self.joints = joints
+
+    def getAttr(self, plug): # pylint: disable=invalid-name
+        return self.attributes[plug]
+
+    def setAttr(self, plug, *values): # pylint: disable=invalid-name
+        self.attributes[plug] = values
+
+    def objectType(self, node, isType=None): # pylint: disable=invalid-name
+        return isType == 'joint' and node in self.joints
+
+
+class MayaBackendBakingTest(unittest.TestCase):
+
+    def test_local_matrices(self):
+        matrix = [float(value) for value in range(16)]
+        backend = MayaBackend(AttributeCmds({'|a.matrix': matrix}))
+
+        self.assertEqual(backend.local_matrices(['|a'])[0].tolist(), [
+            matrix[0:4], matrix[4:8], matrix[8:12], matrix[12:16]])
+
+    def test_object_pivots(self):
+        backend = MayaBackend(AttributeCmds({'|a.rotatePivot': [(1.0, 2.0, 3.0)]}))
+
+        self.assertEqual(backend.object_pivots(['|a']), [[1.0, 2.0, 3.0]])
+
+    def test_reset_transforms(self):
+        cmds = AttributeCmds({}, joints=['|joint'])
+        backend = MayaBackend(cmds)
+
+        backend.reset_transforms(['|a', '|joint'], [[1.0, 2.0, 3.0], [0.0, 0.0, 0.0]])
+
+        self.assertEqual(cmds.attributes['|a.rotateAxis'], (0.0, 0.0, 0.0))
+        self.assertEqual(cmds.attributes['|a.rotatePivot'], (1.0, 2.0, 3.0))
+        self.assertNotIn('|a.jointOrient', cmds.attributes)
+        self.assertEqual(cmds.attributes['|joint.jointOrient'], (0.0, 0.0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
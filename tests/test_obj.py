@@ -0,0 +1,136 @@
+"""
+Round trip tests of OBJ normalization over temporary files.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import obj
+
+# a cube with comments, normals, texture coordinates, a vertex color and
+# faces using negative indices
+CUBE_OBJ = b'''# exported cube
+mtllib cube.mtl
+o cube
+v -1.0 0.0 -1.0
+v 1.0 0.0 -1.0
+v 1.0 2.0 -1.0
+v -1.0 2.0 -1.0
+v -1.0 0.0 1.0 1.0
+v 1.0 0.0 1.0 0.5 0.25 0.125
+v\t1.0 2.0 1.0
+v -1.0 2.0 1.0
+vn 0.0 0.0 -1.0
+vt 0.0 0.0
+# faces
+usemtl grey
+f 1/1/1 2/1/1 3/1/1 4/1/1
+f -4 -3 -2 -1
+s off
+'''
+
+
+class ObjTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, 'cube.obj')
+        self.destination = os.path.join(self.root, 'out', 'cube.obj')
+        os.makedirs(os.path.dirname(self.destination))
+        self._write(self.source, CUBE_OBJ)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, content):
+        with io.open(path, 'wb') as obj_file:
+            obj_file.write(content)
+
+    def _read(self, path):
+        with io.open(path, 'rb') as obj_file:
+            return obj_file.read()
+
+    def _vertices(self, path):
+        return np.concatenate(list(obj.iter_vertex_chunks(path)))
+
+    def test_round_trip(self):
+        offset = obj.normalize_obj(self.source, self.destination)
+
+        self.assertEqual(offset, [0.0, 0.0, 0.0])
+        np.testing.assert_array_equal(
+            self._vertices(self.destination), self._vertices(self.source))
+
+        # every line other than the vertex positions is copied untouched
+        source_lines = self._read(self.source).splitlines(True)
+        lines = self._read(self.destination).splitlines(True)
+        self.assertEqual(len(lines), len(source_lines))
+        for line, source_line in zip(lines, source_lines):
+            if not obj._is_vertex(source_line): # pylint: disable=protected-access
+                self.assertEqual(line, source_line)
+        self.assertTrue(lines[8].endswith(b' 0.5 0.25 0.125\n'))
+        self.assertTrue(lines[7].endswith(b' 1.0\n'))
+
+    def test_translated(self):
+        self._write(self.source, CUBE_OBJ.replace(b'v -1.0 0.0 -1.0', b'v -1.0 -3.0 -1.0'))
+
+        offset = obj.normalize_obj(self.source, self.destination, operation='center')
+
+        vertices = self._vertices(self.destination)
+        np.testing.assert_allclose(offset, [0.0, 0.5, 0.0])
+        np.testing.assert_allclose(vertices, self._vertices(self.source) + offset)
+        np.testing.assert_allclose(vertices.min(axis=0) + vertices.max(axis=0), 0.0)
+        self.assertIn(b'f -4 -3 -2 -1\n', self._read(self.destination))
+
+    def test_up_axis(self):
+        offset = obj.normalize_obj(self.source, self.destination, up_axis='z')
+
+        np.testing.assert_allclose(offset, [0.0, -1.0, 1.0])
+
+    def test_ground(self):
+        offset = obj.normalize_obj(self.source, self.destination, operation='ground', percentile=0)
+
+        np.testing.assert_allclose(offset[1], 0.0)
+
+    def test_crlf_in_place(self):
+        self._write(self.source, CUBE_OBJ.replace(b'\n', b'\r\n').replace(b'v 1.0', b'v 3.0'))
+
+        obj.normalize_obj(self.source, self.source)
+
+        content = self._read(self.source)
+        self.assertEqual(content.count(b'\r\n'), CUBE_OBJ.count(b'\n'))
+        self.assertEqual(content.count(b'\n'), CUBE_OBJ.count(b'\n'))
+        np.testing.assert_allclose(self._vertices(self.source)[:, 0].min(), -2.0)
+        self.assertFalse(os.path.exists(self.source + '.part'))
+
+    def test_chunk_boundaries(self):
+        vertices = self._vertices(self.source)
+
+        for chunk_size in (1, 3, 4, 8, 100):
+            chunks = list(obj.iter_vertex_chunks(self.source, chunk_size))
+
+            # every chunk but the last one is full
+            self.assertEqual(set(len(chunk) for chunk in chunks[:-1]) - {chunk_size}, set())
+            np.testing.assert_array_equal(np.concatenate(chunks), vertices)
+            np.testing.assert_array_equal(
+                obj.obj_bounds(self.source, chunk_size),
+                np.concatenate((vertices.min(axis=0), vertices.max(axis=0))))
+
+    def test_no_vertices(self):
+        self._write(self.source, b'# empty\nf 1 2 3\n')
+
+        with self.assertRaises(ValueError):
+            obj.normalize_obj(self.source, self.destination)
+        self.assertFalse(os.path.exists(self.destination))
+
+    def test_unsupported_operation(self):
+        with self.assertRaises(ValueError):
+            obj.normalization_offset(obj.obj_bounds(self.source), operation='top')
+
+
+if __name__ == '__main__':
+    unittest.main()
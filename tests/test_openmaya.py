@@ -0,0 +1,85 @@
+"""
+Tests of OpenMayaBackend against the OpenMaya stand-in over MemoryScene
+scenes.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import cache
+from OriginPivot import core
+from OriginPivot.backends import MemoryScene
+from OriginPivot.backends import OpenMayaBackend
+from OriginPivot.backends import openmaya_standin
+
+from .test_core import CUBE
+
+
+def _backend(scene):
+    return OpenMayaBackend(om=openmaya_standin.create(scene), fallback=scene)
+
+
+class OpenMayaBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = MemoryScene()
+        self.scene.add_mesh('a', CUBE, translate=[0.0, 5.0, 0.0], rotate=[0.0, 30.0, 0.0])
+        self.scene.add_node('grp')
+        self.scene.add_mesh('child', CUBE, parent='grp', translate=[5.0, 0.0, 0.0])
+        self.backend = _backend(self.scene)
+
+    def test_queries_match_scene(self):
+        nodes = ['a', 'grp', 'child']
+
+        np.testing.assert_allclose(
+            self.backend.world_bounding_boxes(nodes), self.scene.world_bounding_boxes(nodes))
+        np.testing.assert_allclose(
+            self.backend.world_pivots(nodes), self.scene.world_pivots(nodes))
+        for ours, theirs in zip(self.backend.world_points(nodes), self.scene.world_points(nodes)):
+            np.testing.assert_allclose(ours, theirs)
+
+    def test_selection(self):
+        self.backend.select(['a', 'child.vtx[0:3]'])
+
+        self.assertEqual(self.backend.selection(), ['a', 'child.vtx[0:3]'])
+        self.assertEqual(len(self.backend.component_positions(['child.vtx[0:3]'])), 12)
+
+    def test_fingerprints(self):
+        fingerprints = self.backend.fingerprints(['a', 'grp'])
+
+        self.assertEqual(fingerprints, [self.backend.fingerprint(node) for node in ('a', 'grp')])
+        self.assertEqual(self.backend.fingerprints(['a', 'grp']), fingerprints)
+
+    def test_child_move_invalidates_group_bounds(self):
+        bounds_cache = cache.get_cache(self.backend)
+        np.testing.assert_allclose(
+            bounds_cache.world_bounding_boxes(self.backend, ['grp'])[0], [4, -1, -1, 6, 1, 1])
+
+        self.scene.set_world_translations(['child'], [[50.0, 0.0, 0.0]])
+
+        np.testing.assert_allclose(
+            bounds_cache.world_bounding_boxes(self.backend, ['grp'])[0], [49, -1, -1, 51, 1, 1])
+
+    def test_vertex_edit_invalidates_bounds(self):
+        self.backend.select(['child'])
+        core.move_pivot_to_bottom(self.backend, per_object=True)
+        np.testing.assert_allclose(self.scene.world_pivot('child'), [5.0, -1.0, 0.0])
+
+        points = self.scene.object_points(['child'])[0] * [1.0, 3.0, 1.0]
+        self.scene.set_object_points(['child'], [points])
+        core.move_pivot_to_bottom(self.backend, per_object=True)
+
+        np.testing.assert_allclose(self.scene.world_pivot('child'), [5.0, -3.0, 0.0])
+
+    def test_edits_are_undoable(self):
+        self.backend.select(['a'])
+
+        core.move_pivot_to_bottom(self.backend)
+        self.backend.undo()
+
+        np.testing.assert_allclose(self.scene.world_pivot('a'), [0.0, 5.0, 0.0], atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
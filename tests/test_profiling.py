@@ -0,0 +1,80 @@
+"""
+Tests of host call profiling on MemoryScene scenes.
+"""
+
+import unittest
+
+from OriginPivot import backends
+from OriginPivot import cache
+from OriginPivot import core
+from OriginPivot import profiling
+from OriginPivot.backends import MayaBackend
+from OriginPivot.backends import MemoryScene
+
+from .test_core import CUBE
+
+
+class ProfilingTest(unittest.TestCase):
+
+    def test_instrumented_in_place(self):
+        scene = MemoryScene()
+        scene.select([scene.add_mesh('a', CUBE), scene.add_mesh('b', CUBE)])
+        bounds_cache = cache.get_cache(scene)
+
+        profiler = profiling.enable(scene)
+        self.assertIs(backends.get_backend(), scene)
+        core.move_pivot_to_bottom(per_object=True)
+        profiling.disable()
+        self.assertIsNone(backends.current_backend())
+
+        # the edits made while profiling went through the cache of the scene
+        self.assertIs(cache.get_cache(scene), bounds_cache)
+        self.assertIn('a', bounds_cache)
+        self.assertIn('b', bounds_cache)
+        self.assertEqual(profiler.operation_stats()['move_pivot_to_bottom']['runs'], 1)
+        self.assertEqual(profiler.command_stats()['selection']['count'], 1)
+
+        # restoring removes every wrapper
+        self.assertNotIn('selection', vars(scene))
+        core.move_pivot_to_bottom(scene, per_object=True)
+        self.assertEqual(profiler.command_stats()['selection']['count'], 1)
+
+    def test_saved_calls(self):
+        scene = MemoryScene()
+        joint = scene.add_joint('joint', [0.0, 1.0, 0.0])
+        scene.select([scene.add_mesh('a', CUBE), scene.add_mesh('b', CUBE), joint])
+
+        profiler = profiling.enable(scene)
+        core.move_pivot_to_joint()
+        profiling.disable()
+
+        # the freezes and pivot moves of both objects are issued together
+        self.assertEqual(profiler.operation_stats()['move_pivot_to_joint']['saved_calls'], 3)
+        self.assertIn('saved', profiler.summary())
+
+    def test_previous_backend_restored(self):
+        current = MemoryScene()
+        profiled = MemoryScene()
+        backends.set_backend(current)
+        try:
+            profiling.enable(profiled)
+            self.assertIs(backends.get_backend(), profiled)
+            profiling.disable()
+
+            self.assertIs(backends.get_backend(), current)
+        finally:
+            backends.set_backend(None)
+
+    def test_cmds_restored(self):
+        commands = object()
+        backend = MayaBackend(commands)
+
+        profiling.enable(backend)
+        self.assertIsNot(backend.cmds, commands)
+        profiling.disable()
+
+        self.assertIs(backend.cmds, commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
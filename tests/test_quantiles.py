@@ -0,0 +1,109 @@
+"""
+Tests of the KLL quantile sketch and ground contacts against NumPy.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import quantiles
+
+FRACTIONS = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class QuantileSketchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.RandomState(0).standard_normal(200000)
+        self.sorted = np.sort(self.values)
+        # rank error allowed, the expected one is about 1.7 / k
+        self.tolerance = 3.0 / quantiles.K
+
+    def assertRanks(self, sketch):
+        for fraction in FRACTIONS:
+            rank = np.searchsorted(self.sorted, sketch.quantile(fraction), side='right')
+            expected = np.searchsorted(
+                self.sorted, np.percentile(self.values, fraction * 100.0), side='right')
+
+            self.assertLessEqual(abs(rank - expected) / len(self.values), self.tolerance)
+
+    def test_rank_error(self):
+        sketch = quantiles.QuantileSketch()
+        for chunk in np.array_split(self.values, 37):
+            sketch.update(chunk)
+
+        self.assertRanks(sketch)
+        self.assertEqual(len(sketch), len(self.values))
+        # the sketch stays bounded whatever the number of values
+        levels = sketch._levels # pylint: disable=protected-access
+        self.assertLess(sum(len(level) for level in levels), 3 * quantiles.K)
+
+    def test_merge(self):
+        first = quantiles.QuantileSketch(seed=1)
+        second = quantiles.QuantileSketch(seed=2)
+        first.update(self.values[:120000])
+        second.update(self.values[120000:])
+
+        first.merge(second)
+        first.merge(quantiles.QuantileSketch())
+
+        self.assertRanks(first)
+        self.assertEqual(len(first), len(self.values))
+        self.assertEqual(first.quantile(0.0), self.sorted[0])
+        self.assertEqual(first.quantile(1.0), self.sorted[-1])
+
+    def test_exact_below_capacity(self):
+        values = self.values[:100]
+        sketch = quantiles.QuantileSketch()
+        sketch.update(values)
+
+        ordered = np.sort(values)
+        for fraction in FRACTIONS:
+            index = int(np.ceil(fraction * len(values))) - 1
+            self.assertEqual(sketch.quantile(fraction), ordered[index])
+
+    def test_tiny(self):
+        sketch = quantiles.QuantileSketch()
+        sketch.update([])
+        self.assertEqual(len(sketch), 0)
+        with self.assertRaises(ValueError):
+            sketch.quantile(0.5)
+
+        sketch.update([4.0])
+        for fraction in (0.0,) + FRACTIONS + (1.0,):
+            self.assertEqual(sketch.quantile(fraction), 4.0)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+
+class GroundContactTest(unittest.TestCase):
+
+    def test_stray_vertex(self):
+        points = np.random.RandomState(0).uniform(-1.0, 1.0, (10000, 3))
+        points[0] = [0.0, -50.0, 0.0]
+
+        contact = quantiles.ground_contact(quantiles.iter_point_chunks(points, 999))
+
+        # the stray vertex does not drag the contact down
+        self.assertGreater(contact[1], -1.0)
+        self.assertLess(contact[1], -0.9)
+        np.testing.assert_allclose(
+            contact[[0, 2]], np.median(points[:, [0, 2]], axis=0), atol=0.05)
+
+    def test_ground_contacts(self):
+        cube = [[x, y, z] for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)]
+
+        contacts = quantiles.ground_contacts(
+            [cube, np.array(cube) + 5.0], up_axis='z', percentile=0)
+
+        np.testing.assert_allclose(contacts[:, 2], [-1.0, 4.0])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            quantiles.ground_contact(iter([]))
+        with self.assertRaises(ValueError):
+            quantiles.ground_contact(iter([np.zeros((1, 3))]), percentile=101)
+
+
+if __name__ == '__main__':
+    unittest.main()
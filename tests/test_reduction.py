@@ -0,0 +1,63 @@
+"""
+Tests of the threaded reduction against the serial NumPy reductions.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import geometry
+from OriginPivot import reduction
+from OriginPivot.backends import MemoryScene
+
+
+class ReductionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.points = np.random.RandomState(0).uniform(-10.0, 10.0, (10000, 3))
+        self.bounds = np.concatenate((self.points.min(axis=0), self.points.max(axis=0)))
+
+    def test_reduce_points(self):
+        bounds, centroid, count = reduction.reduce_points(self.points, chunk_size=999)
+
+        np.testing.assert_array_equal(bounds, self.bounds)
+        np.testing.assert_allclose(centroid, self.points.mean(axis=0), atol=1e-9)
+        self.assertEqual(count, len(self.points))
+
+    def test_reduce_chunks(self):
+        chunks = (self.points[start:start + 999] for start in range(0, len(self.points), 999))
+
+        bounds, centroid, count = reduction.reduce_chunks(chunks)
+
+        np.testing.assert_array_equal(bounds, self.bounds)
+        np.testing.assert_allclose(centroid, self.points.mean(axis=0), atol=1e-9)
+        self.assertEqual(count, len(self.points))
+
+    def test_reduce_empty(self):
+        self.assertEqual(reduction.reduce_chunks(iter([np.empty((0, 3))])), (None, None, 0))
+
+    def test_parallel_bounds_paths(self):
+        # a low threshold sends the backend and oriented paths to the threads
+        threshold = reduction.PARALLEL_THRESHOLD
+        reduction.PARALLEL_THRESHOLD = 100
+        try:
+            scene = MemoryScene()
+            scene.add_mesh('a', self.points)
+            scene.add_mesh('b', self.points[:50])
+
+            np.testing.assert_array_equal(
+                scene.world_bounding_boxes(['a', 'b']),
+                geometry.bounds_from_point_sets([self.points, self.points[:50]]))
+            np.testing.assert_array_equal(scene.world_bounding_boxes(['a'])[0], self.bounds)
+
+            parallel = geometry.oriented_bounding_boxes([self.points, self.points[:50]])
+        finally:
+            reduction.PARALLEL_THRESHOLD = threshold
+
+        serial = geometry.oriented_bounding_boxes([self.points, self.points[:50]])
+        for parallel_array, serial_array in zip(parallel, serial):
+            np.testing.assert_allclose(parallel_array, serial_array, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests of edit plans on MemoryScene scenes.
+"""
+
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import transaction
+from OriginPivot.backends import MemoryScene
+
+from .test_core import CUBE
+from .test_core import PivotTestCase
+from .test_core import _scene
+
+
+class EditPlanTest(PivotTestCase):
+
+    def test_per_object_steps_grouped(self):
+        scene = _scene()
+        scene.calls.clear()
+
+        with transaction.EditPlan(scene) as plan:
+            for node, pivot in (('a', [0.0, 4.0, 0.0]), ('b', [10.0, -2.0, 0.0])):
+                plan.freeze([node])
+                plan.set_pivot([node], pivot)
+                plan.freeze([node])
+
+        # the three steps of both objects are issued together in one chunk
+        self.assertEqual(dict(scene.calls), {
+            'freeze': 2, 'set_world_pivots': 1, 'undo_chunk': 1})
+        self.assertEqual((plan.recorded, plan.issued, plan.saved), (6, 3, 3))
+        self.assertPivot(scene, 'a', [0.0, 4.0, 0.0])
+        self.assertPivot(scene, 'b', [10.0, -2.0, 0.0])
+
+    def test_shared_pivot(self):
+        scene = _scene()
+        scene.calls.clear()
+
+        with transaction.EditPlan(scene) as plan:
+            plan.set_pivot(['a'], [1.0, 2.0, 3.0])
+            plan.set_pivot(['b'], [1.0, 2.0, 3.0])
+
+        self.assertEqual(scene.calls['set_world_pivot'], 1)
+        self.assertNotIn('set_world_pivots', scene.calls)
+        self.assertPivot(scene, 'b', [1.0, 2.0, 3.0])
+
+    def test_order_kept(self):
+        scene = _scene()
+        expected = _scene()
+
+        with transaction.EditPlan(scene) as plan:
+            plan.set_translations(['a'], [[0.0, 1.0, 0.0]])
+            plan.freeze(['a'])
+            plan.set_pivot(['b'], [0.0, 0.0, 0.0])
+            plan.set_translations(['b'], [[3.0, 0.0, 0.0]])
+
+        expected.set_world_translations(['a'], [[0.0, 1.0, 0.0]])
+        expected.freeze(['a'])
+        expected.set_world_pivot(['b'], [0.0, 0.0, 0.0])
+        expected.set_world_translations(['b'], [[3.0, 0.0, 0.0]])
+
+        for node in ('a', 'b'):
+            self.assertPivot(scene, node, expected.world_pivot(node))
+            self.assertPoints(scene, node, expected.world_points([node])[0])
+        # the translation of a was frozen after it was set
+        np.testing.assert_allclose(scene.local_matrices(['a'])[0], np.identity(4), atol=1e-9)
+
+    def test_repeated_steps_collapse(self):
+        scene = _scene()
+        scene.calls.clear()
+
+        with transaction.EditPlan(scene) as plan:
+            plan.freeze(['a'])
+            plan.freeze(['a'])
+            plan.set_pivot(['a'], [5.0, 5.0, 5.0])
+            plan.set_pivot(['a'], [0.0, 1.0, 0.0])
+
+        self.assertEqual(len(plan), 0)
+        self.assertEqual((plan.recorded, plan.issued), (4, 2))
+        self.assertEqual(scene.calls['freeze'], 1)
+        self.assertPivot(scene, 'a', [0.0, 1.0, 0.0])
+
+    def test_undo(self):
+        scene = _scene()
+        points = scene.world_points(['a', 'b'])
+
+        with transaction.EditPlan(scene) as plan:
+            plan.freeze(['a', 'b'])
+            plan.set_translations(['a', 'b'], [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+
+        # one undo reverts every edit of the plan
+        scene.undo()
+
+        self.assertPoints(scene, 'a', points[0])
+        self.assertPoints(scene, 'b', points[1])
+
+    def test_not_flushed_on_error(self):
+        scene = MemoryScene()
+        scene.add_mesh('a', CUBE)
+        scene.calls.clear()
+
+        with self.assertRaises(RuntimeError):
+            with transaction.EditPlan(scene) as plan:
+                plan.set_translations(['a'], [[1.0, 0.0, 0.0]])
+                raise RuntimeError('query failed')
+
+        self.assertEqual(dict(scene.calls), {})
+        self.assertEqual(len(plan), 1)
+        self.assertPivot(scene, 'a', [0.0, 0.0, 0.0])
+
+    def test_empty_flush(self):
+        scene = _scene()
+        scene.calls.clear()
+
+        self.assertEqual(transaction.EditPlan(scene).flush(), 0)
+        self.assertEqual(dict(scene.calls), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests of the vertex cache staleness checks.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np # pylint: disable=import-error
+
+from OriginPivot import manifest
+from OriginPivot import vertex_cache
+
+
+class VertexCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, 'prop.obj')
+        with open(self.source, 'w') as obj_file:
+            obj_file.write('v 0 1 2\nv 1 2 3\nv 2 0 1\nf 1 2 3\n')
+        self.cache = vertex_cache.VertexCache(os.path.join(self.root, 'cache'))
+
+        self.hashes = []
+        self._file_hash = manifest.file_hash
+
+        def counting_hash(path, *args, **kwargs):
+            self.hashes.append(path)
+            return self._file_hash(path, *args, **kwargs)
+
+        manifest.file_hash = counting_hash
+
+    def tearDown(self):
+        manifest.file_hash = self._file_hash
+        shutil.rmtree(self.root)
+
+    def test_bounds(self):
+        np.testing.assert_array_equal(self.cache.bounds(self.source), [0, 0, 1, 2, 2, 3])
+
+    def test_touched_source_is_hashed_once(self):
+        self.cache.get(self.source)
+        del self.hashes[:]
+
+        stat = os.stat(self.source)
+        os.utime(self.source, (stat.st_atime, stat.st_mtime + 10))
+        for _ in range(3):
+            entry = self.cache.get(self.source)
+
+        self.assertEqual(len(self.hashes), 1)
+        self.assertEqual(
+            (entry.source_size, entry.source_mtime), manifest.file_stat(self.source))
+
+    def test_changed_source_is_rewritten(self):
+        self.cache.get(self.source)
+
+        with open(self.source, 'a') as obj_file:
+            obj_file.write('v 5 5 5\n')
+
+        np.testing.assert_array_equal(self.cache.bounds(self.source), [0, 0, 1, 5, 5, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()